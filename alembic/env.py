@@ -5,7 +5,7 @@ from sqlalchemy import create_engine, pool
 from sqlmodel import SQLModel
 
 # Import all models for Alembic autogenerate
-from app.models import Card, User  # noqa: F401
+import app.models  # noqa: F401
 from app.core.config import get_settings
 
 config = context.config
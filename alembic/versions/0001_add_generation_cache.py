@@ -0,0 +1,52 @@
+"""add generation_cache
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "generation_cache",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("cache_key", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("provider", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("model", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column("prompt_version", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column("input_text", sqlmodel.sql.sqltypes.AutoString(length=5000), nullable=False),
+        sa.Column("response_json", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("last_accessed_at", sa.DateTime(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_generation_cache_id"), "generation_cache", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_generation_cache_cache_key"), "generation_cache", ["cache_key"], unique=True
+    )
+    op.create_index(
+        op.f("ix_generation_cache_expires_at"), "generation_cache", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_generation_cache_expires_at"), table_name="generation_cache")
+    op.drop_index(op.f("ix_generation_cache_cache_key"), table_name="generation_cache")
+    op.drop_index(op.f("ix_generation_cache_id"), table_name="generation_cache")
+    op.drop_table("generation_cache")
@@ -0,0 +1,64 @@
+"""add cards.normalized_text
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+from app.core.text import normalize_text
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "cards",
+        sa.Column("normalized_text", sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    )
+
+    # Backfill once here, in id order, so the column can be made NOT NULL
+    cards = sa.table(
+        "cards",
+        sa.column("id", sa.Uuid()),
+        sa.column("target_text", sa.String()),
+        sa.column("normalized_text", sa.String()),
+    )
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        statement = sa.select(cards.c.id, cards.c.target_text).order_by(cards.c.id)
+        if last_id is not None:
+            statement = statement.where(cards.c.id > last_id)
+        rows = bind.execute(statement.limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        bind.execute(
+            cards.update()
+            .where(cards.c.id == sa.bindparam("card_id"))
+            .values(normalized_text=sa.bindparam("value")),
+            [{"card_id": row.id, "value": normalize_text(row.target_text)[:500]} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("cards", "normalized_text", nullable=False)
+    op.create_index(
+        "ix_cards_user_id_normalized_text", "cards", ["user_id", "normalized_text"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cards_user_id_normalized_text", table_name="cards")
+    op.drop_column("cards", "normalized_text")
@@ -0,0 +1,71 @@
+"""add sync versions and tombstones
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:50:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Existing rows start at version 0; clients pick them up on their first
+    # sync, which has no token
+    for table in ("users", "cards", "tags"):
+        op.add_column(
+            table, sa.Column("sync_version", sa.Integer(), server_default="0", nullable=False)
+        )
+        op.alter_column(table, "sync_version", server_default=None)
+
+    op.create_index("ix_cards_user_id_updated_at", "cards", ["user_id", "updated_at"], unique=False)
+    op.create_index(
+        "ix_cards_user_id_sync_version", "cards", ["user_id", "sync_version"], unique=False
+    )
+    op.create_index(
+        "ix_tags_user_id_sync_version", "tags", ["user_id", "sync_version"], unique=False
+    )
+
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("entity", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column("entity_id", sa.Uuid(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.Column("sync_version", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_tombstones_id"), "tombstones", ["id"], unique=False)
+    op.create_index(op.f("ix_tombstones_user_id"), "tombstones", ["user_id"], unique=False)
+    op.create_index(
+        "ix_tombstones_user_id_sync_version",
+        "tombstones",
+        ["user_id", "sync_version"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tombstones_user_id_sync_version", table_name="tombstones")
+    op.drop_index(op.f("ix_tombstones_user_id"), table_name="tombstones")
+    op.drop_index(op.f("ix_tombstones_id"), table_name="tombstones")
+    op.drop_table("tombstones")
+
+    op.drop_index("ix_tags_user_id_sync_version", table_name="tags")
+    op.drop_index("ix_cards_user_id_sync_version", table_name="cards")
+    op.drop_index("ix_cards_user_id_updated_at", table_name="cards")
+    for table in ("tags", "cards", "users"):
+        op.drop_column(table, "sync_version")
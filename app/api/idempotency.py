@@ -0,0 +1,128 @@
+import hashlib
+from collections.abc import Callable, Coroutine, Iterator
+from contextlib import contextmanager
+from typing import Any
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.core.security import decode_access_token
+from app.models.idempotency_key import IdempotencyKey
+from app.services.idempotency_service import IdempotencyService
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def _user_id(request: Request) -> UUID | None:
+    """The user the request's bearer token is for, if it is valid."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    payload = decode_access_token(token) if scheme.lower() == "bearer" else None
+    try:
+        return UUID(payload["sub"]) if payload else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def _session(request: Request) -> Iterator[Session]:
+    """A session from the get_session dependency, honoring dependency overrides."""
+    provided = request.app.dependency_overrides.get(get_session, get_session)()
+    if isinstance(provided, Session):
+        yield provided
+        return
+    try:
+        yield next(provided)
+    finally:
+        provided.close()
+
+
+def _is_upload(request: Request) -> bool:
+    return request.headers.get("Content-Type", "").lower().startswith("multipart/")
+
+
+async def _request_hash(request: Request) -> str:
+    digest = hashlib.sha256(f"{request.method} {request.url.path}?{request.url.query}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+def _replay(record: IdempotencyKey, request_hash: str) -> Response:
+    if record.request_hash != request_hash:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            content={"detail": "Idempotency-Key was already used for a different request"},
+        )
+    if record.status_code is None:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": "A request with this Idempotency-Key is still in progress"},
+        )
+    return Response(
+        content=record.response_body,
+        status_code=record.status_code,
+        media_type=record.media_type,
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class that honors an ``Idempotency-Key`` header on writes.
+
+    The first authenticated request with a key runs the endpoint and its
+    response is stored; retries with the same key get the stored response,
+    marked ``Idempotent-Replayed: true``, without running the endpoint again.
+    A retry while the first request is still running gets 409, and reusing
+    a key for a different request gets 422. If the endpoint raises (HTTP
+    errors and cancellation included), fails with a 5xx or streams its
+    response, nothing is stored and the key is released, so the request can
+    be retried; a key left behind by a request that died outright is freed
+    by its lease running out. File uploads (multipart bodies) are passed
+    straight through, since hashing them would buffer the whole upload.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            user_id = _user_id(request)
+            if (
+                key is None
+                or user_id is None
+                or request.method not in WRITE_METHODS
+                or _is_upload(request)
+            ):
+                return await handler(request)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"},
+                )
+
+            request_hash = await _request_hash(request)
+            with _session(request) as session:
+                store = IdempotencyService(session)
+                record, claimed = store.claim(user_id, key, request_hash)
+                if not claimed:
+                    return _replay(record, request_hash)
+                completed = False
+                try:
+                    response = await handler(request)
+                    body = getattr(response, "body", None)
+                    if response.status_code < 500 and isinstance(body, bytes):
+                        store.complete(record, response.status_code, response.media_type, body)
+                        completed = True
+                    return response
+                finally:
+                    if not completed:
+                        store.release(record)
+
+        return idempotent_handler
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, cards, export, generate, health, tags, tts, users
+from app.api.v1 import auth, backup, cards, export, generate, health, jobs, sync, tags, tts, users
 
 api_router = APIRouter()
 
@@ -13,4 +13,6 @@ api_router.include_router(tags.router)
 api_router.include_router(generate.router)
 api_router.include_router(tts.router)
 api_router.include_router(export.router)
-
+api_router.include_router(jobs.router)
+api_router.include_router(backup.router)
+api_router.include_router(sync.router)
@@ -0,0 +1,47 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.dependencies import CurrentUser
+from app.schemas.backup import RestoreResult
+from app.services.backup_service import BackupService
+
+router = APIRouter(prefix="/backup", tags=["Backup"])
+
+
+@router.get("")
+async def download_backup(
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> StreamingResponse:
+    """
+    Download a backup of the whole library: cards with SRS state, tags and
+    card-tag links, in a compact versioned binary format.
+    """
+    return StreamingResponse(
+        BackupService(session).dump(current_user.id),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": "attachment; filename=flashcards_backup.earbak"},
+    )
+
+
+# A sync endpoint: decoding and bulk inserts block, so FastAPI runs it in its threadpool
+@router.post("/restore", response_model=RestoreResult)
+def restore_backup(
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+    file: Annotated[UploadFile, File(description="File from GET /backup")],
+) -> RestoreResult:
+    """
+    Restore a backup into the current user's library.
+
+    Restored rows get new IDs; tags are merged by name, and cards already in
+    the library are skipped. Nothing is written if the file is invalid.
+    """
+    try:
+        return BackupService(session).restore(current_user.id, file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
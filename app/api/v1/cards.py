@@ -1,15 +1,28 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from sqlmodel import Session
 
+from app.api.idempotency import IdempotentRoute
 from app.core.database import get_session
 from app.dependencies import CurrentUser
-from app.schemas.card import CardCreate, CardList, CardRead, CardType, CardUpdate, ReviewRequest
+from app.schemas.card import (
+    CardCreate,
+    CardImportResult,
+    CardList,
+    CardRead,
+    CardType,
+    CardUpdate,
+    ReviewReplayRequest,
+    ReviewReplayResult,
+    ReviewRequest,
+)
+from app.services.anki_service import AnkiService
 from app.services.card_service import CardService
+from app.services.import_service import ImportService
 
-router = APIRouter(prefix="/cards", tags=["Cards"])
+router = APIRouter(prefix="/cards", tags=["Cards"], route_class=IdempotentRoute)
 
 
 @router.post("", response_model=CardRead, status_code=status.HTTP_201_CREATED)
@@ -24,6 +37,35 @@ async def create_card(
     return CardRead.model_validate(card)
 
 
+# A sync endpoint: parsing and bulk inserts block, so FastAPI runs it in its threadpool
+@router.post("/import", response_model=CardImportResult)
+def import_cards(
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+    file: Annotated[
+        UploadFile, File(description="CSV or XLSX file in the export layout, or .apkg")
+    ],
+) -> CardImportResult:
+    """
+    Bulk import cards from a CSV or XLSX file with the export columns, or
+    from an Anki package (.apkg).
+
+    For CSV and XLSX, Word/Phrase, Meaning, Context Sentence and Context
+    Translation are required; other columns are optional. Tags are separated
+    by commas, with `\\,` for a comma inside a tag name. Anki notes are
+    mapped by field name. Cards already in the library are skipped, and rows
+    that fail validation are reported by row (or note) number while the rest
+    are imported.
+    """
+    filename = file.filename or ""
+    try:
+        if filename.lower().endswith(".apkg"):
+            return AnkiService(session).import_apkg(current_user.id, file.file)
+        return ImportService(session).import_file(current_user.id, file.file, filename)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
 @router.get("", response_model=CardList)
 async def list_cards(
     current_user: CurrentUser,
@@ -165,3 +207,24 @@ async def review_card(
             detail="Card not found",
         )
     return CardRead.model_validate(card)
+
+
+@router.post("/reviews", response_model=ReviewReplayResult)
+async def replay_reviews(
+    replay_data: ReviewReplayRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> ReviewReplayResult:
+    """
+    Replay reviews recorded offline, up to 1000 per request.
+
+    Each entry carries a client-generated ID and the time of the review.
+    Entries are applied in time order in one transaction, and entries whose
+    ID was replayed before are skipped, so the same log can be resent after
+    a lost response. Returns the reviewed cards as they are afterwards.
+    """
+    card_service = CardService(session)
+    try:
+        return card_service.replay_reviews(user_id=current_user.id, entries=replay_data.entries)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
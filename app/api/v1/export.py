@@ -1,13 +1,16 @@
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlmodel import Session
 
 from app.core.database import get_session
 from app.dependencies import CurrentUser
-from app.models.card import Card
-from app.services.export_service import ExportService
+from app.schemas.export import ExportFormat
+from app.services.anki_service import AnkiService
+from app.services.export_artifact_service import ExportArtifactService
+from app.services.export_service import MEDIA_TYPES, ExportService
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
@@ -16,22 +19,56 @@ router = APIRouter(prefix="/export", tags=["Export"])
 async def export_cards(
     current_user: CurrentUser,
     session: Annotated[Session, Depends(get_session)],
+    format: Annotated[
+        ExportFormat, Query(description="csv, xlsx, jsonl, parquet, arrow or apkg")
+    ] = ExportFormat.CSV,
+    include_audio: Annotated[
+        bool, Query(description="apkg only: attach cached TTS audio for context sentences")
+    ] = False,
 ) -> StreamingResponse:
-    """Export all cards for the current user as a CSV file."""
-    statement = (
-        select(Card)
-        .where(Card.user_id == current_user.id)
-        .order_by(Card.created_at.desc())
-    )
-    cards = list(session.exec(statement).all())
+    """
+    Export all cards for the current user as CSV, XLSX, JSON lines, Parquet,
+    an Arrow IPC stream or an Anki package.
 
-    export_service = ExportService()
-    csv_buf = export_service.cards_to_csv(cards)
+    Rows are read from the database in batches, so memory use stays flat for
+    any library size. CSV, JSON lines and Arrow are streamed as they are read;
+    XLSX and Parquet are written to a spooled temporary file first, then
+    streamed. JSON lines, Parquet and Arrow keep the SRS fields typed. Anki
+    packages are zipped as they are written and carry the SRS state.
+    """
+    if format == ExportFormat.APKG:
+        content = AnkiService(session).stream_apkg(current_user.id, include_audio)
+    else:
+        content = ExportService(session).stream(current_user.id, format)
 
     return StreamingResponse(
-        csv_buf,
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=flashcards_export.csv"
-        },
+        content,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=flashcards_export.{format.value}"},
+    )
+
+
+@router.get("/artifacts/{artifact_id}")
+async def download_artifact(
+    artifact_id: UUID,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> FileResponse:
+    """
+    Download a file built by an export job (`POST /jobs/export`).
+
+    Supports Range requests, so an interrupted download can resume where it
+    stopped.
+    """
+    artifact = ExportArtifactService(session).get_by_id(current_user.id, artifact_id)
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found",
+        )
+    export_format = ExportFormat(artifact.format)
+    return FileResponse(
+        artifact.file_path,
+        media_type=MEDIA_TYPES[export_format],
+        filename=f"flashcards_export.{export_format.value}",
     )
@@ -1,7 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from collections.abc import AsyncIterator
+from typing import Annotated
 
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.core.sse import SSE_HEADERS, format_sse
 from app.dependencies import CurrentUser
 from app.schemas.generate import (
+    BatchGenerateRequest,
+    BatchGenerateResponse,
     ExtractRequest,
     ExtractResponse,
     GenerateRequest,
@@ -9,7 +19,22 @@ from app.schemas.generate import (
     RecommendRequest,
     RecommendResponse,
 )
-from app.services.ai_service import extract_learning_items, generate_card_data, recommend_related_items
+from app.services.ai_concurrency import ai_scheduler
+from app.services.ai_output import MalformedOutputError, repair_card
+from app.services.ai_service import (
+    answering_provider_name,
+    generate_card_data,
+    generate_prompt_version,
+    get_provider_model,
+    resolve_provider_name,
+    stream_card_data,
+)
+from app.services.batch_generation_service import BatchGenerationService
+from app.services.card_enrichment import CardEnrichmentService
+from app.services.extraction_service import ExtractionService
+from app.services.generation_cache_service import GenerationCacheService
+from app.services.pipeline_service import ExtractionPipelineService
+from app.services.recommendation_service import RecommendationService
 
 router = APIRouter(prefix="/generate", tags=["AI Generation"])
 
@@ -18,6 +43,7 @@ router = APIRouter(prefix="/generate", tags=["AI Generation"])
 async def generate(
     request: GenerateRequest,
     current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
 ) -> GenerateResponse:
     """
     Generate flashcard data from raw text using AI.
@@ -30,11 +56,38 @@ async def generate(
     - Cloze (fill-in-the-blank) sentence
 
     The user can review and edit this data before creating a card.
+
+    Responses are cached by the answering provider and model, prompt version
+    and exact (whitespace-collapsed) input; set `bypass_cache` to force a fresh
+    generation. With
+    `GENERATION_LOCAL_FIELDS` on, the cloze sentence and tags are computed
+    locally rather than generated.
     """
+    cache_service = GenerationCacheService(session)
+    enricher = CardEnrichmentService(session)
     try:
         provider_value = request.provider.value if request.provider else None
-        result = await generate_card_data(request.text, provider=provider_value)
-        return GenerateResponse(**result)
+        provider_name = resolve_provider_name(provider_value)
+        model = get_provider_model(provider_name, request.text)
+        prompt_version = generate_prompt_version()
+
+        if not request.bypass_cache:
+            cached = cache_service.get(provider_name, model, prompt_version, request.text)
+            if cached is not None:
+                return GenerateResponse(**enricher.apply(current_user.id, cached))
+
+        async with ai_scheduler.slot(current_user.id):
+            result = await generate_card_data(request.text, provider=provider_value)
+        response = GenerateResponse(**enricher.apply(current_user.id, result))
+        answered_by = answering_provider_name(provider_name)
+        cache_service.set(
+            answered_by,
+            get_provider_model(answered_by, request.text),
+            prompt_version,
+            request.text,
+            enricher.for_cache(response.model_dump()),
+        )
+        return response
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -47,17 +100,125 @@ async def generate(
         )
 
 
+@router.post("/stream")
+async def generate_stream(
+    request: GenerateRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> StreamingResponse:
+    """
+    Generate flashcard data, streaming each field over SSE as soon as it is complete.
+
+    Events:
+    - **field**: `{name, value}` for each completed field (e.g. `target_meaning`)
+    - **card**: the full validated card, sent last
+    - **error**: `{detail}` if generation fails
+    """
+    cache_service = GenerationCacheService(session)
+    enricher = CardEnrichmentService(session)
+    provider_value = request.provider.value if request.provider else None
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            provider_name = resolve_provider_name(provider_value)
+            model = get_provider_model(provider_name, request.text)
+            prompt_version = generate_prompt_version()
+
+            cached = None
+            if not request.bypass_cache:
+                cached = cache_service.get(provider_name, model, prompt_version, request.text)
+            if cached is not None:
+                cached = enricher.apply(current_user.id, cached)
+                for name, value in cached.items():
+                    yield format_sse("field", {"name": name, "value": value})
+                yield format_sse("card", cached)
+                return
+
+            fields = {}
+            async with ai_scheduler.slot(current_user.id):
+                async for name, value in stream_card_data(request.text, provider=provider_value):
+                    fields[name] = value
+                    yield format_sse("field", {"name": name, "value": value})
+
+            if enricher.enabled():
+                enriched = enricher.apply(current_user.id, fields)
+                for name in ("cloze_sentence", "tags"):
+                    fields[name] = enriched[name]
+                    yield format_sse("field", {"name": name, "value": enriched[name]})
+
+            card = GenerateResponse(**repair_card(fields, request.text)).model_dump()
+            answered_by = answering_provider_name(provider_name)
+            cache_service.set(
+                answered_by,
+                get_provider_model(answered_by, request.text),
+                prompt_version,
+                request.text,
+                enricher.for_cache(card),
+            )
+            yield format_sse("card", card)
+        except (ValidationError, MalformedOutputError):
+            yield format_sse("error", {"detail": "AI service error: incomplete card data"})
+        except ValueError as e:
+            yield format_sse("error", {"detail": str(e)})
+        except Exception as e:
+            yield format_sse("error", {"detail": f"AI service error: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@router.post("/batch", response_model=BatchGenerateResponse)
+async def generate_batch(
+    request: BatchGenerateRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> BatchGenerateResponse:
+    """
+    Generate flashcard data for many inputs at once.
+
+    Items run concurrently (bounded per user and globally), and `pack_size > 1`
+    packs several items into one AI prompt. Results come back in input order;
+    an item that fails carries an `error` instead of a `card`.
+    """
+    batch_service = BatchGenerationService(session)
+    try:
+        provider_value = request.provider.value if request.provider else None
+        results = await batch_service.generate(
+            user_id=current_user.id,
+            texts=request.texts,
+            provider=provider_value,
+            pack_size=request.pack_size,
+            bypass_cache=request.bypass_cache,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    return BatchGenerateResponse(results=results)
+
+
 @router.post("/extract", response_model=ExtractResponse)
 async def extract(
     request: ExtractRequest,
     current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
 ) -> ExtractResponse:
     """
     Extract useful English phrases or sentences from larger text.
+
+    Long documents are split into sentence-aligned chunks that are extracted
+    in parallel; the merged candidates are ranked by how many chunks they
+    appear in. `mode="shortlist"` scores phrases locally and sends only the
+    shortlist to the LLM; `mode="fast"` skips the LLM entirely. Phrases
+    already in the library are left out.
     """
     try:
         provider_value = request.provider.value if request.provider else None
-        candidates = await extract_learning_items(request.text, provider=provider_value)
+        candidates = await ExtractionService(session).extract(
+            current_user.id, request.text, provider=provider_value, mode=request.mode
+        )
         return ExtractResponse(candidates=candidates)
     except ValueError as e:
         raise HTTPException(
@@ -71,23 +232,56 @@ async def extract(
         )
 
 
+@router.post("/pipeline")
+async def extract_and_generate_stream(
+    request: ExtractRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> StreamingResponse:
+    """
+    Extract learning items and generate a card draft for each, streamed over SSE.
+
+    Generation for a candidate starts as soon as extraction yields it. Events:
+    - **candidate**: `{index, text}` when an item is extracted
+    - **draft**: `{index, text, card}` when its card draft is ready
+    - **error**: `{index, text?, detail}` for a failed item (`index` is null if extraction failed)
+    - **done**: `{candidates, drafts, errors}` once everything has finished
+    """
+    pipeline = ExtractionPipelineService(session)
+    provider_value = request.provider.value if request.provider else None
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event, data in pipeline.run(
+            current_user.id, request.text, provider_value, mode=request.mode
+        ):
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
 @router.post("/recommend", response_model=RecommendResponse)
 async def recommend(
     request: RecommendRequest,
     current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
 ) -> RecommendResponse:
     """
     Recommend 5 related phrases or sentences based on a source text.
-    Excludes items already in the user's library.
+
+    Items already in the user's library are excluded on the server, so the
+    client does not need to send its cards.
     """
+    recommendation_service = RecommendationService(session)
     try:
         provider_value = request.provider.value if request.provider else None
-        items = await recommend_related_items(
-            request.text,
-            existing_texts=request.existing_texts,
+        recommendations = await recommendation_service.recommend(
+            user_id=current_user.id,
+            text=request.text,
             provider=provider_value,
+            extra_exclusions=request.existing_texts,
         )
-        recommendations = [GenerateResponse(**item) for item in items]
         return RecommendResponse(recommendations=recommendations)
     except ValueError as e:
         raise HTTPException(
@@ -1,9 +1,14 @@
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends
 from sqlmodel import Session, text
 
 from app.core.database import get_session
+from app.dependencies import CurrentUser
+from app.services.ai_concurrency import ai_scheduler
+from app.services.ai_output import output_stats
+from app.services.ai_routing import model_router
+from app.services.ai_service import AIServiceFactory
 
 router = APIRouter(tags=["Health"])
 
@@ -24,3 +29,19 @@ async def database_health(
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "database": str(e)}
+
+
+@router.get("/health/ai")
+async def ai_health(current_user: CurrentUser) -> dict[str, Any]:
+    """
+    AI provider health, scheduler load and queue times, per-route latency and
+    cost, and how often provider output needed repair.
+
+    Requires authentication, as usage and cost counters are not public.
+    """
+    return {
+        "providers": AIServiceFactory.health(),
+        "scheduler": ai_scheduler.stats(),
+        "routes": model_router.stats(),
+        "output": dict(output_stats),
+    }
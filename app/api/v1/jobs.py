@@ -0,0 +1,163 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.api.idempotency import IdempotentRoute
+from app.core.config import get_settings
+from app.core.database import get_session
+from app.core.sse import SSE_HEADERS, format_sse
+from app.core.text import canonical_text
+from app.dependencies import CurrentUser
+from app.models.job import Job
+from app.schemas.export import ExportJobRequest
+from app.schemas.generate import BatchGenerateRequest, ExtractRequest
+from app.schemas.job import JobList, JobRead, TTSPrewarmRequest
+from app.services.export_artifact_service import ExportArtifactService
+from app.services.job_handlers import export_result
+from app.services.job_service import TERMINAL_STATUSES, JobService
+from app.services.job_worker import job_worker
+
+settings = get_settings()
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], route_class=IdempotentRoute)
+
+
+def _to_read(job: Job) -> JobRead:
+    result = json.loads(job.result_json) if job.result_json else None
+    return JobRead.model_validate(job).model_copy(update={"result": result})
+
+
+def _submit(
+    session: Session, user_id: UUID, kind: str, payload: dict[str, Any], total: int
+) -> JobRead:
+    job = JobService(session).create(user_id=user_id, kind=kind, payload=payload, total=total)
+    job_worker.submit(job.id)
+    return _to_read(job)
+
+
+@router.post("/generate-batch", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_generate_batch(
+    request: BatchGenerateRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> JobRead:
+    """Queue batch card generation; the result has the same shape as `/generate/batch`."""
+    payload = request.model_dump(mode="json")
+    total = len({canonical_text(text) for text in request.texts})
+    return _submit(session, current_user.id, "generate_batch", payload, total)
+
+
+@router.post("/extract", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_extract(
+    request: ExtractRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> JobRead:
+    """Queue extraction from a long document; the result is `{candidates}`."""
+    return _submit(session, current_user.id, "extract", request.model_dump(mode="json"), 1)
+
+
+@router.post("/tts-prewarm", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_tts_prewarm(
+    request: TTSPrewarmRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> JobRead:
+    """Queue TTS synthesis for many texts so later playback is served from cache."""
+    payload = request.model_dump(mode="json")
+    return _submit(session, current_user.id, "tts_prewarm", payload, len(request.texts))
+
+
+@router.post("/export", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_export(
+    request: ExportJobRequest,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> JobRead:
+    """
+    Build an export file in the background; the result has an `artifact_id`
+    and a `download_url` that supports Range requests.
+
+    If the library has not changed since the last export in this format, the
+    job is returned already succeeded with the existing file.
+    """
+    payload = request.model_dump(mode="json")
+    artifact = ExportArtifactService(session).get_current(
+        current_user.id, request.format, request.include_audio
+    )
+    if artifact is None:
+        return _submit(session, current_user.id, "export", payload, 1)
+
+    job_service = JobService(session)
+    job = job_service.create(user_id=current_user.id, kind="export", payload=payload, total=1)
+    job_service.complete(job, export_result(artifact))
+    return _to_read(job)
+
+
+@router.get("", response_model=JobList)
+async def list_jobs(
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> JobList:
+    """List the current user's most recent jobs."""
+    jobs = JobService(session).get_all(user_id=current_user.id)
+    return JobList(items=[_to_read(job) for job in jobs], total=len(jobs))
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(
+    job_id: UUID,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> JobRead:
+    """Get a job's status, progress and (once finished) result."""
+    job = JobService(session).get_by_id(user_id=current_user.id, job_id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return _to_read(job)
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: UUID,
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+) -> StreamingResponse:
+    """
+    Stream a job's progress over SSE.
+
+    Sends a **job** event with the full job whenever its status or progress
+    changes, ending after the job succeeds or fails.
+    """
+    job_service = JobService(session)
+    if not job_service.get_by_id(user_id=current_user.id, job_id=job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        last = None
+        while True:
+            session.expire_all()
+            job = job_service.get_by_id(user_id=current_user.id, job_id=job_id)
+            if job is None:
+                return
+            state = (job.status, job.progress, job.attempts)
+            if state != last:
+                last = state
+                yield format_sse("job", _to_read(job).model_dump(mode="json"))
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(settings.job_poll_interval_seconds)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
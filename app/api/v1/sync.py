@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.dependencies import CurrentUser
+from app.schemas.sync import SyncChanges
+from app.services.sync_service import SyncService
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get("", response_model=SyncChanges)
+async def sync_changes(
+    current_user: CurrentUser,
+    session: Annotated[Session, Depends(get_session)],
+    since: str | None = Query(default=None, description="next_token from the previous sync"),
+    limit: int = Query(default=500, ge=1, le=1000),
+) -> SyncChanges:
+    """
+    Get cards and tags created, updated or deleted since the last sync.
+
+    Without `since`, returns the whole library. Keep calling with
+    `next_token` while `has_more` is true.
+    """
+    try:
+        return SyncService(session).changes(current_user.id, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
@@ -4,12 +4,13 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session
 
+from app.api.idempotency import IdempotentRoute
 from app.core.database import get_session
 from app.dependencies import CurrentUser
 from app.schemas.tag import TagCreate, TagList, TagRead
 from app.services.tag_service import TagService
 
-router = APIRouter(prefix="/tags", tags=["Tags"])
+router = APIRouter(prefix="/tags", tags=["Tags"], route_class=IdempotentRoute)
 
 
 @router.post("", response_model=TagRead, status_code=status.HTTP_201_CREATED)
@@ -32,11 +32,102 @@ class Settings(BaseSettings):
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
 
     # AI Provider Configuration
-    ai_provider: str = "openai"  # "openai" or "gemini"
+    ai_provider: str = "openai"  # "openai", "gemini" or "local" (offline stand-in)
     openai_api_key: str | None = None
     gemini_api_key: str | None = None
 
+    # AI HTTP client (one pooled client per provider, shared across requests)
+    ai_http_timeout_seconds: float = 12.0  # per attempt; retries/fallback share the deadline
+    ai_http_connect_timeout_seconds: float = 5.0
+    ai_http_max_connections: int = 20
+    ai_http_max_keepalive_connections: int = 10
+    ai_http_keepalive_expiry_seconds: float = 30.0
+    ai_http2: bool = False
+
+    # AI resilience: retries, circuit breakers, fallback and hedged requests
+    ai_resilience_enabled: bool = True
+    ai_fallback_enabled: bool = True  # fall back to the other configured provider
+    ai_deadline_seconds: float | None = 30.0  # whole call, incl. retries and fallback
+    ai_retry_attempts: int = 2
+    ai_retry_base_delay_seconds: float = 0.5
+    ai_retry_max_delay_seconds: float = 8.0
+    ai_circuit_failure_threshold: int = 5
+    ai_circuit_reset_seconds: float = 30.0
+    ai_hedge_enabled: bool = False
+    ai_hedge_after_seconds: float | None = None  # None = primary's observed p95 latency
+
+    # Model routing: short, common inputs go to a provider's fast model, the rest
+    # to its strong model. Off means every call uses the provider's default model.
+    ai_routing_enabled: bool = False
+    ai_route_models: dict[str, dict[str, str]] = {
+        "openai": {"fast": "gpt-4o-mini", "strong": "gpt-4o"},
+        "gemini": {"fast": "gemini-1.5-flash", "strong": "gemini-1.5-pro"},
+    }
+    ai_route_fast_max_words: int = 4
+    ai_route_fast_max_chars: int = 40
+    ai_route_fast_max_word_length: int = 12
+    ai_route_extract_fast_max_chars: int = 2000
+    # USD per million (input, output) tokens, for per-route cost in /health/ai
+    ai_model_prices: dict[str, tuple[float, float]] = {
+        "gpt-4o-mini": (0.15, 0.60),
+        "gpt-4o": (2.50, 10.00),
+        "gemini-1.5-flash": (0.075, 0.30),
+        "gemini-1.5-pro": (1.25, 5.00),
+    }
+
+    # AI scheduler: fair queuing across users with per-user request budgets
+    ai_global_concurrency: int = 8
+    ai_user_concurrency: int = 4
+    ai_user_requests_per_minute: float = 120  # 0 disables the per-user budget
+    ai_user_burst: int = 30
+
+    # Long-document extraction (map-reduce over sentence-aligned chunks)
+    extract_chunk_chars: int = 6000
+    extract_chunk_concurrency: int = 10
+    extract_max_candidates: int = 40
+    extract_shortlist_size: int = 60  # phrases the local scorer passes to the LLM
+
+    # Card export: rows fetched per database round trip while streaming
+    export_batch_size: int = 500
+    export_spool_max_bytes: int = 8_388_608  # XLSX files spill to disk past this size
+    export_artifact_dir: str = "./cache/exports"  # finished export job files
+
+    # Card import: rows validated and inserted per chunk (one commit each)
+    import_batch_size: int = 1000
+
+    # Library backup: rows per compressed record batch
+    backup_batch_size: int = 5000
+
+    # Background jobs (in-process worker pool; the jobs table is the queue)
+    job_workers: int = 2
+    job_max_attempts: int = 3
+    job_retry_delay_seconds: float = 5.0
+    job_poll_interval_seconds: float = 1.0  # progress check interval for job SSE
+
+    # Responses to writes sent with an Idempotency-Key, kept for replaying retries
+    idempotency_ttl_seconds: int = 86_400  # 24 hours
+    # How long a request holds its key; a retry can take over a key whose
+    # request died without releasing it once this passes
+    idempotency_lock_seconds: int = 60
+
+    # AI generation cache
+    generation_cache_ttl_seconds: int = 2_592_000  # 30 days
+    generation_cache_memory_size: int = 1024  # entries kept in the in-process LRU
+    # Compute cloze_sentence and tags locally instead of asking the model for them
+    generation_local_fields: bool = False
+    generation_tag_classifier_cache_size: int = 256  # per-user tag classifiers kept in memory
+
+    # Local stand-in providers (ai_provider / tts_provider = "local"), for load testing
+    local_ai_latency_ms: float = 800.0  # median
+    local_ai_latency_p99_ms: float = 2500.0
+    local_ai_error_rate: float = 0.0
+    local_tts_latency_ms: float = 300.0
+    local_tts_latency_p99_ms: float = 1000.0
+    local_tts_error_rate: float = 0.0
+    local_seed: int | None = None
+
     # TTS Configuration
+    tts_provider: str = "openai"  # "openai" or "local"
     tts_voice: str = "alloy"  # OpenAI TTS voice
     tts_model: str = "tts-1-1106"
     tts_cache_max_size_bytes: int = 524_288_000  # 500 MB
@@ -0,0 +1,33 @@
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def create_http_client(
+    base_url: str = "",
+    headers: dict[str, str] | None = None,
+    params: dict[str, str] | None = None,
+) -> httpx.AsyncClient:
+    """
+    Create a long-lived, pooled async HTTP client for outbound API calls.
+
+    The client keeps connections alive between requests so repeated calls
+    skip the TCP/TLS handshake. It must be closed with ``aclose()`` on shutdown.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        params=params,
+        http2=settings.ai_http2,
+        limits=httpx.Limits(
+            max_connections=settings.ai_http_max_connections,
+            max_keepalive_connections=settings.ai_http_max_keepalive_connections,
+            keepalive_expiry=settings.ai_http_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.ai_http_timeout_seconds,
+            connect=settings.ai_http_connect_timeout_seconds,
+        ),
+    )
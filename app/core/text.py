@@ -0,0 +1,71 @@
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT = ".!?。！？;；,，"
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。！？])\s+|\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize learner text for equality lookups.
+
+    Applies NFKC, collapses whitespace, case-folds and strips trailing
+    sentence punctuation, so "Break the ice." and "break  the ice" match.
+    """
+    normalized = unicodedata.normalize("NFKC", text)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip().casefold()
+    return normalized.rstrip(_TRAILING_PUNCT).strip()
+
+
+def canonical_text(text: str) -> str:
+    """
+    Canonicalize text without changing what it says.
+
+    Applies NFC and collapses whitespace only, so case and punctuation (which
+    can change a generated answer) are kept.
+    """
+    collapsed = _WHITESPACE_RE.sub(" ", text).strip()
+    return unicodedata.normalize("NFC", collapsed)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences on sentence-ending punctuation and line breaks."""
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+
+
+def split_into_chunks(text: str, max_chars: int) -> list[str]:
+    """
+    Split text into chunks of at most ``max_chars``, breaking on sentence ends.
+
+    Sentences are packed greedily; a single sentence longer than ``max_chars``
+    is split on whitespace (or hard-cut if it has none).
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces: list[str] = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
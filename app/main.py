@@ -9,6 +9,8 @@ from sqlalchemy.exc import IntegrityError
 from app.api.router import api_router
 from app.core.config import get_settings
 from app.core.database import init_db
+from app.services.ai_service import AIServiceFactory
+from app.services.job_worker import job_worker
 
 settings = get_settings()
 
@@ -19,8 +21,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
     if settings.debug:
         init_db()  # Only auto-create tables in debug mode
+    AIServiceFactory.startup()
+    await job_worker.start()
     yield
-    # Shutdown (cleanup if needed)
+    # Shutdown
+    await job_worker.shutdown()
+    await AIServiceFactory.shutdown()
 
 
 app = FastAPI(
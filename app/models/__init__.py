@@ -1,6 +1,24 @@
 from app.models.audio_cache import AudioCache
 from app.models.card import Card
+from app.models.export_artifact import ExportArtifact
+from app.models.generation_cache import GenerationCache
+from app.models.idempotency_key import IdempotencyKey
+from app.models.job import Job
+from app.models.review_log import ReviewLog
 from app.models.tag import CardTag, Tag
+from app.models.tombstone import Tombstone
 from app.models.user import User
 
-__all__ = ["User", "Card", "Tag", "CardTag", "AudioCache"]
+__all__ = [
+    "User",
+    "Card",
+    "Tag",
+    "CardTag",
+    "AudioCache",
+    "GenerationCache",
+    "Job",
+    "ExportArtifact",
+    "Tombstone",
+    "ReviewLog",
+    "IdempotencyKey",
+]
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -14,6 +15,11 @@ class Card(SQLModel, table=True):
     """Flashcard database model with SRS metadata."""
 
     __tablename__ = "cards"
+    __table_args__ = (
+        Index("ix_cards_user_id_normalized_text", "user_id", "normalized_text"),
+        Index("ix_cards_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_cards_user_id_sync_version", "user_id", "sync_version"),
+    )
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
@@ -32,6 +38,8 @@ class Card(SQLModel, table=True):
     context_sentence: str = Field(max_length=1000)
     context_translation: str = Field(max_length=1000)
     cloze_sentence: str = Field(max_length=1000)
+    # normalize_text(target_text), for duplicate lookups within a user's library
+    normalized_text: str = Field(default="", max_length=500)
 
     # SRS metadata
     interval: int = Field(default=0)  # Days until next review
@@ -41,6 +49,8 @@ class Card(SQLModel, table=True):
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Sync version of the last change, see SyncService
+    sync_version: int = Field(default=0)
 
     # Relationship to tags through the association table
     tags: list["Tag"] = Relationship(
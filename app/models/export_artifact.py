@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class ExportArtifact(SQLModel, table=True):
+    """A finished export file, reused while the library version it was built from is current."""
+
+    __tablename__ = "export_artifacts"
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        index=True,
+    )
+    user_id: uuid.UUID = Field(
+        foreign_key="users.id",
+        index=True,
+    )
+    format: str = Field(max_length=20)  # ExportFormat value
+    version: str = Field(max_length=64)  # library version and export options
+    file_path: str = Field(max_length=255)
+    size_bytes: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
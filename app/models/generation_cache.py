@@ -0,0 +1,26 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class GenerationCache(SQLModel, table=True):
+    """Cached AI card-generation responses, keyed by provider/model/prompt/input."""
+
+    __tablename__ = "generation_cache"
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        index=True,
+    )
+    cache_key: str = Field(max_length=64, unique=True, index=True)
+    provider: str = Field(max_length=50)
+    model: str = Field(max_length=100)
+    prompt_version: str = Field(max_length=20)
+    input_text: str = Field(max_length=5000)
+    response_json: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+    last_accessed_at: datetime = Field(default_factory=datetime.utcnow)
+    hit_count: int = Field(default=0)
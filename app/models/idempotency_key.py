@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """The response to a write sent with an Idempotency-Key, replayed for retries."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),)
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        index=True,
+    )
+    user_id: uuid.UUID = Field(
+        foreign_key="users.id",
+        index=True,
+    )
+    key: str = Field(max_length=255)
+    request_hash: str = Field(max_length=64)  # method, path, query and body
+    status_code: int | None = None  # None while the first request is in progress
+    media_type: str | None = Field(default=None, max_length=100)
+    response_body: bytes | None = None
+    # Lease held while the first request is in progress, None once completed
+    locked_until: datetime | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class Job(SQLModel, table=True):
+    """Background job for long-running AI and TTS work, run by the in-process worker pool."""
+
+    __tablename__ = "jobs"
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        index=True,
+    )
+    user_id: uuid.UUID = Field(
+        foreign_key="users.id",
+        index=True,
+    )
+    kind: str = Field(max_length=50)  # e.g. "generate_batch", "extract", "tts_prewarm"
+    status: str = Field(default="queued", max_length=20, index=True)
+    payload_json: str
+    result_json: str | None = Field(default=None)
+    error: str | None = Field(default=None, max_length=2000)
+    progress: int = Field(default=0)
+    total: int = Field(default=0)
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime | None = Field(default=None)
+    finished_at: datetime | None = Field(default=None)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
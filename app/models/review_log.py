@@ -0,0 +1,20 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class ReviewLog(SQLModel, table=True):
+    """A review replayed from a client's offline log, kept so retries are not applied twice."""
+
+    __tablename__ = "review_logs"
+
+    id: uuid.UUID = Field(primary_key=True)  # generated by the client
+    user_id: uuid.UUID = Field(
+        foreign_key="users.id",
+        index=True,
+    )
+    card_id: uuid.UUID
+    rating: str = Field(max_length=20)  # ReviewRating value
+    reviewed_at: datetime  # client time, clamped to when it was received
+    received_at: datetime = Field(default_factory=datetime.utcnow)
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -27,6 +28,7 @@ class Tag(SQLModel, table=True):
     """Tag database model for categorizing cards."""
 
     __tablename__ = "tags"
+    __table_args__ = (Index("ix_tags_user_id_sync_version", "user_id", "sync_version"),)
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
@@ -39,6 +41,8 @@ class Tag(SQLModel, table=True):
     )
     name: str = Field(max_length=100, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Sync version of the tag's creation, see SyncService
+    sync_version: int = Field(default=0)
 
     # Relationship to cards through the association table
     cards: list["Card"] = Relationship(
@@ -0,0 +1,26 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class Tombstone(SQLModel, table=True):
+    """Record of a deleted card or tag, so sync clients can drop their copy."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_user_id_sync_version", "user_id", "sync_version"),)
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        index=True,
+    )
+    user_id: uuid.UUID = Field(
+        foreign_key="users.id",
+        index=True,
+    )
+    entity: str = Field(max_length=20)  # "card" or "tag"
+    entity_id: uuid.UUID
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+    sync_version: int = Field(default=0)
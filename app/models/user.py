@@ -21,5 +21,7 @@ class User(SQLModel, table=True):
     )
     hashed_password: str = Field(max_length=255)
     is_active: bool = Field(default=True)
+    # Last sync version handed out for this user's cards, tags and tombstones
+    sync_version: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
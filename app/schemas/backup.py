@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class RestoreResult(BaseModel):
+    """Outcome of restoring a library backup."""
+
+    tags_created: int = Field(default=0, description="Tags not already in the library")
+    cards_created: int = 0
+    cards_skipped: int = Field(default=0, description="Cards whose text is already in the library")
+    links_created: int = 0
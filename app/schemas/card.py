@@ -80,3 +80,45 @@ class ReviewRequest(BaseModel):
 
     rating: ReviewRating
 
+
+class ReviewLogEntry(BaseModel):
+    """One review from a client's offline log."""
+
+    id: UUID = Field(description="Client-generated ID; entries already replayed are skipped")
+    card_id: UUID
+    rating: ReviewRating
+    reviewed_at: datetime = Field(description="When the review happened, on the client")
+
+
+class ReviewReplayRequest(BaseModel):
+    """Schema for replaying an offline review log."""
+
+    entries: list[ReviewLogEntry] = Field(max_length=1000)
+
+
+class ReviewReplayResult(BaseModel):
+    """Outcome of replaying a review log, with the cards as they are afterwards."""
+
+    applied: int = 0
+    duplicates: int = Field(default=0, description="Entries already replayed before")
+    missing: int = Field(default=0, description="Entries for cards no longer in the library")
+    cards: list[CardRead] = Field(default_factory=list)
+
+
+class ImportRowError(BaseModel):
+    """A row that could not be imported, by its 1-based row number in the file."""
+
+    row: int
+    message: str
+
+
+class CardImportResult(BaseModel):
+    """Outcome of a bulk card import."""
+
+    total_rows: int = 0
+    created: int = 0
+    skipped: int = Field(default=0, description="Rows whose card is already in the library")
+    failed: int = 0
+    errors: list[ImportRowError] = Field(
+        default_factory=list, description="Row errors, up to the first 1000"
+    )
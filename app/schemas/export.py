@@ -0,0 +1,23 @@
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class ExportFormat(str, Enum):
+    """File formats for card export."""
+
+    CSV = "csv"
+    XLSX = "xlsx"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    APKG = "apkg"
+
+
+class ExportJobRequest(BaseModel):
+    """Request schema for building an export file in the background."""
+
+    format: ExportFormat = ExportFormat.CSV
+    include_audio: bool = Field(
+        False, description="apkg only: attach cached TTS audio for context sentences"
+    )
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Annotated
 
 from pydantic import BaseModel, Field
 
@@ -21,16 +22,31 @@ class GenerateRequest(BaseModel):
     provider: AIProviderEnum | None = Field(
         default=None, description="AI provider to use (defaults to configured provider)"
     )
+    bypass_cache: bool = Field(
+        default=False, description="Skip the generation cache and call the AI provider"
+    )
+
+
+class ExtractMode(str, Enum):
+    """How candidates are extracted from text."""
 
+    LLM = "llm"  # the LLM reads the whole text
+    SHORTLIST = "shortlist"  # local scorer builds a shortlist, the LLM picks from it
+    FAST = "fast"  # local scorer only, no LLM call
 
 
 class ExtractRequest(BaseModel):
     """Request schema for text extraction."""
 
-    text: str = Field(min_length=1, max_length=5000, description="Raw text to extract from")
+    text: str = Field(
+        min_length=1, max_length=100_000, description="Raw text to extract from"
+    )
     provider: AIProviderEnum | None = Field(
         default=None, description="AI provider to use (defaults to configured provider)"
     )
+    mode: ExtractMode = Field(
+        default=ExtractMode.LLM, description="'llm', 'shortlist' or 'fast' (no LLM call)"
+    )
 
 
 class GenerateResponse(BaseModel):
@@ -45,6 +61,37 @@ class GenerateResponse(BaseModel):
     tags: list[str] = Field(description="Suggested tags", default_factory=list)
 
 
+class BatchGenerateRequest(BaseModel):
+    """Request schema for generating several cards at once."""
+
+    texts: list[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(
+        min_length=1, max_length=50, description="Raw phrases or sentences to process"
+    )
+    provider: AIProviderEnum | None = Field(
+        default=None, description="AI provider to use (defaults to configured provider)"
+    )
+    pack_size: int = Field(
+        default=1, ge=1, le=10, description="Number of items packed into one AI prompt"
+    )
+    bypass_cache: bool = Field(
+        default=False, description="Skip the generation cache and call the AI provider"
+    )
+
+
+class BatchGenerateItem(BaseModel):
+    """Result for a single input of a batch generation."""
+
+    text: str = Field(description="The input text")
+    card: GenerateResponse | None = Field(default=None, description="Generated card data")
+    error: str | None = Field(default=None, description="Error message if generation failed")
+
+
+class BatchGenerateResponse(BaseModel):
+    """Response schema for batch generation, in input order."""
+
+    results: list[BatchGenerateItem]
+
+
 class ExtractResponse(BaseModel):
     """Response schema for text extraction."""
 
@@ -56,7 +103,9 @@ class RecommendRequest(BaseModel):
 
     text: str = Field(min_length=1, max_length=500, description="Source phrase or sentence")
     existing_texts: list[str] = Field(
-        default_factory=list, description="Existing library texts to exclude"
+        default_factory=list,
+        max_length=100,
+        description="Deprecated: extra texts to exclude. The user's library is always excluded.",
     )
     provider: AIProviderEnum | None = Field(
         default=None, description="AI provider to use (defaults to configured provider)"
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Annotated, Any
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class JobRead(BaseModel):
+    """Schema for reading a background job (response)."""
+
+    id: UUID
+    kind: str
+    status: str = Field(description="'queued', 'running', 'succeeded' or 'failed'")
+    progress: int
+    total: int
+    attempts: int
+    max_attempts: int
+    result: dict[str, Any] | None = Field(default=None, description="Job output once succeeded")
+    error: str | None = Field(default=None, description="Last error message")
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class JobList(BaseModel):
+    """Schema for list of jobs."""
+
+    items: list[JobRead]
+    total: int
+
+
+class TTSPrewarmRequest(BaseModel):
+    """Request schema for synthesizing and caching audio ahead of playback."""
+
+    texts: list[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        min_length=1, max_length=200, description="Texts to synthesize"
+    )
+    voice: str | None = Field(None, max_length=50, description="Voice to use (default: alloy)")
+    model: str | None = Field(None, max_length=50, description="Model to use (default: tts-1-1106)")
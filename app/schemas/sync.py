@@ -0,0 +1,19 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.schemas.card import CardRead
+from app.schemas.tag import TagRead
+
+
+class SyncChanges(BaseModel):
+    """Cards and tags changed since a sync token, oldest change first."""
+
+    cards: list[CardRead] = Field(default_factory=list, description="Created or updated cards")
+    tags: list[TagRead] = Field(default_factory=list, description="Created tags")
+    deleted_cards: list[UUID] = Field(default_factory=list)
+    deleted_tags: list[UUID] = Field(default_factory=list)
+    next_token: str | None = Field(
+        default=None, description="Pass as `since` on the next sync; null until anything changes"
+    )
+    has_more: bool = Field(default=False, description="More changes are waiting past next_token")
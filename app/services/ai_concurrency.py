@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+from uuid import UUID
+
+from app.core.config import get_settings
+from app.services.ai_resilience import LatencyWindow
+
+settings = get_settings()
+
+
+class TokenBucket:
+    """Request budget refilled at ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before it is really available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def is_full(self) -> bool:
+        elapsed = time.monotonic() - self.updated_at
+        return self.tokens + elapsed * self.rate >= self.capacity
+
+
+class AIScheduler:
+    """
+    In-process scheduler for outbound AI calls.
+
+    Each call first spends a token from the user's bucket (waiting for a
+    refill if the budget is used up), then queues for a concurrency slot.
+    Free slots are handed out round-robin across users with waiting calls,
+    so one user's backlog cannot starve others. A user holds at most
+    ``user_limit`` slots and all users together at most ``global_limit``.
+    """
+
+    def __init__(
+        self,
+        global_limit: int,
+        user_limit: int,
+        requests_per_minute: float = 0,
+        burst: int = 0,
+    ):
+        self.global_limit = global_limit
+        self.user_limit = user_limit
+        self.rate = requests_per_minute / 60
+        self.burst = burst or max(1, user_limit)
+        self.queue_times = LatencyWindow()
+        self._active = 0
+        self._user_active: dict[UUID, int] = {}
+        self._waiting: OrderedDict[UUID, deque[asyncio.Future[None]]] = OrderedDict()
+        self._buckets: dict[UUID, TokenBucket] = {}
+
+    @asynccontextmanager
+    async def slot(self, user_id: UUID) -> AsyncIterator[None]:
+        """Hold one scheduled slot for ``user_id`` for the duration of the block."""
+        queued_at = time.monotonic()
+        await self._spend_budget(user_id)
+        await self._acquire(user_id)
+        self.queue_times.record(time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release(user_id)
+
+    def stats(self) -> dict[str, Any]:
+        """Current load and recent queue times, for the health endpoint."""
+        p50 = self.queue_times.percentile(50)
+        p99 = self.queue_times.percentile(99)
+        return {
+            "active": self._active,
+            "queued": sum(len(waiters) for waiters in self._waiting.values()),
+            "users": len(self._user_active),
+            "queue_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "queue_p99_ms": round(p99 * 1000) if p99 is not None else None,
+        }
+
+    async def _spend_budget(self, user_id: UUID) -> None:
+        if self.rate <= 0:
+            return
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            # Drop buckets that have refilled completely; they carry no state.
+            for idle in [uid for uid, b in self._buckets.items() if b.is_full()]:
+                del self._buckets[idle]
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst)
+        wait = bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _acquire(self, user_id: UUID) -> None:
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(user_id, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled; hand the slot back.
+                self._release(user_id)
+            else:
+                self._discard(user_id, waiter)
+            raise
+
+    def _dispatch(self) -> None:
+        """Grant free slots, one per user per pass, in round-robin order."""
+        while self._active < self.global_limit:
+            granted = False
+            for user_id in list(self._waiting):
+                if self._active >= self.global_limit:
+                    break
+                if self._user_active.get(user_id, 0) >= self.user_limit:
+                    continue
+                waiters = self._waiting[user_id]
+                waiter = waiters.popleft()
+                if not waiters:
+                    del self._waiting[user_id]
+                else:
+                    self._waiting.move_to_end(user_id)
+                if waiter.done():
+                    granted = True
+                    continue
+                self._active += 1
+                self._user_active[user_id] = self._user_active.get(user_id, 0) + 1
+                waiter.set_result(None)
+                granted = True
+            if not granted:
+                break
+
+    def _discard(self, user_id: UUID, waiter: asyncio.Future[None]) -> None:
+        waiters = self._waiting.get(user_id)
+        if waiters is None:
+            return
+        with suppress(ValueError):
+            waiters.remove(waiter)
+        if not waiters:
+            del self._waiting[user_id]
+
+    def _release(self, user_id: UUID) -> None:
+        self._active -= 1
+        self._user_active[user_id] -= 1
+        if self._user_active[user_id] == 0:
+            del self._user_active[user_id]
+        self._dispatch()
+
+
+ai_scheduler = AIScheduler(
+    settings.ai_global_concurrency,
+    settings.ai_user_concurrency,
+    requests_per_minute=settings.ai_user_requests_per_minute,
+    burst=settings.ai_user_burst,
+)
@@ -0,0 +1,177 @@
+import json
+import re
+from collections import Counter
+from typing import Any
+
+from app.schemas.generate import GenerateResponse
+from app.services.card_enrichment import make_cloze
+
+_FENCE_RE = re.compile(r"```[A-Za-z]*\s*(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+CARD_FIELDS = tuple(GenerateResponse.model_fields)
+REQUIRED_CARD_FIELDS = tuple(
+    name for name, info in GenerateResponse.model_fields.items() if info.is_required()
+)
+
+# How provider output was handled: parsed as-is, repaired locally, fixed up by
+# a follow-up prompt, or rejected. Reported by /health/ai.
+output_stats: Counter[str] = Counter()
+
+
+class MalformedOutputError(Exception):
+    """Raised when model output cannot be parsed or repaired into the expected shape."""
+
+
+def _close_structure(text: str) -> list[str]:
+    """
+    Return repair attempts for JSON text with local defects.
+
+    Trailing commas are dropped and, for truncated output, unterminated
+    strings and open objects/arrays are closed. Later attempts also cut the
+    text back to before each of the last few top-level commas, discarding a
+    half-written final member.
+    """
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = escaped = False
+    cuts: list[tuple[int, list[str]]] = []
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            # Drop a trailing comma before a closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+                cuts.pop()
+            if stack:
+                stack.pop()
+        elif char == ",":
+            cuts.append((len(out), list(stack)))
+        out.append(char)
+        if char in "}]" and not stack:
+            break  # the top-level value is complete; ignore anything after it
+
+    closed = "".join(out)
+    if in_string:
+        closed = (closed[:-1] if escaped else closed) + '"'
+    closed = closed.rstrip().rstrip(",")
+    attempts = [closed + "".join(reversed(stack))]
+    for position, open_stack in reversed(cuts[-3:]):
+        attempts.append("".join(out[:position]) + "".join(reversed(open_stack)))
+    return attempts
+
+
+def parse_json_output(content: str) -> Any:
+    """
+    Parse model output as JSON, repairing common defects locally.
+
+    Handles markdown code fences, prose around the JSON, trailing commas and
+    output truncated mid-object. Raises MalformedOutputError if nothing works.
+    """
+    try:
+        result = json.loads(content)
+    except (TypeError, json.JSONDecodeError):
+        pass
+    else:
+        output_stats["ok"] += 1
+        return result
+
+    text = content or ""
+    fence = _FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if starts:
+        text = text[min(starts) :]
+        end = max(text.rfind("}"), text.rfind("]"))
+        candidates = [text[: end + 1]] if end >= 0 else []
+        candidates += _close_structure(text)
+        for candidate in candidates:
+            try:
+                result = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            output_stats["repaired"] += 1
+            return result
+    raise MalformedOutputError("response is not valid JSON")
+
+
+def infer_card_type(target_text: str) -> str:
+    stripped = target_text.strip()
+    if stripped.endswith((".", "!", "?")) or len(stripped.split()) > 6:
+        return "sentence"
+    return "phrase"
+
+
+def repair_card(raw: Any, source_text: str | None = None) -> dict[str, Any]:
+    """
+    Coerce a provider's card object into GenerateResponse fields.
+
+    Unknown keys are dropped and key case is normalized. Values are coerced to
+    strings and ``tags`` to a list of strings. Fields the model left out are
+    filled in where they can be derived locally: ``target_text`` from the
+    input, ``type`` from the target, ``cloze_sentence`` from the context
+    sentence, and ``tags`` as an empty list. Raises MalformedOutputError
+    naming the required fields that are still missing.
+    """
+    if not isinstance(raw, dict):
+        raise MalformedOutputError("card is not a JSON object")
+
+    card: dict[str, Any] = {}
+    for key, value in raw.items():
+        name = str(key).strip().lower()
+        if name not in CARD_FIELDS or value is None:
+            continue
+        if name == "tags":
+            values = value if isinstance(value, list) else [value]
+            card["tags"] = [str(tag).strip() for tag in values if str(tag).strip()]
+        elif isinstance(value, str):
+            card[name] = value.strip()
+        elif not isinstance(value, dict | list):
+            card[name] = str(value)
+
+    if not card.get("target_text") and source_text:
+        card["target_text"] = source_text.strip()
+    card_type = str(card.get("type", "")).lower()
+    if card_type not in ("phrase", "sentence") and card.get("target_text"):
+        card_type = infer_card_type(card["target_text"])
+    if card_type:
+        card["type"] = card_type
+    if not card.get("cloze_sentence") and card.get("target_text") and card.get("context_sentence"):
+        card["cloze_sentence"] = make_cloze(card["target_text"], card["context_sentence"])
+    card.setdefault("tags", [])
+
+    missing = [name for name in REQUIRED_CARD_FIELDS if not card.get(name)]
+    if missing:
+        raise MalformedOutputError(f"card is missing fields: {', '.join(missing)}")
+    return card
+
+
+def repair_candidates(raw: Any) -> list[str]:
+    """Keep the non-empty string candidates, stripped and de-duplicated, in order."""
+    if not isinstance(raw, list):
+        raise MalformedOutputError("candidates is not a list")
+    seen: set[str] = set()
+    candidates: list[str] = []
+    for item in raw:
+        if not isinstance(item, str | int | float):
+            continue
+        text = str(item).strip()
+        if text and text not in seen:
+            seen.add(text)
+            candidates.append(text)
+    return candidates
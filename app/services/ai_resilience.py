@@ -0,0 +1,166 @@
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open."""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a call, with its retries and fallback, runs past its deadline."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for transient provider failures (429/5xx, timeouts, connection errors)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    """Read a numeric Retry-After header from a 429/503 response, if present."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry transient failures with full-jitter exponential backoff."""
+
+    attempts: int = 2  # retries after the first try
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    attempt_timeout: float | None = None  # longest one attempt can take (HTTP read timeout)
+
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        """Seconds to sleep before retry number ``attempt`` (0-based)."""
+        retry_after = _retry_after_seconds(exc) if exc else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def fits(self, delay: float, exc: BaseException, deadline: float) -> bool:
+        """
+        Return True if a retry after ``delay`` can finish before ``deadline``.
+
+        A timed-out attempt is expected to time out again, so it is only
+        retried if a whole ``attempt_timeout`` still fits.
+        """
+        needed = delay
+        if isinstance(exc, httpx.TimeoutException) and self.attempt_timeout is not None:
+            needed += self.attempt_timeout
+        return time.monotonic() + needed < deadline
+
+    async def run(self, call: Callable[[], Awaitable[T]], deadline: float | None = None) -> T:
+        """
+        Run ``call``, retrying retryable errors up to ``attempts`` times.
+
+        With a ``deadline`` (a ``time.monotonic()`` value), a retry that cannot
+        finish in time is skipped and the error raised, leaving the remaining
+        time to the caller (e.g. for a fallback provider).
+        """
+        for attempt in range(self.attempts + 1):
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.attempts or not is_retryable(e):
+                    raise
+                delay = self.delay(attempt, e)
+                if deadline is not None and not self.fits(delay, e, deadline):
+                    raise
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive transient failures, rejects
+    calls for ``reset_timeout`` seconds, then lets a single trial call through
+    (half-open) and closes again if it succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def available(self) -> bool:
+        """Return True if the breaker is not open (does not claim a half-open trial)."""
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        return self.state == self.CLOSED or not self._trial_in_flight
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now, claiming the trial slot when half-open."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot whose call was cancelled or abandoned."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies (seconds) with percentile lookup."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the ``q`` percentile (0-100), or None when there are no samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
@@ -0,0 +1,138 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import get_settings
+from app.services.ai_resilience import LatencyWindow
+
+settings = get_settings()
+
+FAST = "fast"
+STRONG = "strong"
+
+# Operations routed by the length and shape of their input
+GENERATE = "generate"
+EXTRACT = "extract"
+RECOMMEND = "recommend"
+FIXUP = "fixup"  # short follow-up correcting a broken response; always FAST
+
+# Plain dictionary words: letters with an optional apostrophe or hyphen part
+_PLAIN_WORD_RE = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*[.!?,]?")
+
+
+@dataclass(frozen=True)
+class Route:
+    """The tier and model chosen for one AI call."""
+
+    tier: str
+    model: str
+
+
+def is_simple_input(text: str) -> bool:
+    """
+    Return True for short, common phrases that the fast model handles well.
+
+    An input qualifies when it has at most ``ai_route_fast_max_words`` words
+    and ``ai_route_fast_max_chars`` characters, and every word is a plain
+    dictionary-style word no longer than ``ai_route_fast_max_word_length``
+    (no digits, symbols, non-English script or very long rare words).
+    """
+    words = text.split()
+    if not words or len(words) > settings.ai_route_fast_max_words:
+        return False
+    if len(text.strip()) > settings.ai_route_fast_max_chars:
+        return False
+    return all(
+        _PLAIN_WORD_RE.fullmatch(word) and len(word) <= settings.ai_route_fast_max_word_length
+        for word in words
+    )
+
+
+def choose_tier(operation: str, texts: list[str]) -> str:
+    """Pick the model tier for ``operation`` over ``texts`` (all must be simple for FAST)."""
+    if operation == FIXUP:
+        return FAST
+    if operation == EXTRACT:
+        total = sum(len(text) for text in texts)
+        return FAST if total <= settings.ai_route_extract_fast_max_chars else STRONG
+    return FAST if all(is_simple_input(text) for text in texts) else STRONG
+
+
+@dataclass
+class RouteStats:
+    """Running counters for one provider/model route."""
+
+    calls: int = 0
+    failures: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    latencies: LatencyWindow = field(default_factory=LatencyWindow)
+
+    def snapshot(self) -> dict[str, Any]:
+        p50 = self.latencies.percentile(50)
+        p95 = self.latencies.percentile(95)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+
+class ModelRouter:
+    """
+    Chooses a model per AI call and records latency and cost per route.
+
+    With routing disabled every call uses the provider's default model. With
+    it enabled, simple inputs go to the provider's fast model and the rest to
+    its strong model, both taken from settings.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[tuple[str, str, str], RouteStats] = {}
+
+    def route(
+        self, provider_name: str, default_model: str, operation: str, texts: list[str]
+    ) -> Route:
+        """Return the route for one call of ``operation`` on ``provider_name``."""
+        if not settings.ai_routing_enabled:
+            return Route(FAST, default_model)
+        tier = choose_tier(operation, texts)
+        models = settings.ai_route_models.get(provider_name, {})
+        return Route(tier, models.get(tier, default_model))
+
+    def record(
+        self,
+        provider_name: str,
+        route: Route,
+        seconds: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        failed: bool = False,
+    ) -> None:
+        """Record one finished call on ``route``."""
+        stats = self._stats.setdefault((provider_name, route.tier, route.model), RouteStats())
+        stats.calls += 1
+        stats.failures += int(failed)
+        stats.latencies.record(seconds)
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+        input_price, output_price = settings.ai_model_prices.get(route.model, (0.0, 0.0))
+        stats.cost_usd += (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Per-route call counts, token usage, cost and latency, for the health endpoint."""
+        return [
+            {"provider": provider, "tier": tier, "model": model, **stats.snapshot()}
+            for (provider, tier, model), stats in self._stats.items()
+        ]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+model_router = ModelRouter()
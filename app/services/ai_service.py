@@ -1,12 +1,47 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from contextvars import ContextVar
+from typing import Any, TypeVar
 
 import httpx
 
 from app.core.config import get_settings
+from app.core.http import create_http_client
+from app.core.text import canonical_text
+from app.services.ai_output import (
+    REQUIRED_CARD_FIELDS,
+    MalformedOutputError,
+    output_stats,
+    parse_json_output,
+    repair_candidates,
+    repair_card,
+)
+from app.services.ai_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    LatencyWindow,
+    RetryPolicy,
+    is_retryable,
+)
+from app.services.ai_routing import EXTRACT, FIXUP, GENERATE, RECOMMEND, Route, model_router
+from app.services.json_stream import IncrementalJSONParser
+from app.services.simulation import SimulatedFaults
 
 settings = get_settings()
 
+T = TypeVar("T")
+
+# Provider that answered the latest resilient call in this context; differs from
+# the requested provider when the call fell back or was hedged.
+_answered_by: ContextVar[str | None] = ContextVar("ai_answered_by", default=None)
+
 SYSTEM_PROMPT = """You are an intelligent data processor for an English learning app.
 
 Instructions:
@@ -32,12 +67,77 @@ Output format (strict JSON, no markdown):
   "tags": ["tag1"]
 }"""
 
+# Bump whenever SYSTEM_PROMPT changes so cached generations are not reused.
+GENERATE_PROMPT_VERSION = "1"
+
+# Used when generation_local_fields is on: cloze_sentence and tags are computed
+# locally (see card_enrichment), so the model is not asked for them.
+LEAN_SYSTEM_PROMPT = """You are an intelligent data processor for an English learning app.
+
+Instructions:
+1. Analyze input: Is it a "phrase" or "sentence"?
+2. Generate target_meaning (Simplified Chinese).
+3. Generate context_sentence:
+   - If Phrase: Create a natural example sentence using it.
+   - If Sentence: Use input as-is (correct grammar if needed).
+4. Generate context_translation: Translate the full example sentence (Simplified Chinese).
+5. If the type is "phrase", keep target_text in sentence-style casing and do not capitalize
+   the first letter unless capitalization is necessary for a proper noun, acronym, or other
+   valid reason.
+6. Output JSON only.
+
+Output format (strict JSON, no markdown):
+{
+  "type": "phrase" or "sentence",
+  "target_text": "the exact input phrase/sentence",
+  "target_meaning": "Chinese meaning",
+  "context_sentence": "Natural example sentence in English",
+  "context_translation": "Chinese translation of context_sentence"
+}"""
+
+# Bump whenever LEAN_SYSTEM_PROMPT changes.
+LEAN_PROMPT_VERSION = "lean-2"
+
+BATCH_MODE_PROMPT = """
+
+Batch mode:
+The input is a JSON array of phrases/sentences. Apply the instructions above to
+every item independently and return one card per item, in the same order.
+
+Output format (strict JSON, no markdown):
+{
+  "cards": [ <one object in the format above per input item> ]
+}"""
+
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + BATCH_MODE_PROMPT
+LEAN_BATCH_SYSTEM_PROMPT = LEAN_SYSTEM_PROMPT + BATCH_MODE_PROMPT
+
+# Card fields the lean prompt leaves out
+LOCAL_CARD_FIELDS = ("cloze_sentence", "tags")
+
+
+def generate_prompts() -> tuple[str, str]:
+    """Return the (single, batch) card generation prompts for the configured mode."""
+    if settings.generation_local_fields:
+        return LEAN_SYSTEM_PROMPT, LEAN_BATCH_SYSTEM_PROMPT
+    return SYSTEM_PROMPT, BATCH_SYSTEM_PROMPT
+
+
+def generate_prompt_version() -> str:
+    """Version of the active generation prompt, for generation cache keys."""
+    if settings.generation_local_fields:
+        return LEAN_PROMPT_VERSION
+    return GENERATE_PROMPT_VERSION
+
+
 RECOMMEND_SYSTEM_PROMPT = """You are an expert English language tutor.
 
 Instructions:
-1. Given a source phrase or sentence, generate exactly 5 related but different phrases or sentences that would be useful for an English learner.
+1. Given a source phrase or sentence, generate exactly the requested number of related but
+   different phrases or sentences that would be useful for an English learner.
 2. "Related" means thematically similar, commonly used in the same context, or naturally associated (e.g., collocations, synonyms, related idioms, phrases from the same topic).
-3. Do NOT generate any phrase or sentence that appears in the "existing" list provided.
+3. Do NOT generate the source itself or any phrase or sentence that appears in the "avoid"
+   list provided.
 4. For each recommendation, provide full structured data.
 5. Output JSON only.
 
@@ -76,243 +176,980 @@ Output format (strict JSON):
 }"""
 
 
+FIXUP_SYSTEM_PROMPT = """You fix JSON responses for an English learning app.
+
+The input describes a problem and contains a previous response that has it.
+Return the corrected response as strict JSON (no markdown). Keep every valid
+value unchanged and only fix or fill in what the problem describes."""
+
+
 class AIProvider(ABC):
     """Abstract base class for AI providers."""
 
+    client: httpx.AsyncClient
+    name = ""
+    model = ""
+
+    def _route(self, operation: str, *texts: str) -> Route:
+        """Choose the model for one call (see ModelRouter)."""
+        return model_router.route(self.name, self.model, operation, list(texts))
+
     @abstractmethod
     async def generate(self, text: str) -> dict[str, Any]:
         """Generate card data from raw text input."""
         pass
 
+    @abstractmethod
+    async def generate_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        """Generate card data for several inputs in a single prompt."""
+        pass
+
     @abstractmethod
     async def extract_candidates(self, text: str) -> list[str]:
         """Extract learning candidates from text."""
         pass
 
     @abstractmethod
-    async def recommend(self, text: str, existing_texts: list[str]) -> list[dict[str, Any]]:
-        """Recommend related phrases/sentences not in existing library."""
+    async def recommend(
+        self, text: str, existing_texts: list[str], count: int = 5
+    ) -> list[dict[str, Any]]:
+        """Recommend ``count`` related phrases/sentences, avoiding ``existing_texts``."""
         pass
 
+    async def fix_up(self, broken: str, problem: str) -> Any:
+        """
+        Ask the model to correct one broken response and return the parsed JSON.
+
+        This is a short follow-up prompt, used only after local repair has
+        failed. It is cheaper than repeating the original request.
+        """
+        raise MalformedOutputError(problem)
+
+    async def stream_candidates(self, text: str) -> AsyncGenerator[str, None]:
+        """Yield learning candidates as they become known."""
+        for candidate in await self.extract_candidates(text):
+            yield candidate
+
+    async def stream_generate(self, text: str) -> AsyncGenerator[tuple[str, Any], None]:
+        """Yield ``(field, value)`` pairs of the generated card as each field completes."""
+        for key, value in (await self.generate(text)).items():
+            yield key, value
+
+    async def aclose(self) -> None:
+        """Close the provider's pooled HTTP client."""
+        await self.client.aclose()
+
+
+async def _stream_fields(chunks: AsyncIterator[str]) -> AsyncIterator[tuple[str, Any]]:
+    """Turn streamed JSON text into completed top-level ``(field, value)`` pairs."""
+    parser = IncrementalJSONParser()
+    async for chunk in chunks:
+        for _, key, value in parser.feed(chunk):
+            yield key, value
+
+
+async def _stream_items(chunks: AsyncIterator[str], array_key: str) -> AsyncIterator[Any]:
+    """Turn streamed JSON text into the elements of one top-level array, as they complete."""
+    parser = IncrementalJSONParser(array_key=array_key)
+    async for chunk in chunks:
+        for kind, _, value in parser.feed(chunk):
+            if kind == "item":
+                yield value
+
+
+def _json_list(result: Any, key: str) -> list[Any]:
+    """Read the list under ``key`` from a JSON response, accepting a bare array too."""
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict) and isinstance(result.get(key), list):
+        return result[key]
+    return []
+
+
+def _fix_up_user_content(broken: str, problem: str) -> str:
+    return f"Problem: {problem}\n\nPrevious response:\n{broken}"
+
+
+async def _parse_or_fix_up(provider: "AIProvider", content: str, fix_up: bool) -> Any:
+    """Parse model output, falling back to one fix-up prompt if local repair fails."""
+    try:
+        return parse_json_output(content)
+    except MalformedOutputError as e:
+        if not fix_up:
+            output_stats["failed"] += 1
+            raise
+        output_stats["fixup"] += 1
+        return await provider.fix_up(content, str(e))
+
+
+def _recommend_user_content(text: str, existing_texts: list[str], count: int) -> str:
+    """Build the user message for a recommendation request."""
+    content = f"Source: {text}\nNumber of recommendations: {count}"
+    if existing_texts:
+        content += "\n\nAvoid (do not repeat these):\n" + "\n".join(
+            f"- {t}" for t in existing_texts
+        )
+    return content
+
 
 class OpenAIProvider(AIProvider):
     """OpenAI API provider."""
 
-    def __init__(self, api_key: str):
+    name = "openai"
+    model = "gpt-4o-mini"
+
+    def __init__(self, api_key: str, client: httpx.AsyncClient | None = None):
         self.api_key = api_key
         self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.client = client or create_http_client(
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+        )
 
-    async def generate(self, text: str) -> dict[str, Any]:
-        """Generate card data using OpenAI API."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+    def _payload(
+        self, system_prompt: str, user_content: str, temperature: float, model: str
+    ) -> dict[str, Any]:
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            "temperature": temperature,
+            "response_format": {"type": "json_object"},
+        }
+
+    @staticmethod
+    def _usage(data: dict[str, Any]) -> tuple[int, int]:
+        usage = data.get("usage") or {}
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    async def _chat(
+        self,
+        system_prompt: str,
+        user_content: str,
+        temperature: float,
+        route: Route,
+        fix_up: bool = True,
+    ) -> Any:
+        """Send one JSON-mode chat completion and return the parsed content."""
+        started = time.monotonic()
+        try:
+            response = await self.client.post(
                 self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": text},
-                    ],
-                    "temperature": 0.7,
-                    "response_format": {"type": "json_object"},
-                },
-                timeout=30.0,
+                json=self._payload(system_prompt, user_content, temperature, route.model),
             )
             response.raise_for_status()
-            data = response.json()
-            import json
+        except Exception:
+            model_router.record(self.name, route, time.monotonic() - started, failed=True)
+            raise
+        data = response.json()
+        model_router.record(self.name, route, time.monotonic() - started, *self._usage(data))
+        content = data["choices"][0]["message"]["content"]
+        return await _parse_or_fix_up(self, content, fix_up)
+
+    async def _stream_chat(
+        self, system_prompt: str, user_content: str, temperature: float, route: Route
+    ) -> AsyncIterator[str]:
+        """Stream a JSON-mode chat completion, yielding content deltas."""
+        payload = {
+            **self._payload(system_prompt, user_content, temperature, route.model),
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        started = time.monotonic()
+        usage = (0, 0)
+        try:
+            async with self.client.stream("POST", self.api_url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    if event.get("usage"):
+                        usage = self._usage(event)
+                    choices = event.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        except Exception:
+            model_router.record(self.name, route, time.monotonic() - started, failed=True)
+            raise
+        model_router.record(self.name, route, time.monotonic() - started, *usage)
+
+    async def fix_up(self, broken: str, problem: str) -> Any:
+        """Correct a broken response with a short OpenAI fix-up request."""
+        return await self._chat(
+            FIXUP_SYSTEM_PROMPT,
+            _fix_up_user_content(broken, problem),
+            temperature=0.0,
+            route=self._route(FIXUP),
+            fix_up=False,
+        )
+
+    async def generate(self, text: str) -> dict[str, Any]:
+        """Generate card data using OpenAI API."""
+        route = self._route(GENERATE, text)
+        return await self._chat(generate_prompts()[0], text, temperature=0.7, route=route)
 
-            content = data["choices"][0]["message"]["content"]
-            return json.loads(content)
+    async def generate_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        """Generate card data for several inputs using one OpenAI request."""
+        user_content = json.dumps(texts, ensure_ascii=False)
+        route = self._route(GENERATE, *texts)
+        result = await self._chat(generate_prompts()[1], user_content, temperature=0.7, route=route)
+        return _json_list(result, "cards")
 
     async def extract_candidates(self, text: str) -> list[str]:
         """Extract candidates using OpenAI API."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {"role": "system", "content": EXTRACT_SYSTEM_PROMPT},
-                        {"role": "user", "content": text},
-                    ],
-                    "temperature": 0.5,
-                    "response_format": {"type": "json_object"},
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            import json
+        route = self._route(EXTRACT, text)
+        result = await self._chat(EXTRACT_SYSTEM_PROMPT, text, temperature=0.5, route=route)
+        return repair_candidates(_json_list(result, "candidates"))
 
-            content = data["choices"][0]["message"]["content"]
-            result = json.loads(content)
-            return result.get("candidates", [])
+    async def stream_candidates(self, text: str) -> AsyncGenerator[str, None]:
+        """Stream candidates from OpenAI, yielding each as soon as it is complete."""
+        route = self._route(EXTRACT, text)
+        chunks = self._stream_chat(EXTRACT_SYSTEM_PROMPT, text, temperature=0.5, route=route)
+        async for candidate in _stream_items(chunks, "candidates"):
+            yield candidate
 
+    async def stream_generate(self, text: str) -> AsyncGenerator[tuple[str, Any], None]:
+        """Stream card fields from OpenAI as each one is complete."""
+        route = self._route(GENERATE, text)
+        chunks = self._stream_chat(generate_prompts()[0], text, temperature=0.7, route=route)
+        async for field in _stream_fields(chunks):
+            yield field
 
-    async def recommend(self, text: str, existing_texts: list[str]) -> list[dict[str, Any]]:
+    async def recommend(
+        self, text: str, existing_texts: list[str], count: int = 5
+    ) -> list[dict[str, Any]]:
         """Recommend related phrases using OpenAI API."""
-        user_content = f"Source: {text}\n\nExisting (do not repeat these):\n" + "\n".join(
-            f"- {t}" for t in existing_texts
+        user_content = _recommend_user_content(text, existing_texts, count)
+        route = self._route(RECOMMEND, text)
+        result = await self._chat(
+            RECOMMEND_SYSTEM_PROMPT, user_content, temperature=0.8, route=route
         )
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {"role": "system", "content": RECOMMEND_SYSTEM_PROMPT},
-                        {"role": "user", "content": user_content},
-                    ],
-                    "temperature": 0.8,
-                    "response_format": {"type": "json_object"},
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            import json
-
-            content = data["choices"][0]["message"]["content"]
-            result = json.loads(content)
-            return result.get("recommendations", [])
+        return _json_list(result, "recommendations")
 
 
 class GeminiProvider(AIProvider):
     """Google Gemini API provider."""
 
-    def __init__(self, api_key: str):
+    name = "gemini"
+    model = "gemini-1.5-flash"
+    base_url = "https://generativelanguage.googleapis.com/v1beta/models"
+
+    def __init__(self, api_key: str, client: httpx.AsyncClient | None = None):
         self.api_key = api_key
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+        self.client = client or create_http_client(
+            headers={"Content-Type": "application/json"},
+            params={"key": api_key},
+        )
 
-    async def generate(self, text: str) -> dict[str, Any]:
-        """Generate card data using Gemini API."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}?key={self.api_key}",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "contents": [
-                        {
-                            "parts": [
-                                {"text": f"{SYSTEM_PROMPT}\n\nInput: {text}"},
-                            ]
-                        }
-                    ],
-                    "generationConfig": {
-                        "temperature": 0.7,
-                        "responseMimeType": "application/json",
-                    },
-                },
-                timeout=30.0,
+    def _payload(self, system_prompt: str, user_content: str, temperature: float) -> dict[str, Any]:
+        return {
+            "contents": [
+                {
+                    "parts": [
+                        {"text": f"{system_prompt}\n\n{user_content}"},
+                    ]
+                }
+            ],
+            "generationConfig": {
+                "temperature": temperature,
+                "responseMimeType": "application/json",
+            },
+        }
+
+    @staticmethod
+    def _usage(data: dict[str, Any]) -> tuple[int, int]:
+        usage = data.get("usageMetadata") or {}
+        return usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0)
+
+    async def _chat(
+        self,
+        system_prompt: str,
+        user_content: str,
+        temperature: float,
+        route: Route,
+        fix_up: bool = True,
+    ) -> Any:
+        """Send one JSON-mode generateContent request and return the parsed content."""
+        started = time.monotonic()
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/{route.model}:generateContent",
+                json=self._payload(system_prompt, user_content, temperature),
             )
             response.raise_for_status()
-            data = response.json()
-            import json
+        except Exception:
+            model_router.record(self.name, route, time.monotonic() - started, failed=True)
+            raise
+        data = response.json()
+        model_router.record(self.name, route, time.monotonic() - started, *self._usage(data))
+        content = data["candidates"][0]["content"]["parts"][0]["text"]
+        return await _parse_or_fix_up(self, content, fix_up)
+
+    async def _stream_chat(
+        self, system_prompt: str, user_content: str, temperature: float, route: Route
+    ) -> AsyncIterator[str]:
+        """Stream a JSON-mode streamGenerateContent request, yielding text deltas."""
+        started = time.monotonic()
+        usage = (0, 0)
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/{route.model}:streamGenerateContent",
+                params={"alt": "sse"},
+                json=self._payload(system_prompt, user_content, temperature),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = json.loads(line[len("data:") :])
+                    if data.get("usageMetadata"):
+                        usage = self._usage(data)
+                    for candidate in data.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+        except Exception:
+            model_router.record(self.name, route, time.monotonic() - started, failed=True)
+            raise
+        model_router.record(self.name, route, time.monotonic() - started, *usage)
+
+    async def fix_up(self, broken: str, problem: str) -> Any:
+        """Correct a broken response with a short Gemini fix-up request."""
+        return await self._chat(
+            FIXUP_SYSTEM_PROMPT,
+            _fix_up_user_content(broken, problem),
+            temperature=0.0,
+            route=self._route(FIXUP),
+            fix_up=False,
+        )
+
+    async def generate(self, text: str) -> dict[str, Any]:
+        """Generate card data using Gemini API."""
+        route = self._route(GENERATE, text)
+        return await self._chat(
+            generate_prompts()[0], f"Input: {text}", temperature=0.7, route=route
+        )
 
-            content = data["candidates"][0]["content"]["parts"][0]["text"]
-            return json.loads(content)
+    async def generate_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        """Generate card data for several inputs using one Gemini request."""
+        user_content = f"Input: {json.dumps(texts, ensure_ascii=False)}"
+        route = self._route(GENERATE, *texts)
+        result = await self._chat(generate_prompts()[1], user_content, temperature=0.7, route=route)
+        return _json_list(result, "cards")
 
     async def extract_candidates(self, text: str) -> list[str]:
         """Extract candidates using Gemini API."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}?key={self.api_key}",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "contents": [
-                        {
-                            "parts": [
-                                {"text": f"{EXTRACT_SYSTEM_PROMPT}\n\nInput: {text}"},
-                            ]
-                        }
-                    ],
-                    "generationConfig": {
-                        "temperature": 0.5,
-                        "responseMimeType": "application/json",
-                    },
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            import json
-
-            content = data["candidates"][0]["content"]["parts"][0]["text"]
-            result = json.loads(content)
-            return result.get("candidates", [])
+        route = self._route(EXTRACT, text)
+        result = await self._chat(
+            EXTRACT_SYSTEM_PROMPT, f"Input: {text}", temperature=0.5, route=route
+        )
+        return repair_candidates(_json_list(result, "candidates"))
 
+    async def stream_candidates(self, text: str) -> AsyncGenerator[str, None]:
+        """Stream candidates from Gemini, yielding each as soon as it is complete."""
+        route = self._route(EXTRACT, text)
+        chunks = self._stream_chat(
+            EXTRACT_SYSTEM_PROMPT, f"Input: {text}", temperature=0.5, route=route
+        )
+        async for candidate in _stream_items(chunks, "candidates"):
+            yield candidate
 
+    async def stream_generate(self, text: str) -> AsyncGenerator[tuple[str, Any], None]:
+        """Stream card fields from Gemini as each one is complete."""
+        route = self._route(GENERATE, text)
+        chunks = self._stream_chat(
+            generate_prompts()[0], f"Input: {text}", temperature=0.7, route=route
+        )
+        async for field in _stream_fields(chunks):
+            yield field
 
-    async def recommend(self, text: str, existing_texts: list[str]) -> list[dict[str, Any]]:
+    async def recommend(
+        self, text: str, existing_texts: list[str], count: int = 5
+    ) -> list[dict[str, Any]]:
         """Recommend related phrases using Gemini API."""
-        user_content = f"Source: {text}\n\nExisting (do not repeat these):\n" + "\n".join(
-            f"- {t}" for t in existing_texts
+        user_content = _recommend_user_content(text, existing_texts, count)
+        route = self._route(RECOMMEND, text)
+        result = await self._chat(
+            RECOMMEND_SYSTEM_PROMPT, user_content, temperature=0.8, route=route
         )
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}?key={self.api_key}",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "contents": [
-                        {
-                            "parts": [
-                                {"text": f"{RECOMMEND_SYSTEM_PROMPT}\n\n{user_content}"},
-                            ]
-                        }
-                    ],
-                    "generationConfig": {
-                        "temperature": 0.8,
-                        "responseMimeType": "application/json",
-                    },
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            import json
+        return _json_list(result, "recommendations")
 
-            content = data["candidates"][0]["content"]["parts"][0]["text"]
-            result = json.loads(content)
-            return result.get("recommendations", [])
 
+TAG_OPTIONS = [
+    "sport", "travel", "life", "health", "shopping", "food", "people", "work", "weather", "tech",
+]
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]?")
 
-class AIServiceFactory:
-    """Factory for creating AI provider instances."""
+
+class LocalAIProvider(AIProvider):
+    """
+    Deterministic offline provider for load testing and benchmarks.
+
+    Returns well-formed data derived only from the input, after a simulated
+    latency, and fails with a simulated HTTP error at the configured rate.
+    Streaming methods spread the latency over the streamed fields or items.
+    """
+
+    name = "local"
+    model = "local-sim"
+    url = "local://ai"
+
+    def __init__(self, faults: SimulatedFaults | None = None):
+        self.faults = faults or SimulatedFaults(
+            latency_ms=settings.local_ai_latency_ms,
+            latency_p99_ms=settings.local_ai_latency_p99_ms,
+            error_rate=settings.local_ai_error_rate,
+            seed=settings.local_seed,
+        )
+
+    @staticmethod
+    def card_for(text: str) -> dict[str, Any]:
+        """Build the card the local provider returns for ``text``."""
+        target = text.strip()
+        digest = hashlib.sha256(target.casefold().encode()).digest()
+        is_sentence = target.endswith((".", "!", "?")) or len(target.split()) > 6
+        context = target if is_sentence else f"Here is an example with {target}."
+        return {
+            "type": "sentence" if is_sentence else "phrase",
+            "target_text": target,
+            "target_meaning": f"（模拟释义）{target}",
+            "context_sentence": context,
+            "context_translation": "（模拟翻译）这是一个例句。",
+            "cloze_sentence": context.replace(target, "_______", 1),
+            "tags": [TAG_OPTIONS[digest[0] % len(TAG_OPTIONS)]],
+        }
+
+    def _generated_card(self, text: str) -> dict[str, Any]:
+        card = self.card_for(text)
+        if settings.generation_local_fields:
+            for key in LOCAL_CARD_FIELDS:
+                del card[key]
+        return card
+
+    async def generate(self, text: str) -> dict[str, Any]:
+        await self.faults.simulate(self.url)
+        return self._generated_card(text)
+
+    async def generate_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        await self.faults.simulate(self.url)
+        return [self._generated_card(text) for text in texts]
 
     @staticmethod
-    def create(provider: str | None = None) -> AIProvider:
-        """Create an AI provider instance based on configuration."""
+    def _candidates(text: str) -> list[str]:
+        candidates: list[str] = []
+        for match in _SENTENCE_RE.finditer(text):
+            sentence = match.group().strip()
+            if sentence and sentence not in candidates:
+                candidates.append(sentence[:500])
+        return candidates[:20]
+
+    async def extract_candidates(self, text: str) -> list[str]:
+        await self.faults.simulate(self.url)
+        return self._candidates(text)
+
+    async def recommend(
+        self, text: str, existing_texts: list[str], count: int = 5
+    ) -> list[dict[str, Any]]:
+        await self.faults.simulate(self.url)
+        avoid = {t.casefold() for t in existing_texts}
+        items: list[dict[str, Any]] = []
+        index = 1
+        while len(items) < count:
+            candidate = f"{text.strip()} (related {index})"
+            index += 1
+            if candidate.casefold() not in avoid:
+                items.append(self.card_for(candidate))
+        return items
+
+    async def stream_candidates(self, text: str) -> AsyncGenerator[str, None]:
+        candidates = self._candidates(text)
+        step = self.faults.sample_latency() / max(1, len(candidates))
+        self.faults.maybe_fail(self.url)
+        for candidate in candidates:
+            await asyncio.sleep(step)
+            yield candidate
+
+    async def stream_generate(self, text: str) -> AsyncGenerator[tuple[str, Any], None]:
+        card = self._generated_card(text)
+        step = self.faults.sample_latency() / len(card)
+        self.faults.maybe_fail(self.url)
+        for key, value in card.items():
+            await asyncio.sleep(step)
+            yield key, value
+
+    async def aclose(self) -> None:
+        """Nothing to close; the local provider has no HTTP client."""
+
+
+class ResilientProvider(AIProvider):
+    """
+    Wraps a primary provider with retries, circuit breakers and a fallback.
+
+    Transient failures (429/5xx, timeouts) are retried with jittered backoff.
+    Each provider has a circuit breaker; when the primary's is open, or its
+    retries are exhausted, the fallback provider is used. With hedging on, a
+    second request goes to the fallback if the primary has not answered within
+    the hedge delay (a fixed setting or the primary's observed p95 latency),
+    and the first successful answer wins. An overall deadline caps the whole
+    call: retries that cannot finish in time are skipped so the fallback gets
+    the remaining time. Streams fall back only before their first item.
+    """
+
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_DEFAULT_DELAY = 5.0
+
+    def __init__(
+        self,
+        primary_name: str,
+        primary: AIProvider,
+        fallback_name: str | None,
+        fallback: AIProvider | None,
+        breakers: dict[str, CircuitBreaker],
+        latencies: dict[str, LatencyWindow],
+        retry_policy: RetryPolicy | None = None,
+        hedge_enabled: bool = False,
+        hedge_after_seconds: float | None = None,
+        deadline_seconds: float | None = None,
+    ):
+        self.primary_name = primary_name
+        self.primary = primary
+        self.fallback_name = fallback_name
+        self.fallback = fallback
+        self.breakers = breakers
+        self.latencies = latencies
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_enabled = hedge_enabled
+        self.hedge_after_seconds = hedge_after_seconds
+        self.deadline_seconds = deadline_seconds
+
+    @property
+    def client(self) -> httpx.AsyncClient:  # type: ignore[override]
+        return self.primary.client
+
+    @property
+    def model(self) -> str:
+        return str(getattr(self.primary, "model", ""))
+
+    def _candidates(self) -> list[tuple[str, AIProvider]]:
+        """Providers to try, in order, whose circuit breakers currently allow calls."""
+        candidates = [(self.primary_name, self.primary)]
+        if self.fallback_name and self.fallback:
+            candidates.append((self.fallback_name, self.fallback))
+        return [(name, p) for name, p in candidates if self.breakers[name].available()]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary before hedging to the fallback."""
+        if self.hedge_after_seconds is not None:
+            return self.hedge_after_seconds
+        window = self.latencies[self.primary_name]
+        if len(window) >= self.HEDGE_MIN_SAMPLES:
+            return window.percentile(95) or self.HEDGE_DEFAULT_DELAY
+        return self.HEDGE_DEFAULT_DELAY
+
+    async def _attempt(
+        self,
+        name: str,
+        provider: AIProvider,
+        operation: Callable[[AIProvider], Awaitable[T]],
+        deadline: float | None = None,
+    ) -> T:
+        """Call one provider with retries, feeding its breaker and latency window."""
+        breaker = self.breakers[name]
+
+        async def call() -> T:
+            if not breaker.allow():
+                raise CircuitOpenError(f"AI provider '{name}' is temporarily unavailable")
+            start = time.monotonic()
+            try:
+                result = await operation(provider)
+            except Exception as e:
+                # Only transient failures count against the provider's health
+                if is_retryable(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            except BaseException:
+                # Cancelled (deadline, losing hedge, client gone): free a half-open trial
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            self.latencies[name].record(time.monotonic() - start)
+            return result
+
+        return await self.retry_policy.run(call, deadline)
+
+    async def _hedged(
+        self,
+        candidates: list[tuple[str, AIProvider]],
+        operation: Callable[[AIProvider], Awaitable[T]],
+        deadline: float | None = None,
+    ) -> T:
+        """Race the primary against a delayed request to the fallback."""
+        (primary_name, primary), (fallback_name, fallback) = candidates[:2]
+        primary_task = asyncio.create_task(
+            self._attempt(primary_name, primary, operation, deadline)
+        )
+        names = {primary_task: primary_name}
+        try:
+            done, _ = await asyncio.wait(names, timeout=self.hedge_delay())
+            if not done or primary_task.exception() is not None:
+                hedge = asyncio.create_task(
+                    self._attempt(fallback_name, fallback, operation, deadline)
+                )
+                names[hedge] = fallback_name
+
+            last_error: BaseException | None = None
+            pending = set(names)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        _answered_by.set(names[task])
+                        return task.result()
+                    last_error = task.exception()
+            assert last_error is not None
+            raise last_error
+        finally:
+            for task in names:
+                task.cancel()
+
+    def _deadline(self) -> float | None:
+        """Monotonic time by which a call started now must finish, if capped."""
+        if self.deadline_seconds is None:
+            return None
+        return time.monotonic() + self.deadline_seconds
+
+    async def _call(self, operation: Callable[[AIProvider], Awaitable[T]]) -> T:
+        _answered_by.set(None)
+        candidates = self._candidates()
+        if not candidates:
+            raise CircuitOpenError("All AI providers are temporarily unavailable")
+
+        deadline = self._deadline()
+        try:
+            async with asyncio.timeout(self.deadline_seconds):
+                if self.hedge_enabled and len(candidates) > 1:
+                    return await self._hedged(candidates, operation, deadline)
+                return await self._fall_through(candidates, operation, deadline)
+        except TimeoutError as e:
+            raise DeadlineExceededError(
+                f"AI request did not finish within {self.deadline_seconds:g}s"
+            ) from e
+
+    async def _fall_through(
+        self,
+        candidates: list[tuple[str, AIProvider]],
+        operation: Callable[[AIProvider], Awaitable[T]],
+        deadline: float | None,
+    ) -> T:
+        """Try each candidate in turn, returning the first successful answer."""
+        last_error: Exception | None = None
+        for name, provider in candidates:
+            try:
+                result = await self._attempt(name, provider, operation, deadline)
+            except Exception as e:
+                last_error = e
+                continue
+            _answered_by.set(name)
+            return result
+        assert last_error is not None
+        raise last_error
+
+    async def generate(self, text: str) -> dict[str, Any]:
+        return await self._call(lambda p: p.generate(text))
+
+    async def generate_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        return await self._call(lambda p: p.generate_many(texts))
+
+    async def extract_candidates(self, text: str) -> list[str]:
+        return await self._call(lambda p: p.extract_candidates(text))
+
+    async def recommend(
+        self, text: str, existing_texts: list[str], count: int = 5
+    ) -> list[dict[str, Any]]:
+        return await self._call(lambda p: p.recommend(text, existing_texts, count))
+
+    async def fix_up(self, broken: str, problem: str) -> Any:
+        return await self._call(lambda p: p.fix_up(broken, problem))
+
+    async def _stream(
+        self, operation: Callable[[AIProvider], AsyncGenerator[T, None]]
+    ) -> AsyncGenerator[T, None]:
+        """
+        Stream from the first provider whose breaker allows it.
+
+        A provider that fails before yielding anything falls through to the
+        next one while the deadline allows; once items have been yielded the
+        error is raised, as the stream cannot be restarted mid-way.
+        """
+        _answered_by.set(None)
+        candidates = self._candidates()
+        if not candidates:
+            raise CircuitOpenError("All AI providers are temporarily unavailable")
+
+        deadline = self._deadline()
+        last_error: Exception | None = None
+        for name, provider in candidates:
+            if last_error is not None and deadline is not None and time.monotonic() >= deadline:
+                break
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                last_error = CircuitOpenError(f"AI provider '{name}' is temporarily unavailable")
+                continue
+            _answered_by.set(name)
+            started = settled = False
+            try:
+                async with aclosing(operation(provider)) as items:
+                    async for item in items:
+                        started = True
+                        yield item
+                settled = True
+                breaker.record_success()
+                return
+            except Exception as e:
+                settled = True
+                if is_retryable(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if started:
+                    raise
+                last_error = e
+            finally:
+                if not settled:
+                    # Cancelled or closed early (GeneratorExit): free a half-open trial
+                    breaker.release_trial()
+        assert last_error is not None
+        raise last_error
+
+    async def stream_candidates(self, text: str) -> AsyncGenerator[str, None]:
+        async with aclosing(self._stream(lambda p: p.stream_candidates(text))) as candidates:
+            async for candidate in candidates:
+                yield candidate
+
+    async def stream_generate(self, text: str) -> AsyncGenerator[tuple[str, Any], None]:
+        async with aclosing(self._stream(lambda p: p.stream_generate(text))) as fields:
+            async for field in fields:
+                yield field
+
+    async def aclose(self) -> None:
+        """No-op: the wrapped providers are closed by AIServiceFactory.shutdown()."""
+
+
+PROVIDER_CLASSES: dict[str, type[AIProvider]] = {
+    "openai": OpenAIProvider,
+    "gemini": GeminiProvider,
+    "local": LocalAIProvider,
+}
+
+
+def resolve_provider_name(provider: str | None = None) -> str:
+    """Return the provider name to use, falling back to the configured default."""
+    return provider or settings.ai_provider
+
+
+def answering_provider_name(provider: str | None = None) -> str:
+    """
+    Return the provider that answered the latest AI call made in this context.
+
+    This is the requested provider unless the resilience layer fell back or
+    hedged to another one; cache answers under the provider that gave them.
+    """
+    return _answered_by.get() or resolve_provider_name(provider)
+
+
+def get_provider_model(provider: str | None = None, text: str | None = None) -> str:
+    """
+    Return the model name used by a provider, without instantiating it.
+
+    Pass ``text`` to get the model that card generation for that input is
+    routed to, so generation cache keys follow model routing.
+    """
+    provider_name = resolve_provider_name(provider)
+    if provider_name not in PROVIDER_CLASSES:
+        raise ValueError(f"Unknown AI provider: {provider_name}")
+    default_model = PROVIDER_CLASSES[provider_name].model
+    if text is None:
+        return default_model
+    return model_router.route(provider_name, default_model, GENERATE, [text]).model
+
+
+class AIServiceFactory:
+    """
+    Factory for AI provider instances.
+
+    Providers are created once per name and reused, so every request shares
+    the provider's pooled HTTP client instead of opening a new connection.
+    With resilience enabled, callers get a ResilientProvider around the
+    requested provider, with the other configured provider as fallback.
+    """
+
+    _providers: dict[str, AIProvider] = {}
+    _resilient: dict[str, ResilientProvider] = {}
+    _breakers: dict[str, CircuitBreaker] = {}
+    _latencies: dict[str, LatencyWindow] = {}
+
+    @classmethod
+    def create(cls, provider: str | None = None) -> AIProvider:
+        """Return the shared AI provider for the given (or configured) name."""
         provider_name = provider or settings.ai_provider
+        if not settings.ai_resilience_enabled:
+            return cls.get_provider(provider_name)
+
+        if provider_name not in cls._resilient:
+            primary = cls.get_provider(provider_name)
+            fallback_name = cls._fallback_name(provider_name)
+            fallback = cls.get_provider(fallback_name) if fallback_name else None
+            for name in filter(None, (provider_name, fallback_name)):
+                cls._breakers.setdefault(
+                    name,
+                    CircuitBreaker(
+                        failure_threshold=settings.ai_circuit_failure_threshold,
+                        reset_timeout=settings.ai_circuit_reset_seconds,
+                    ),
+                )
+                cls._latencies.setdefault(name, LatencyWindow())
+            cls._resilient[provider_name] = ResilientProvider(
+                provider_name,
+                primary,
+                fallback_name,
+                fallback,
+                breakers=cls._breakers,
+                latencies=cls._latencies,
+                retry_policy=RetryPolicy(
+                    attempts=settings.ai_retry_attempts,
+                    base_delay=settings.ai_retry_base_delay_seconds,
+                    max_delay=settings.ai_retry_max_delay_seconds,
+                    attempt_timeout=settings.ai_http_timeout_seconds,
+                ),
+                hedge_enabled=settings.ai_hedge_enabled,
+                hedge_after_seconds=settings.ai_hedge_after_seconds,
+                deadline_seconds=settings.ai_deadline_seconds,
+            )
+        return cls._resilient[provider_name]
 
+    @classmethod
+    def get_provider(cls, provider_name: str) -> AIProvider:
+        """Return the shared, unwrapped provider instance for a name."""
+        if provider_name in cls._providers:
+            return cls._providers[provider_name]
+
+        instance: AIProvider
         if provider_name == "openai":
             if not settings.openai_api_key:
                 raise ValueError("OpenAI API key not configured")
-            return OpenAIProvider(settings.openai_api_key)
+            instance = OpenAIProvider(settings.openai_api_key)
         elif provider_name == "gemini":
             if not settings.gemini_api_key:
                 raise ValueError("Gemini API key not configured")
-            return GeminiProvider(settings.gemini_api_key)
+            instance = GeminiProvider(settings.gemini_api_key)
+        elif provider_name == "local":
+            instance = LocalAIProvider()
         else:
             raise ValueError(f"Unknown AI provider: {provider_name}")
 
+        cls._providers[provider_name] = instance
+        return instance
+
+    @classmethod
+    def _fallback_name(cls, provider_name: str) -> str | None:
+        """Pick the fallback provider: the other provider, if its key is configured."""
+        if not settings.ai_fallback_enabled:
+            return None
+        if provider_name == "openai" and settings.gemini_api_key:
+            return "gemini"
+        if provider_name == "gemini" and settings.openai_api_key:
+            return "openai"
+        return None
+
+    @classmethod
+    def health(cls) -> dict[str, dict[str, Any]]:
+        """Circuit state and latency percentiles per provider."""
+        return {
+            name: {
+                "circuit": breaker.state,
+                "p50_seconds": cls._latencies[name].percentile(50),
+                "p95_seconds": cls._latencies[name].percentile(95),
+            }
+            for name, breaker in cls._breakers.items()
+        }
+
+    @classmethod
+    def startup(cls) -> None:
+        """Create providers (and their HTTP clients) for every configured API key."""
+        if settings.openai_api_key:
+            cls.get_provider("openai")
+        if settings.gemini_api_key:
+            cls.get_provider("gemini")
+        if settings.ai_provider == "local":
+            cls.get_provider("local")
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Close all provider HTTP clients."""
+        providers = list(cls._providers.values())
+        cls._providers.clear()
+        cls._resilient.clear()
+        for instance in providers:
+            await instance.aclose()
+
+
+async def _checked_card(ai_provider: AIProvider, raw: Any, text: str) -> dict[str, Any]:
+    """Repair a generated card locally, or with one fix-up prompt if fields are missing."""
+    try:
+        return repair_card(raw, text)
+    except MalformedOutputError as e:
+        problem = f"{e}. Input: {text}. Expected keys: {', '.join(REQUIRED_CARD_FIELDS)}"
+        output_stats["fixup"] += 1
+        fixed = await ai_provider.fix_up(json.dumps(raw, ensure_ascii=False), problem)
+    try:
+        return repair_card(fixed, text)
+    except MalformedOutputError:
+        output_stats["failed"] += 1
+        raise
+
 
 async def generate_card_data(text: str, provider: str | None = None) -> dict[str, Any]:
     """Generate card data from raw text input using configured AI provider."""
     ai_provider = AIServiceFactory.create(provider)
-    return await ai_provider.generate(text)
+    return await _checked_card(ai_provider, await ai_provider.generate(text), text)
+
+
+async def generate_card_data_many(
+    texts: list[str], provider: str | None = None
+) -> dict[str, dict[str, Any]]:
+    """
+    Generate card data for several inputs in one prompt using configured AI provider.
+
+    Returns repaired cards keyed by input text. Models drop and reorder items,
+    so each card is matched to its input by ``canonical_text`` of its
+    ``target_text`` rather than by position. Inputs with no card, more than
+    one, or one that cannot be repaired are left out, for the caller to
+    retry on their own.
+    """
+    ai_provider = AIServiceFactory.create(provider)
+    inputs = {canonical_text(text): text for text in texts}
+    matched: dict[str, list[dict[str, Any]]] = {}
+    for raw in await ai_provider.generate_many(texts):
+        try:
+            card = repair_card(raw)
+        except MalformedOutputError:
+            continue
+        text = inputs.get(canonical_text(card["target_text"]))
+        if text is not None:
+            matched.setdefault(text, []).append(card)
+    return {text: cards[0] for text, cards in matched.items() if len(cards) == 1}
 
 
 async def extract_learning_items(text: str, provider: str | None = None) -> list[str]:
@@ -321,9 +1158,33 @@ async def extract_learning_items(text: str, provider: str | None = None) -> list
     return await ai_provider.extract_candidates(text)
 
 
+async def stream_card_data(
+    text: str, provider: str | None = None
+) -> AsyncIterator[tuple[str, Any]]:
+    """Yield generated card fields as the configured AI provider completes them."""
+    ai_provider = AIServiceFactory.create(provider)
+    async with aclosing(ai_provider.stream_generate(text)) as fields:
+        async for field in fields:
+            yield field
+
+
+async def stream_learning_items(text: str, provider: str | None = None) -> AsyncIterator[str]:
+    """Yield learning items from raw text as the configured AI provider produces them."""
+    ai_provider = AIServiceFactory.create(provider)
+    async with aclosing(ai_provider.stream_candidates(text)) as candidates:
+        async for candidate in candidates:
+            yield candidate
+
+
 async def recommend_related_items(
-    text: str, existing_texts: list[str], provider: str | None = None
+    text: str, existing_texts: list[str], provider: str | None = None, count: int = 5
 ) -> list[dict[str, Any]]:
-    """Recommend related phrases/sentences using configured AI provider."""
+    """Recommend related phrases/sentences using configured AI provider, dropping broken items."""
     ai_provider = AIServiceFactory.create(provider)
-    return await ai_provider.recommend(text, existing_texts)
+    items: list[dict[str, Any]] = []
+    for raw in await ai_provider.recommend(text, existing_texts, count):
+        try:
+            items.append(repair_card(raw))
+        except MalformedOutputError:
+            continue
+    return items
@@ -0,0 +1,514 @@
+import hashlib
+import html
+import json
+import re
+import shutil
+import sqlite3
+import time
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile, TemporaryDirectory
+from typing import IO, Any
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.models.audio_cache import AudioCache
+from app.models.card import Card
+from app.schemas.card import CardImportResult
+from app.services.export_service import FILE_CHUNK_SIZE, HEADERS, ExportService, join_tags
+from app.services.import_service import ImportService
+from app.services.tts_service import TTSService
+
+settings = get_settings()
+
+# Anki schema 11 ("legacy" .apkg), which every Anki version can import
+_SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null,
+    tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+# Fixed IDs so repeated exports update the same note type and deck in Anki
+MODEL_ID = 1_712_000_000_001
+DECK_ID = 1_712_000_000_002
+DECK_NAME = "English Active Recall"
+# Collection creation time; review due dates are days since this
+COLLECTION_CREATED = datetime(2000, 1, 1)
+
+NOTE_FIELDS = [
+    "Word/Phrase",
+    "Meaning",
+    "Context Sentence",
+    "Context Translation",
+    "Cloze Sentence",
+    "Type",
+    "Audio",
+]
+
+# Anki field names (lowercase) -> export column, for decks made elsewhere
+FIELD_ALIASES = {
+    "word/phrase": "Word/Phrase",
+    "front": "Word/Phrase",
+    "word": "Word/Phrase",
+    "phrase": "Word/Phrase",
+    "expression": "Word/Phrase",
+    "meaning": "Meaning",
+    "back": "Meaning",
+    "definition": "Meaning",
+    "context sentence": "Context Sentence",
+    "sentence": "Context Sentence",
+    "example": "Context Sentence",
+    "context": "Context Sentence",
+    "context translation": "Context Translation",
+    "sentence translation": "Context Translation",
+    "example translation": "Context Translation",
+    "cloze sentence": "Cloze Sentence",
+    "type": "Type",
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_BREAK_RE = re.compile(r"<br\s*/?>|</div>|</p>", re.IGNORECASE)
+_SOUND_RE = re.compile(r"\[sound:[^\]]*\]")
+_CLOZE_RE = re.compile(r"\{\{c\d+::(.*?)(?:::[^}]*)?\}\}", re.DOTALL)
+
+
+def _plain_text(field: str) -> str:
+    """Anki field HTML as plain text, without sound references."""
+    text = _BREAK_RE.sub(" ", field)
+    text = _SOUND_RE.sub("", _TAG_RE.sub("", text))
+    return " ".join(html.unescape(text).split())
+
+
+def _checksum(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _epoch_ms(moment: datetime) -> int:
+    return int((moment - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+def _collection_row(now: int) -> tuple[Any, ...]:
+    fields = [
+        {"name": name, "ord": i, "sticky": False, "rtl": False, "font": "Arial", "size": 20}
+        for i, name in enumerate(NOTE_FIELDS)
+    ]
+    template = {
+        "name": "Recall",
+        "ord": 0,
+        "qfmt": "{{Cloze Sentence}}<br><br>{{Context Translation}}",
+        "afmt": (
+            "{{FrontSide}}<hr id=answer><b>{{Word/Phrase}}</b> {{Meaning}}"
+            "<br><br>{{Context Sentence}} {{Audio}}"
+        ),
+        "did": None,
+        "bqfmt": "",
+        "bafmt": "",
+    }
+    model = {
+        "id": MODEL_ID,
+        "name": DECK_NAME,
+        "type": 0,
+        "mod": now,
+        "usn": -1,
+        "sortf": 0,
+        "did": DECK_ID,
+        "tmpls": [template],
+        "flds": fields,
+        "css": ".card { font-family: arial; font-size: 20px; text-align: center; }",
+        "latexPre": "\\documentclass[12pt]{article}\n\\begin{document}\n",
+        "latexPost": "\\end{document}",
+        "latexsvg": False,
+        "req": [[0, "any", [4, 3]]],
+        "tags": [],
+        "vers": [],
+    }
+
+    def deck(deck_id: int, name: str) -> dict[str, Any]:
+        return {
+            "id": deck_id,
+            "name": name,
+            "desc": "",
+            "mod": now,
+            "usn": -1,
+            "dyn": 0,
+            "conf": 1,
+            "collapsed": False,
+            "browserCollapsed": False,
+            "newToday": [0, 0],
+            "revToday": [0, 0],
+            "lrnToday": [0, 0],
+            "timeToday": [0, 0],
+            "extendNew": 0,
+            "extendRev": 0,
+        }
+
+    decks = {"1": deck(1, "Default"), str(DECK_ID): deck(DECK_ID, DECK_NAME)}
+    dconf = {
+        "1": {
+            "id": 1,
+            "name": "Default",
+            "mod": 0,
+            "usn": 0,
+            "maxTaken": 60,
+            "autoplay": True,
+            "timer": 0,
+            "replayq": True,
+            "dyn": False,
+            "new": {
+                "delays": [1, 10],
+                "ints": [1, 4, 7],
+                "initialFactor": 2500,
+                "order": 1,
+                "perDay": 20,
+                "bury": True,
+            },
+            "rev": {"perDay": 200, "ease4": 1.3, "maxIvl": 36500, "bury": True},
+            "lapse": {"delays": [10], "mult": 0, "minInt": 1, "leechFails": 8, "leechAction": 0},
+        }
+    }
+    conf = {"curDeck": DECK_ID, "curModel": str(MODEL_ID), "nextPos": 1}
+    crt = int((COLLECTION_CREATED - datetime(1970, 1, 1)).total_seconds())
+    return (
+        1,
+        crt,
+        now * 1000,
+        now * 1000,
+        11,
+        0,
+        0,
+        0,
+        json.dumps(conf),
+        json.dumps({str(MODEL_ID): model}),
+        json.dumps(decks),
+        json.dumps(dconf),
+        "{}",
+    )
+
+
+class _ZipSink:
+    """Write-only stream for zipfile whose output is taken out as it is written."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class AnkiService:
+    """
+    Service to export cards as Anki packages (.apkg) and import them back.
+
+    An .apkg is a zip holding an SQLite collection, a ``media`` index and the
+    media files. Exports fill the collection in a temporary file from the
+    batched card cursor and stream the zip to the client as it is written;
+    imports copy the collection out of the upload and read notes through an
+    SQLite cursor into the chunked bulk importer.
+    """
+
+    def __init__(self, session: Session, batch_size: int | None = None):
+        self.session = session
+        self.batch_size = batch_size
+
+    def stream_apkg(self, user_id: UUID, include_audio: bool = False) -> Iterator[bytes]:
+        """
+        Yield the user's cards as an .apkg file.
+
+        With ``include_audio``, context sentences that already have cached TTS
+        audio get it attached; no new audio is generated.
+        """
+        sink = _ZipSink()
+        with (
+            TemporaryDirectory() as workdir,
+            zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as package,
+            SpooledTemporaryFile(max_size=FILE_CHUNK_SIZE, mode="w+") as media_index,
+        ):
+            # The media index maps zip entry names to file names; it is written
+            # as JSON members while the batches run and wrapped in braces at the end
+            collection_path = Path(workdir) / "collection.anki2"
+            media_count = 0
+            with sqlite3.connect(collection_path) as collection:
+                now = int(time.time())
+                collection.executescript(_SCHEMA)
+                collection.execute(
+                    "INSERT INTO col VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                    _collection_row(now),
+                )
+                last_id = _epoch_ms(datetime.utcnow()) + 1
+                position = 0
+                export_service = ExportService(self.session, self.batch_size)
+                for batch in export_service.iter_card_batches(user_id):
+                    audio = self._cached_audio([card for card, _ in batch]) if include_audio else {}
+                    notes, cards = [], []
+                    for card, tag_names in batch:
+                        # Note IDs are creation times in ms; newest-first order keeps them unique
+                        last_id = min(_epoch_ms(card.created_at), last_id - 1)
+                        sound = ""
+                        audio_path = audio.get(card.context_sentence)
+                        if audio_path is not None:
+                            sound = f"[sound:{audio_path.name}]"
+                            package.write(audio_path, str(media_count), zipfile.ZIP_STORED)
+                            separator = "," if media_count else ""
+                            media_index.write(f'{separator}"{media_count}":')
+                            media_index.write(json.dumps(audio_path.name))
+                            media_count += 1
+                        notes.append(self._note_row(last_id, card, tag_names, sound, now))
+                        cards.append(self._card_row(last_id, card, position, now))
+                        position += 1
+                    collection.executemany(
+                        "INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)", notes
+                    )
+                    collection.executemany(
+                        "INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", cards
+                    )
+                    yield sink.take()
+            collection.close()
+
+            with (
+                open(collection_path, "rb") as source,
+                package.open("collection.anki2", "w") as dest,
+            ):
+                while chunk := source.read(FILE_CHUNK_SIZE):
+                    dest.write(chunk)
+                    yield sink.take()
+            media_index.seek(0)
+            with package.open("media", "w") as dest:
+                dest.write(b"{")
+                while text := media_index.read(FILE_CHUNK_SIZE):
+                    dest.write(text.encode("utf-8"))
+                dest.write(b"}")
+        yield sink.take()
+
+    def _cached_audio(self, cards: list[Card]) -> dict[str, Path]:
+        """Cached TTS files for a batch's context sentences, by sentence, in one query."""
+        voice, model = settings.tts_voice, settings.tts_model
+        keys = {
+            TTSService.generate_cache_key(
+                card.context_sentence, voice, model
+            ): card.context_sentence
+            for card in cards
+        }
+        statement = select(AudioCache.cache_key, AudioCache.file_path).where(
+            AudioCache.cache_key.in_(keys)
+        )
+        return {
+            keys[cache_key]: Path(file_path)
+            for cache_key, file_path in self.session.exec(statement)
+            if Path(file_path).is_file()
+        }
+
+    @staticmethod
+    def _note_row(
+        note_id: int, card: Card, tag_names: list[str], sound: str, now: int
+    ) -> tuple[Any, ...]:
+        fields = [
+            card.target_text,
+            card.target_meaning,
+            card.context_sentence,
+            card.context_translation,
+            card.cloze_sentence,
+            card.type,
+        ]
+        escaped = [html.escape(field, quote=False) for field in fields] + [sound]
+        # Anki tags are space-separated; _note_rows maps the underscores back
+        tags = " ".join(name.replace(" ", "_") for name in tag_names)
+        return (
+            note_id,
+            str(card.id),
+            MODEL_ID,
+            now,
+            -1,
+            f" {tags} " if tags else "",
+            "\x1f".join(escaped),
+            card.target_text,
+            _checksum(card.target_text),
+            0,
+            "",
+        )
+
+    @staticmethod
+    def _card_row(note_id: int, card: Card, position: int, now: int) -> tuple[Any, ...]:
+        factor = int(round(card.ease_factor * 1000))
+        if card.interval > 0:
+            # Review card: due is the day number relative to the collection creation
+            card_type = queue = 2
+            due = (card.next_review - COLLECTION_CREATED).days
+        else:
+            card_type = queue = 0
+            due = position
+        return (
+            note_id,
+            note_id,
+            DECK_ID,
+            0,
+            now,
+            -1,
+            card_type,
+            queue,
+            due,
+            card.interval,
+            factor,
+            0,
+            0,
+            0,
+            0,
+            0,
+            0,
+            "",
+        )
+
+    def import_apkg(self, user_id: UUID, file: IO[bytes]) -> CardImportResult:
+        """
+        Import the notes of an .apkg file as cards, with their tags and SRS state.
+
+        Notes map to card fields by field name (this app's export names and
+        common ones such as Front/Back or Sentence), falling back to the first
+        two fields for word and meaning. Notes without a context sentence use
+        the word itself. Anki tags cannot contain spaces, so exports write
+        them as underscores and imports read every underscore back as a
+        space. Raises ValueError if the package cannot be read.
+        """
+        with self._open_collection(file) as collection:
+            rows = self._note_rows(collection)
+            return ImportService(self.session, self.batch_size).import_rows(user_id, rows)
+
+    @contextmanager
+    def _open_collection(self, file: IO[bytes]) -> Iterator[sqlite3.Connection]:
+        try:
+            package = zipfile.ZipFile(file)
+        except zipfile.BadZipFile:
+            raise ValueError("file is not an Anki package") from None
+        with package, NamedTemporaryFile(suffix=".anki2") as collection_file:
+            names = set(package.namelist())
+            # Newer Anki writes a placeholder collection.anki2 next to the real anki21
+            name = next((n for n in ("collection.anki21", "collection.anki2") if n in names), None)
+            if name is None:
+                if "collection.anki21b" in names:
+                    raise ValueError(
+                        "this package uses the newest Anki format; export it again with "
+                        "'Support older Anki versions' enabled"
+                    )
+                raise ValueError("Anki package has no collection")
+            with package.open(name) as source:
+                shutil.copyfileobj(source, collection_file, FILE_CHUNK_SIZE)
+            collection_file.flush()
+            collection = sqlite3.connect(collection_file.name)
+            try:
+                yield collection
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"could not read Anki collection: {e}") from e
+            finally:
+                collection.close()
+
+    def _note_rows(self, collection: sqlite3.Connection) -> Iterator[list[Any]]:
+        """Yield the header, then one export-layout row per note."""
+        try:
+            crt, models_json = collection.execute("SELECT crt, models FROM col").fetchone()
+        except (sqlite3.DatabaseError, TypeError) as e:
+            raise ValueError(f"could not read Anki collection: {e}") from e
+        models = {int(mid): model for mid, model in json.loads(models_json).items()}
+        created = datetime(1970, 1, 1) + timedelta(seconds=crt)
+
+        yield HEADERS
+        notes = collection.execute(
+            """
+            SELECT n.id, n.mid, n.tags, n.flds, c.type, c.due, c.ivl, c.factor
+            FROM notes n
+            LEFT JOIN cards c ON c.id = (
+                SELECT id FROM cards WHERE nid = n.id ORDER BY ord LIMIT 1
+            )
+            ORDER BY n.id
+            """
+        )
+        for note_id, mid, tags, flds, card_type, due, interval, factor in notes:
+            model = models.get(mid, {})
+            row = self._note_fields(model, flds.split("\x1f"))
+            row["Tags"] = join_tags([name.replace("_", " ") for name in tags.split()])
+            row["Created At"] = datetime(1970, 1, 1) + timedelta(milliseconds=note_id)
+            if interval and interval > 0:
+                row["Interval (days)"] = interval
+            if factor:
+                row["Ease Factor"] = factor / 1000
+            if card_type == 2:
+                row["Next Review"] = created + timedelta(days=due)
+            elif card_type in (1, 3):
+                # Learning cards are due at an epoch timestamp in seconds
+                row["Next Review"] = datetime(1970, 1, 1) + timedelta(seconds=due)
+            yield [row.get(name) for name in HEADERS]
+
+    @staticmethod
+    def _note_fields(model: dict[str, Any], values: list[str]) -> dict[str, Any]:
+        """Map one note's field values to export columns."""
+        names = [field["name"] for field in sorted(model.get("flds", []), key=lambda f: f["ord"])]
+        if model.get("type") == 1 and values:
+            # Cloze note: the deletion is the target and the text is the context
+            text = values[0]
+            deletion = _CLOZE_RE.search(text)
+            row = {
+                "Word/Phrase": _plain_text(deletion.group(1)) if deletion else "",
+                "Context Sentence": _plain_text(_CLOZE_RE.sub(r"\1", text)),
+                "Cloze Sentence": _plain_text(_CLOZE_RE.sub("_______", text)),
+                "Meaning": _plain_text(values[1]) if len(values) > 1 else "",
+            }
+        else:
+            row = {}
+            for name, value in zip(names, values, strict=False):
+                column = FIELD_ALIASES.get(name.strip().lower())
+                if column and column not in row:
+                    row[column] = _plain_text(value)
+            unmapped = [_plain_text(value) for value in values]
+            if "Word/Phrase" not in row and unmapped:
+                row["Word/Phrase"] = unmapped[0]
+            if "Meaning" not in row and len(unmapped) > 1:
+                row["Meaning"] = unmapped[1]
+        row.setdefault("Context Sentence", "")
+        if not row["Context Sentence"]:
+            row["Context Sentence"] = row.get("Word/Phrase", "")
+        if not row.get("Context Translation"):
+            row["Context Translation"] = row.get("Meaning", "")
+        return row
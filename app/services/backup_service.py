@@ -0,0 +1,253 @@
+import math
+import struct
+import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from typing import IO, Any
+from uuid import UUID
+
+import pyarrow as pa
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.core.text import normalize_text
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.schemas.backup import RestoreResult
+from app.schemas.card import CardBase
+from app.schemas.tag import TagBase
+from app.services.sync_service import next_sync_version
+
+settings = get_settings()
+
+# File layout: MAGIC, a format version (uint16), then frames of
+# [section (uint8)][length (uint32)][Arrow IPC stream with zstd-compressed
+# record batches], ending with an empty END frame. Tags come first, then
+# cards, then card-tag links.
+MAGIC = b"EARBAK"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<H")
+_FRAME = struct.Struct("<BI")
+
+END, TAGS, CARDS, CARD_TAGS = 0, 1, 2, 3
+
+SCHEMAS = {
+    TAGS: pa.schema(
+        [
+            ("id", pa.binary(16)),
+            ("name", pa.string()),
+            ("created_at", pa.timestamp("us")),
+        ]
+    ),
+    CARDS: pa.schema(
+        [
+            ("id", pa.binary(16)),
+            ("type", pa.string()),
+            ("target_text", pa.string()),
+            ("target_meaning", pa.string()),
+            ("context_sentence", pa.string()),
+            ("context_translation", pa.string()),
+            ("cloze_sentence", pa.string()),
+            ("normalized_text", pa.string()),
+            ("interval", pa.int32()),
+            ("ease_factor", pa.float64()),
+            ("next_review", pa.timestamp("us")),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ]
+    ),
+    CARD_TAGS: pa.schema([("card_id", pa.binary(16)), ("tag_id", pa.binary(16))]),
+}
+
+_IPC_OPTIONS = pa.ipc.IpcWriteOptions(compression="zstd")
+
+
+def _frame(section: int, rows: list[Any]) -> bytes:
+    """Encode rows (tuples in schema column order) as one frame."""
+    schema = SCHEMAS[section]
+    columns = list(zip(*rows, strict=True))
+    arrays = [
+        pa.array(
+            [value.bytes for value in column] if field.type == pa.binary(16) else column,
+            type=field.type,
+        )
+        for field, column in zip(schema, columns, strict=True)
+    ]
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema, options=_IPC_OPTIONS) as writer:
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    payload = sink.getvalue().to_pybytes()
+    return _FRAME.pack(section, len(payload)) + payload
+
+
+def _read_exact(file: IO[bytes], size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("backup file is truncated")
+    return data
+
+
+def _validate(schema: type[BaseModel], row: dict[str, Any], label: str) -> None:
+    """Check a restored row against the API schema, so it fits its columns and reads back."""
+    try:
+        schema.model_validate(row)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise ValueError(f"backup file has an invalid {label}: {field}: {error['msg']}") from e
+
+
+def _read_frames(file: IO[bytes]) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """
+    Yield ``(section, rows)`` per frame after checking the header.
+
+    Each frame is checked against its section's schema, so a missing column,
+    a mistyped one or a null value raises ValueError before any row is used.
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("file is not a library backup")
+    (version,) = _HEADER.unpack(_read_exact(file, _HEADER.size))
+    if version > FORMAT_VERSION:
+        raise ValueError(f"backup format version {version} is newer than this server supports")
+    while True:
+        section, length = _FRAME.unpack(_read_exact(file, _FRAME.size))
+        if section == END:
+            return
+        if section not in SCHEMAS:
+            raise ValueError(f"unknown backup section {section}")
+        schema = SCHEMAS[section]
+        try:
+            table = pa.ipc.open_stream(_read_exact(file, length)).read_all()
+            table = table.select(schema.names).cast(schema)
+        except (pa.ArrowException, KeyError) as e:
+            raise ValueError(f"backup file is corrupt: {e}") from e
+        missing = [name for name in schema.names if table.column(name).null_count]
+        if missing:
+            raise ValueError(f"backup file has missing values in {', '.join(missing)}")
+        yield section, table.to_pylist()
+
+
+class BackupService:
+    """
+    Whole-library backup and restore in a compact, versioned binary format.
+
+    Backups stream the user's tags, cards (with SRS state) and card-tag links
+    as frames of zstd-compressed Arrow record batches, reading plain columns
+    in batches of ``backup_batch_size``. Restores read the frames back with
+    multi-row INSERTs in one transaction. Every restored row gets a new ID:
+    tags are matched to the target user's existing tags by name, and card IDs
+    are derived from the backed-up ID with a per-restore namespace, so links
+    can be remapped without holding an ID map for the whole library.
+    """
+
+    def __init__(self, session: Session, batch_size: int | None = None):
+        self.session = session
+        self.batch_size = batch_size or settings.backup_batch_size
+
+    def dump(self, user_id: UUID) -> Iterator[bytes]:
+        """Yield the user's library as a backup file."""
+        yield MAGIC + _HEADER.pack(FORMAT_VERSION)
+        sections = [
+            (TAGS, select(Tag.id, Tag.name, Tag.created_at).where(Tag.user_id == user_id)),
+            (
+                CARDS,
+                select(*(getattr(Card, name) for name in SCHEMAS[CARDS].names)).where(
+                    Card.user_id == user_id
+                ),
+            ),
+            (
+                CARD_TAGS,
+                select(CardTag.card_id, CardTag.tag_id)
+                .join(Tag, Tag.id == CardTag.tag_id)
+                .where(Tag.user_id == user_id),
+            ),
+        ]
+        for section, statement in sections:
+            result = self.session.exec(statement.execution_options(yield_per=self.batch_size))
+            for rows in result.partitions():
+                yield _frame(section, rows)
+        yield _FRAME.pack(END, 0)
+
+    def restore(self, user_id: UUID, file: IO[bytes]) -> RestoreResult:
+        """
+        Restore a backup into the user's library.
+
+        Cards whose text is already in the library are skipped, along with
+        their links; the duplicate check and ``normalized_text`` are computed
+        from ``target_text`` rather than taken from the file. Restored rows get
+        a new sync version, so sync clients pick them up. Raises ValueError
+        (and writes nothing) if the file is not a valid backup.
+        """
+        namespace = uuid.uuid4()
+        now = datetime.utcnow()
+        version = next_sync_version(self.session, user_id)
+        tag_ids = dict(
+            self.session.exec(select(Tag.name, Tag.id).where(Tag.user_id == user_id)).all()
+        )
+        existing_texts = set(
+            self.session.exec(select(Card.normalized_text).where(Card.user_id == user_id)).all()
+        )
+        restored_tags: dict[bytes, UUID] = {}
+        restored_cards: set[bytes] = set()
+        result = RestoreResult()
+        try:
+            for section, rows in _read_frames(file):
+                if section == TAGS:
+                    new_tags = []
+                    for row in rows:
+                        _validate(TagBase, row, "tag")
+                        if row["name"] not in tag_ids:
+                            tag_ids[row["name"]] = uuid.uuid4()
+                            new_tags.append(
+                                {
+                                    "id": tag_ids[row["name"]],
+                                    "user_id": user_id,
+                                    "name": row["name"],
+                                    "created_at": now,
+                                    "sync_version": version,
+                                }
+                            )
+                        restored_tags[row["id"]] = tag_ids[row["name"]]
+                    if new_tags:
+                        self.session.execute(insert(Tag), new_tags)
+                    result.tags_created += len(new_tags)
+                elif section == CARDS:
+                    new_cards = []
+                    for row in rows:
+                        _validate(CardBase, row, "card")
+                        if row["interval"] < 0 or not math.isfinite(row["ease_factor"]):
+                            raise ValueError("backup file has an invalid card: bad SRS state")
+                        key = normalize_text(row["target_text"])
+                        if key and key in existing_texts:
+                            continue
+                        existing_texts.add(key)
+                        restored_cards.add(row["id"])
+                        row["normalized_text"] = key
+                        row["id"] = uuid.uuid5(namespace, row["id"].hex())
+                        row["user_id"] = user_id
+                        row["updated_at"] = now
+                        row["sync_version"] = version
+                        new_cards.append(row)
+                    if new_cards:
+                        self.session.execute(insert(Card), new_cards)
+                    result.cards_created += len(new_cards)
+                    result.cards_skipped += len(rows) - len(new_cards)
+                else:
+                    links = [
+                        {
+                            "card_id": uuid.uuid5(namespace, row["card_id"].hex()),
+                            "tag_id": restored_tags[row["tag_id"]],
+                        }
+                        for row in rows
+                        if row["card_id"] in restored_cards and row["tag_id"] in restored_tags
+                    ]
+                    if links:
+                        self.session.execute(insert(CardTag), links)
+                    result.links_created += len(links)
+        except Exception:
+            self.session.rollback()
+            raise
+        self.session.commit()
+        return result
@@ -0,0 +1,188 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from app.core.text import canonical_text
+from app.schemas.generate import BatchGenerateItem, GenerateResponse
+from app.services.ai_concurrency import ai_scheduler
+from app.services.ai_service import (
+    answering_provider_name,
+    generate_card_data,
+    generate_card_data_many,
+    generate_prompt_version,
+    get_provider_model,
+    resolve_provider_name,
+)
+from app.services.card_enrichment import CardEnrichmentService
+from app.services.generation_cache_service import GenerationCacheService
+
+
+class BatchGenerationService:
+    """Generates many cards concurrently, reusing the generation cache."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.cache = GenerationCacheService(session)
+        self.enricher = CardEnrichmentService(session)
+        # Input text -> provider that actually answered it, for cache keys
+        self._answered_by: dict[str, str] = {}
+
+    async def generate(
+        self,
+        user_id: UUID,
+        texts: list[str],
+        provider: str | None = None,
+        pack_size: int = 1,
+        bypass_cache: bool = False,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> list[BatchGenerateItem]:
+        """
+        Generate card data for every text, returning results in input order.
+
+        Duplicate inputs (after whitespace collapsing) are generated once. Cache misses
+        are split into packs of ``pack_size`` and run concurrently, each pack
+        holding one AI scheduler slot for the user. ``on_progress`` is called
+        with the number of unique inputs finished so far as each pack completes.
+        """
+        provider_name = resolve_provider_name(provider)
+        prompt_version = generate_prompt_version()
+
+        # One representative text per canonical input
+        unique: dict[str, str] = {}
+        for text in texts:
+            unique.setdefault(canonical_text(text), text)
+
+        outcomes: dict[str, GenerateResponse | str] = {}
+        misses: list[str] = []
+        for key, text in unique.items():
+            cached = None
+            if not bypass_cache:
+                model = get_provider_model(provider_name, text)
+                cached = self.cache.get(provider_name, model, prompt_version, text)
+            if cached is not None:
+                outcomes[key] = GenerateResponse(**self.enricher.apply(user_id, cached))
+            else:
+                misses.append(text)
+
+        packs = [misses[i : i + pack_size] for i in range(0, len(misses), pack_size)]
+        finished = len(outcomes)
+
+        async def run_pack(pack: list[str]) -> list[GenerateResponse | str]:
+            nonlocal finished
+            results = await self._run_pack(user_id, pack, provider)
+            finished += len(pack)
+            if on_progress is not None:
+                on_progress(finished)
+            return results
+
+        pack_results = await asyncio.gather(*(run_pack(pack) for pack in packs))
+
+        for pack, results in zip(packs, pack_results, strict=True):
+            for text, outcome in zip(pack, results, strict=True):
+                outcomes[canonical_text(text)] = outcome
+                if isinstance(outcome, GenerateResponse):
+                    answered_by = self._answered_by.get(text, provider_name)
+                    self.cache.set(
+                        answered_by,
+                        get_provider_model(answered_by, text),
+                        prompt_version,
+                        text,
+                        self.enricher.for_cache(outcome.model_dump()),
+                    )
+
+        items = []
+        for text in texts:
+            outcome = outcomes[canonical_text(text)]
+            if isinstance(outcome, GenerateResponse):
+                items.append(BatchGenerateItem(text=text, card=outcome))
+            else:
+                items.append(BatchGenerateItem(text=text, error=outcome))
+        return items
+
+    async def generate_one(
+        self,
+        user_id: UUID,
+        text: str,
+        provider: str | None = None,
+        bypass_cache: bool = False,
+    ) -> GenerateResponse | str:
+        """Generate a single card through the cache, returning an error message on failure."""
+        provider_name = resolve_provider_name(provider)
+        model = get_provider_model(provider_name, text)
+        prompt_version = generate_prompt_version()
+
+        if not bypass_cache:
+            cached = self.cache.get(provider_name, model, prompt_version, text)
+            if cached is not None:
+                return GenerateResponse(**self.enricher.apply(user_id, cached))
+
+        outcome = await self._run_single(user_id, text, provider)
+        if isinstance(outcome, GenerateResponse):
+            answered_by = self._answered_by.get(text, provider_name)
+            self.cache.set(
+                answered_by,
+                get_provider_model(answered_by, text),
+                prompt_version,
+                text,
+                self.enricher.for_cache(outcome.model_dump()),
+            )
+        return outcome
+
+    async def _run_pack(
+        self, user_id: UUID, pack: list[str], provider: str | None
+    ) -> list[GenerateResponse | str]:
+        """Generate one pack; fall back to single-item calls for items a packed prompt missed."""
+        if len(pack) == 1:
+            return [await self._run_single(user_id, pack[0], provider)]
+
+        try:
+            async with ai_scheduler.slot(user_id):
+                raw_cards = await generate_card_data_many(pack, provider=provider)
+        except Exception:
+            raw_cards = {}
+        answered_by = answering_provider_name(provider)
+
+        # Cards come back keyed by the input they answer, so an item the model
+        # dropped, duplicated or mislabeled is retried rather than misassigned
+        results: list[GenerateResponse | str | None] = [None] * len(pack)
+        for index, text in enumerate(pack):
+            if text not in raw_cards:
+                continue
+            card = self._to_response(user_id, raw_cards[text])
+            if isinstance(card, GenerateResponse):
+                results[index] = card
+                self._answered_by[text] = answered_by
+
+        retry_indexes = [i for i, result in enumerate(results) if result is None]
+        retried = await asyncio.gather(
+            *(self._run_single(user_id, pack[i], provider) for i in retry_indexes)
+        )
+        for index, result in zip(retry_indexes, retried, strict=True):
+            results[index] = result
+
+        return [result for result in results if result is not None]
+
+    async def _run_single(
+        self, user_id: UUID, text: str, provider: str | None
+    ) -> GenerateResponse | str:
+        """Generate one item, returning an error message instead of raising."""
+        try:
+            async with ai_scheduler.slot(user_id):
+                raw = await generate_card_data(text, provider=provider)
+        except Exception as e:
+            return f"AI service error: {str(e)}"
+        self._answered_by[text] = answering_provider_name(provider)
+        return self._to_response(user_id, raw)
+
+    def _to_response(self, user_id: UUID, raw: Any) -> GenerateResponse | str:
+        """Validate raw provider output, plus any local fields, into a GenerateResponse."""
+        if not isinstance(raw, dict):
+            return "AI service error: malformed card data"
+        try:
+            return GenerateResponse(**self.enricher.apply(user_id, raw))
+        except ValidationError as e:
+            return f"AI service error: invalid card data ({e.error_count()} errors)"
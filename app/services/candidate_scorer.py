@@ -0,0 +1,115 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from app.core.text import split_sentences
+
+_WORD_RE = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)?")
+
+# Packed word lists, kept out of the one-item-per-line formatting
+# fmt: off
+STOPWORDS = frozenset(
+    {
+        "a", "an", "the", "and", "or", "but", "nor", "so", "yet", "if", "then", "than", "that",
+        "this", "these", "those", "there", "here", "i", "me", "my", "mine", "we", "us", "our",
+        "ours", "you", "your", "yours", "he", "him", "his", "she", "her", "hers", "it", "its",
+        "they", "them", "their", "theirs", "who", "whom", "whose", "which", "what", "when", "where",
+        "why", "how", "is", "am", "are", "was", "were", "be", "been", "being", "do", "does", "did",
+        "done", "have", "has", "had", "having", "will", "would", "shall", "should", "can", "could",
+        "may", "might", "must", "of", "to", "in", "on", "at", "by", "for", "with", "from", "about",
+        "as", "into", "onto", "over", "under", "up", "down", "out", "off", "not", "no", "very",
+        "just", "also", "too", "only", "own", "same", "such", "more", "most", "other", "some",
+        "any", "each", "all", "both", "few", "many", "much", "again", "once",
+    }
+)
+
+# Particles that turn a verb into a phrasal verb ("give up", "figure out")
+PARTICLES = frozenset(
+    {
+        "up", "out", "off", "on", "in", "down", "over", "away", "back", "through", "around",
+        "along", "apart", "ahead",
+    }
+)
+# fmt: on
+
+
+@dataclass(frozen=True)
+class ScoredCandidate:
+    text: str
+    score: float
+    count: int
+
+
+def _words(sentence: str) -> list[str]:
+    return _WORD_RE.findall(sentence)
+
+
+def _is_content(word: str) -> bool:
+    return word not in STOPWORDS and len(word) > 1
+
+
+def score_candidates(
+    text: str, min_words: int = 2, max_words: int = 5, limit: int = 60
+) -> list[ScoredCandidate]:
+    """
+    Score multi-word phrases in ``text`` as likely collocations or idioms.
+
+    Every 2-5 word n-gram that starts and ends on a content word (or ends on a
+    phrasal-verb particle) is a candidate. Its score combines how often it
+    recurs, how strongly recurring words stick together compared with how often
+    they appear on their own (a PMI-style cohesion measure), bonuses for
+    phrasal-verb and "content-function-content" idiom shapes, and penalties
+    for long n-grams with many content words. Overlapping lower-scoring
+    candidates are dropped, and the top ``limit`` returned.
+    """
+    sentences = [_words(sentence) for sentence in split_sentences(text)]
+    lowered = [[word.lower() for word in words] for words in sentences]
+
+    unigrams = Counter(word for words in lowered for word in words)
+    total_words = sum(unigrams.values()) or 1
+    ngram_counts: Counter[tuple[str, ...]] = Counter()
+    surface: dict[tuple[str, ...], str] = {}
+
+    for words, lower in zip(sentences, lowered, strict=True):
+        for n in range(min_words, max_words + 1):
+            for start in range(len(lower) - n + 1):
+                gram = tuple(lower[start : start + n])
+                first, last = gram[0], gram[-1]
+                if not _is_content(first):
+                    continue
+                if not (_is_content(last) or (last in PARTICLES and n == 2)):
+                    continue
+                ngram_counts[gram] += 1
+                surface.setdefault(gram, " ".join(words[start : start + n]))
+
+    scored: list[tuple[float, tuple[str, ...]]] = []
+    for gram, count in ngram_counts.items():
+        content = [word for word in gram if _is_content(word)]
+        score = math.log2(1 + count) * 2
+        if count > 1:
+            # Cohesion: how much more often the words occur together than chance
+            # predicts from their own frequencies (PMI), capped so rare words
+            # cannot dominate.
+            expected = math.prod(unigrams[word] / total_words for word in content) * total_words
+            score += min(3.0, max(0.0, math.log2(count / max(expected, 1e-9)) / len(content)))
+        if len(gram) == 2 and gram[-1] in PARTICLES:
+            score += 2.0  # phrasal verb
+        elif len(gram) >= 3 and any(word in STOPWORDS for word in gram[1:-1]):
+            score += 1.5  # idiom shape, e.g. "piece of cake", "call it a day"
+        score -= 1.0 * max(0, len(content) - 2)  # idioms rarely carry many content words
+        score -= 0.5 * max(0, len(gram) - 3)
+        scored.append((score, gram))
+
+    scored.sort(key=lambda item: (-item[0], len(item[1])))
+    picked: list[ScoredCandidate] = []
+    picked_grams: list[str] = []
+    for score, gram in scored:
+        joined = " " + " ".join(gram) + " "
+        if any(joined in other or other in joined for other in picked_grams):
+            continue
+        picked.append(ScoredCandidate(surface[gram], round(score, 3), ngram_counts[gram]))
+        picked_grams.append(joined)
+        if len(picked) >= limit:
+            break
+    return picked
@@ -0,0 +1,349 @@
+import math
+import re
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, func, select
+
+from app.core.config import get_settings
+from app.models.card import Card
+from app.models.tag import CardTag
+from app.services.candidate_scorer import STOPWORDS
+
+settings = get_settings()
+
+# (card count, latest card update, card-tag link count) of a user's library
+Signature = tuple[int, datetime | None, int]
+
+CLOZE_BLANK = "_______"
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)?")
+
+# Irregular verb forms; regular inflections are generated by _word_forms.
+_IRREGULAR = {
+    "be": "am is are was were been being",
+    "have": "has had having",
+    "do": "does did done doing",
+    "go": "goes went gone going",
+    "make": "made",
+    "take": "took taken",
+    "give": "gave given",
+    "get": "got gotten",
+    "break": "broke broken",
+    "come": "came",
+    "run": "ran running",
+    "say": "said",
+    "tell": "told",
+    "think": "thought",
+    "bring": "brought",
+    "buy": "bought",
+    "catch": "caught",
+    "keep": "kept",
+    "feel": "felt",
+    "leave": "left",
+    "hold": "held",
+    "stand": "stood",
+    "speak": "spoke spoken",
+    "see": "saw seen",
+    "know": "knew known",
+    "fall": "fell fallen",
+    "find": "found",
+    "pay": "paid",
+    "lose": "lost",
+    "meet": "met",
+    "sell": "sold",
+    "send": "sent",
+    "spend": "spent",
+    "throw": "threw thrown",
+    "write": "wrote written",
+    "drive": "drove driven",
+    "eat": "ate eaten",
+    "bite": "bit bitten",
+    "hit": "hitting",
+    "put": "putting",
+    "cut": "cutting",
+    "let": "letting",
+    "set": "setting",
+}
+
+# Placeholders used in dictionary-style phrases ("make up one's mind")
+_POSSESSIVES = r"(?:my|your|his|her|its|our|their|one's|someone's)"
+_REFLEXIVES = r"(?:myself|yourself|himself|herself|itself|ourselves|yourselves|themselves|oneself)"
+# Up to three words within the same clause
+_SLOT = r"\w+(?:\s+\w+){0,2}"
+_PLACEHOLDERS = {
+    "one's": _POSSESSIVES,
+    "someone's": _POSSESSIVES,
+    "sb's": _POSSESSIVES,
+    "oneself": _REFLEXIVES,
+    "someone": _SLOT,
+    "somebody": _SLOT,
+    "something": _SLOT,
+    "sb": _SLOT,
+    "sth": _SLOT,
+}
+
+
+def _word_forms(word: str) -> set[str]:
+    """Return ``word`` with its regular and irregular inflections (lowercase)."""
+    w = word.lower()
+    forms = {w, f"{w}s", f"{w}es", f"{w}ed", f"{w}d", f"{w}ing"}
+    if w.endswith("e"):
+        forms.add(f"{w[:-1]}ing")
+    if w.endswith("y") and len(w) > 2 and w[-2] not in "aeiou":
+        forms |= {f"{w[:-1]}ies", f"{w[:-1]}ied"}
+    if len(w) >= 3 and w[-1] not in "aeiouwxy" and w[-2] in "aeiou" and w[-3] not in "aeiou":
+        forms |= {f"{w}{w[-1]}ed", f"{w}{w[-1]}ing"}
+    forms.update(_IRREGULAR.get(w, "").split())
+    # Target given in an inflected form: also match the base and its other forms
+    for base, irregular in _IRREGULAR.items():
+        if w in irregular.split():
+            forms.add(base)
+            forms.update(irregular.split())
+    return forms
+
+
+def _word_pattern(token: str) -> str:
+    lowered = token.lower()
+    if lowered in _PLACEHOLDERS:
+        return _PLACEHOLDERS[lowered]
+    forms = sorted(_word_forms(token), key=len, reverse=True)
+    return "(?:" + "|".join(re.escape(form) for form in forms) + ")"
+
+
+def make_cloze(target_text: str, context_sentence: str) -> str:
+    """
+    Blank ``target_text`` out of ``context_sentence``.
+
+    Each word of the target may appear inflected ("break the ice" matches
+    "broke the ice"), and placeholders such as "one's" or "someone" match the
+    words used in their place. If the whole target cannot be found, the
+    longest single content word is blanked instead.
+    """
+    tokens = _TOKEN_RE.findall(target_text)
+    if not tokens or not context_sentence:
+        return CLOZE_BLANK
+
+    pattern = r"(?<!\w)" + r"\W+".join(_word_pattern(t) for t in tokens) + r"(?!\w)"
+    match = re.search(pattern, context_sentence, flags=re.IGNORECASE)
+    if match is None:
+        content = [
+            t for t in tokens if t.lower() not in STOPWORDS and t.lower() not in _PLACEHOLDERS
+        ]
+        for token in sorted(content, key=len, reverse=True):
+            single = r"(?<!\w)" + _word_pattern(token) + r"(?!\w)"
+            match = re.search(single, context_sentence, flags=re.IGNORECASE)
+            if match is not None:
+                break
+    if match is None:
+        return CLOZE_BLANK
+    return context_sentence[: match.start()] + CLOZE_BLANK + context_sentence[match.end() :]
+
+
+# Pseudo-examples for the default tags, so new users get suggestions too
+SEED_EXAMPLES = {
+    "sport": "game match team play win score goal football basketball tennis run gym coach",
+    "travel": "trip flight airport hotel ticket passport journey tour abroad road map luggage",
+    "life": "home family daily morning routine friend habit time day weekend live",
+    "health": "doctor sick ill medicine hospital pain tired sleep exercise diet healthy cold",
+    "shopping": "buy shop store price cheap expensive sale pay discount mall money order",
+    "food": "eat food meal dinner lunch breakfast cook restaurant delicious taste cake hungry",
+    "people": "person friend boss colleague neighbor parent child people kind character",
+    "work": "job office work boss meeting project deadline career colleague salary task",
+    "weather": "weather rain sunny snow wind cold hot temperature storm cloudy forecast",
+    "tech": "computer phone app software internet online data code website device email",
+}
+
+
+def _features(text: str) -> list[str]:
+    return [t for t in (w.lower() for w in _TOKEN_RE.findall(text)) if t not in STOPWORDS]
+
+
+class TagClassifier:
+    """
+    Multinomial naive Bayes over card words, predicting at most one tag.
+
+    Untagged examples train a "no tag" class, and a tag is only suggested
+    when its posterior is at least ``min_confidence``.
+    """
+
+    NO_TAG = ""
+
+    def __init__(self, alpha: float = 1.0, min_confidence: float = 0.5):
+        self.alpha = alpha
+        self.min_confidence = min_confidence
+        self.doc_counts: Counter[str] = Counter()
+        self.word_counts: dict[str, Counter[str]] = {}
+        self.vocabulary: set[str] = set()
+
+    def fit(self, examples: Iterable[tuple[str, list[str]]]) -> "TagClassifier":
+        """Train on ``(text, tag names)`` pairs."""
+        for text, tags in examples:
+            words = _features(text)
+            self.vocabulary.update(words)
+            for tag in tags or [self.NO_TAG]:
+                self.doc_counts[tag] += 1
+                self.word_counts.setdefault(tag, Counter()).update(words)
+        return self
+
+    def predict(self, text: str) -> list[str]:
+        """Return ``[tag]`` for the most likely tag, or ``[]``."""
+        words = _features(text)
+        if not self.doc_counts or not words:
+            return []
+        total_docs = sum(self.doc_counts.values())
+        vocabulary_size = len(self.vocabulary) + 1
+        log_posteriors: dict[str, float] = {}
+        for tag, doc_count in self.doc_counts.items():
+            counts = self.word_counts[tag]
+            denominator = sum(counts.values()) + self.alpha * vocabulary_size
+            log_posteriors[tag] = math.log(doc_count / total_docs) + sum(
+                math.log((counts[word] + self.alpha) / denominator) for word in words
+            )
+        best = max(log_posteriors, key=log_posteriors.__getitem__)
+        normalizer = sum(math.exp(lp - log_posteriors[best]) for lp in log_posteriors.values())
+        if best == self.NO_TAG or 1 / normalizer < self.min_confidence:
+            return []
+        return [best]
+
+
+class _ClassifierCache:
+    """
+    Bounded LRU of per-user tag classifiers, rebuilt on a background thread.
+
+    A lookup never trains: a missing or stale classifier is queued for a
+    rebuild (at most one in flight per user) and the stale one, or one
+    trained on the seed examples only, is used until the rebuild lands.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[UUID, tuple[Signature, TagClassifier]] = OrderedDict()
+        self._building: dict[UUID, Future[None]] = {}
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tag-classifier")
+        self.seed = TagClassifier().fit((words, [tag]) for tag, words in SEED_EXAMPLES.items())
+
+    def get(self, user_id: UUID, signature: Signature, bind: Engine) -> TagClassifier:
+        with self._lock:
+            cached = self._items.get(user_id)
+            if cached is not None:
+                self._items.move_to_end(user_id)
+                if cached[0] == signature:
+                    return cached[1]
+            if user_id not in self._building:
+                self._building[user_id] = self._executor.submit(
+                    self._build, user_id, signature, bind
+                )
+        return cached[1] if cached is not None else self.seed
+
+    def wait(self) -> None:
+        """Block until every queued rebuild has finished."""
+        with self._lock:
+            pending = list(self._building.values())
+        for future in pending:
+            future.result()
+
+    def clear(self) -> None:
+        self.wait()
+        with self._lock:
+            self._items.clear()
+
+    def _build(self, user_id: UUID, signature: Signature, bind: Engine) -> None:
+        try:
+            with Session(bind) as session:
+                statement = select(Card).where(Card.user_id == user_id)
+                cards = session.exec(
+                    statement.options(selectinload(Card.tags))  # type: ignore[arg-type]
+                ).all()
+                examples = [(words, [tag]) for tag, words in SEED_EXAMPLES.items()]
+                examples += [
+                    (f"{card.target_text} {card.context_sentence}", [t.name for t in card.tags])
+                    for card in cards
+                ]
+            classifier = TagClassifier().fit(examples)
+            with self._lock:
+                self._items[user_id] = (signature, classifier)
+                self._items.move_to_end(user_id)
+                while len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        finally:
+            with self._lock:
+                self._building.pop(user_id, None)
+
+
+_classifiers = _ClassifierCache(settings.generation_tag_classifier_cache_size)
+
+
+class CardEnrichmentService:
+    """
+    Computes ``cloze_sentence`` and ``tags`` locally instead of asking the LLM.
+
+    Active when ``generation_local_fields`` is on; otherwise every method
+    passes cards through unchanged. Tag classifiers are trained per user on
+    their own tagged cards, off the request path, and kept in a bounded LRU
+    until the library changes.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def wait_for_classifiers() -> None:
+        """Block until pending classifier rebuilds have finished."""
+        _classifiers.wait()
+
+    @staticmethod
+    def clear_classifiers() -> None:
+        """Drop every cached classifier."""
+        _classifiers.clear()
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.generation_local_fields
+
+    def apply(self, user_id: UUID, card: dict[str, Any]) -> dict[str, Any]:
+        """Return ``card`` with locally computed cloze sentence and tags."""
+        if not self.enabled():
+            return card
+        target = card.get("target_text", "")
+        context = card.get("context_sentence", "")
+        return {
+            **card,
+            "cloze_sentence": make_cloze(target, context),
+            "tags": self.suggest_tags(user_id, f"{target} {context}"),
+        }
+
+    def for_cache(self, card: dict[str, Any]) -> dict[str, Any]:
+        """Drop user-specific fields before a card goes into the shared generation cache."""
+        if not self.enabled():
+            return card
+        return {**card, "tags": []}
+
+    def suggest_tags(self, user_id: UUID, text: str) -> list[str]:
+        return self._classifier(user_id).predict(text)
+
+    def _classifier(self, user_id: UUID) -> TagClassifier:
+        return _classifiers.get(user_id, self._signature(user_id), self.session.get_bind().engine)
+
+    def _signature(self, user_id: UUID) -> Signature:
+        """Cheap fingerprint of the training data; changes when cards or their tags do."""
+        card_count, last_update = self.session.exec(
+            select(func.count(col(Card.id)), func.max(Card.updated_at)).where(
+                Card.user_id == user_id
+            )
+        ).one()
+        link_count = self.session.exec(
+            select(func.count())
+            .select_from(CardTag)
+            .join(Card, col(Card.id) == CardTag.card_id)
+            .where(Card.user_id == user_id)
+        ).one()
+        return card_count, last_update, link_count
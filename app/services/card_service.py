@@ -1,11 +1,30 @@
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, func, select, or_
 
+from app.core.text import normalize_text
 from app.models.card import Card
+from app.models.review_log import ReviewLog
 from app.models.tag import CardTag, Tag
-from app.schemas.card import CardCreate, CardUpdate, ReviewRating
+from app.models.tombstone import Tombstone
+from app.schemas.card import (
+    CardCreate,
+    CardRead,
+    CardUpdate,
+    ReviewLogEntry,
+    ReviewRating,
+    ReviewReplayResult,
+)
+from app.services.sync_service import next_sync_version
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, as stored; aware values are converted first."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
 
 
 class CardService:
@@ -34,7 +53,9 @@ class CardService:
             context_sentence=card_data.context_sentence,
             context_translation=card_data.context_translation,
             cloze_sentence=card_data.cloze_sentence,
+            normalized_text=normalize_text(card_data.target_text),
             tags=tags,
+            sync_version=next_sync_version(self.session, user_id),
         )
         self.session.add(card)
         self.session.commit()
@@ -88,6 +109,16 @@ class CardService:
         cards = list(self.session.exec(statement).all())
         return cards, total
 
+    def find_existing_texts(self, user_id: UUID, texts: list[str]) -> set[str]:
+        """Return the normalized forms of ``texts`` that already exist in the user's library."""
+        normalized = {normalize_text(text) for text in texts} - {""}
+        if not normalized:
+            return set()
+        statement = select(Card.normalized_text).where(
+            Card.user_id == user_id, Card.normalized_text.in_(normalized)
+        )
+        return set(self.session.exec(statement).all())
+
     def update(self, user_id: UUID, card_id: UUID, card_data: CardUpdate) -> Card | None:
         """Update a card."""
         card = self.get_by_id(user_id, card_id)
@@ -104,10 +135,14 @@ class CardService:
         if "type" in update_data and update_data["type"]:
             update_data["type"] = update_data["type"].value
 
+        if update_data.get("target_text"):
+            update_data["normalized_text"] = normalize_text(update_data["target_text"])
+
         for key, value in update_data.items():
             setattr(card, key, value)
 
         card.updated_at = datetime.utcnow()
+        card.sync_version = next_sync_version(self.session, user_id)
         self.session.add(card)
         self.session.commit()
         self.session.refresh(card)
@@ -120,6 +155,14 @@ class CardService:
             return False
 
         self.session.delete(card)
+        self.session.add(
+            Tombstone(
+                user_id=user_id,
+                entity="card",
+                entity_id=card_id,
+                sync_version=next_sync_version(self.session, user_id),
+            )
+        )
         self.session.commit()
         return True
 
@@ -184,7 +227,16 @@ class CardService:
             return None
 
         now = datetime.utcnow()
+        self._apply_rating(card, rating, now)
+        card.updated_at = now
+        card.sync_version = next_sync_version(self.session, user_id)
+        self.session.add(card)
+        self.session.commit()
+        self.session.refresh(card)
+        return card
 
+    def _apply_rating(self, card: Card, rating: ReviewRating, now: datetime) -> None:
+        """Update a card's SRS fields for one review at ``now``."""
         if rating == ReviewRating.FORGOT:
             # Reset progress, review again soon (10 minutes)
             card.interval = 0
@@ -210,9 +262,72 @@ class CardService:
             # Increase ease factor slightly (max 3.0)
             card.ease_factor = min(3.0, card.ease_factor + 0.1)
 
-        card.updated_at = now
-        self.session.add(card)
-        self.session.commit()
-        self.session.refresh(card)
-        return card
+    def replay_reviews(self, user_id: UUID, entries: list[ReviewLogEntry]) -> ReviewReplayResult:
+        """
+        Apply a client's offline review log in one transaction.
+
+        Entries are applied in the order they happened, each as of its own
+        timestamp (clamped to now), so intervals come out as if the reviews
+        had been sent online. Entry IDs are logged, and entries already
+        replayed are skipped, so a log can be resent safely; this also
+        covers a retry racing the original request. Raises ValueError if an
+        entry ID was already logged for another user.
+        """
+        try:
+            return self._replay_reviews(user_id, entries)
+        except IntegrityError:
+            # A concurrent replay logged some of these entries first
+            self.session.rollback()
+            return self._replay_reviews(user_id, entries)
+
+    def _replay_reviews(self, user_id: UUID, entries: list[ReviewLogEntry]) -> ReviewReplayResult:
+        now = datetime.utcnow()
+        result = ReviewReplayResult()
+        if not entries:
+            return result
 
+        logged = self.session.exec(
+            select(ReviewLog.id, ReviewLog.user_id).where(
+                ReviewLog.id.in_({entry.id for entry in entries})
+            )
+        ).all()
+        # Entry IDs are global, so one already logged for someone else can't be stored
+        if any(owner != user_id for _, owner in logged):
+            raise ValueError("review log entry IDs are already in use; generate new ones")
+        seen = {log_id for log_id, _ in logged}
+        statement = select(Card).where(
+            Card.user_id == user_id, Card.id.in_({entry.card_id for entry in entries})
+        )
+        cards = {card.id: card for card in self.session.exec(statement).all()}
+
+        version = next_sync_version(self.session, user_id)
+        reviewed: dict[UUID, Card] = {}
+        for entry in sorted(entries, key=lambda entry: (_as_utc(entry.reviewed_at), entry.id)):
+            if entry.id in seen:
+                result.duplicates += 1
+                continue
+            seen.add(entry.id)
+            card = cards.get(entry.card_id)
+            if card is None:
+                result.missing += 1
+                continue
+            reviewed_at = min(_as_utc(entry.reviewed_at), now)
+            self._apply_rating(card, entry.rating, reviewed_at)
+            card.updated_at = now
+            card.sync_version = version
+            self.session.add(
+                ReviewLog(
+                    id=entry.id,
+                    user_id=user_id,
+                    card_id=card.id,
+                    rating=entry.rating.value,
+                    reviewed_at=reviewed_at,
+                    received_at=now,
+                )
+            )
+            reviewed[card.id] = card
+            result.applied += 1
+
+        self.session.commit()
+        result.cards = [CardRead.model_validate(card) for card in reviewed.values()]
+        return result
@@ -0,0 +1,150 @@
+import hashlib
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from uuid import UUID
+
+from sqlmodel import Session, func, select
+
+from app.core.config import get_settings
+from app.models.audio_cache import AudioCache
+from app.models.card import Card
+from app.models.export_artifact import ExportArtifact
+from app.models.tag import CardTag, Tag
+from app.schemas.export import ExportFormat
+from app.services.anki_service import AnkiService
+from app.services.export_service import ExportService
+
+settings = get_settings()
+
+
+class ExportArtifactService:
+    """
+    Builds export files once per library version and reuses them.
+
+    The library version is a hash of the user's card and tag counts and
+    latest timestamps, read in one aggregate query, so any card create,
+    edit, review or delete and any tag change produces a new version. With
+    audio included it also covers the cached TTS audio for the user's
+    context sentences, so audio generated or evicted since counts too. An
+    export whose artifact matches the current version is served from disk
+    without reading the library again; building a new artifact removes the
+    user's older ones in the same format.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.artifact_dir = Path(settings.export_artifact_dir)
+
+    def library_version(self, user_id: UUID, include_audio: bool = False) -> str:
+        """Version key for the user's library (and export options), in one query."""
+        user_tags = select(Tag.id).where(Tag.user_id == user_id)
+        columns = [
+            select(func.count()).where(Card.user_id == user_id).scalar_subquery(),
+            select(func.max(Card.updated_at)).where(Card.user_id == user_id).scalar_subquery(),
+            select(func.count()).where(Tag.user_id == user_id).scalar_subquery(),
+            select(func.max(Tag.created_at)).where(Tag.user_id == user_id).scalar_subquery(),
+            select(func.count())
+            .select_from(CardTag)
+            .where(CardTag.tag_id.in_(user_tags))
+            .scalar_subquery(),
+        ]
+        if include_audio:
+            user_audio = (
+                AudioCache.voice == settings.tts_voice,
+                AudioCache.model == settings.tts_model,
+                AudioCache.text.in_(select(Card.context_sentence).where(Card.user_id == user_id)),
+            )
+            columns += [
+                select(func.count()).select_from(AudioCache).where(*user_audio).scalar_subquery(),
+                select(func.max(AudioCache.created_at)).where(*user_audio).scalar_subquery(),
+            ]
+        signature = "|".join(str(value) for value in self.session.exec(select(*columns)).one())
+        signature += f"|audio={include_audio}"
+        if include_audio:
+            signature += f"|{settings.tts_voice}|{settings.tts_model}"
+        return hashlib.sha256(signature.encode()).hexdigest()
+
+    def get_by_id(self, user_id: UUID, artifact_id: UUID) -> ExportArtifact | None:
+        """Get an artifact by ID, scoped to user, if its file still exists."""
+        statement = select(ExportArtifact).where(
+            ExportArtifact.id == artifact_id, ExportArtifact.user_id == user_id
+        )
+        artifact = self.session.exec(statement).first()
+        if artifact is None or not Path(artifact.file_path).is_file():
+            return None
+        return artifact
+
+    def get_current(
+        self, user_id: UUID, export_format: ExportFormat, include_audio: bool = False
+    ) -> ExportArtifact | None:
+        """The artifact built from the current library version, if there is one."""
+        version = self.library_version(user_id, include_audio)
+        return self._find(user_id, export_format, version)
+
+    def _find(
+        self, user_id: UUID, export_format: ExportFormat, version: str
+    ) -> ExportArtifact | None:
+        statement = select(ExportArtifact).where(
+            ExportArtifact.user_id == user_id,
+            ExportArtifact.format == export_format.value,
+            ExportArtifact.version == version,
+        )
+        artifact = self.session.exec(statement).first()
+        if artifact is None or not Path(artifact.file_path).is_file():
+            return None
+        return artifact
+
+    def build(
+        self, user_id: UUID, export_format: ExportFormat, include_audio: bool = False
+    ) -> ExportArtifact:
+        """Return the artifact for the current library version, building it if needed."""
+        version = self.library_version(user_id, include_audio)
+        artifact = self._find(user_id, export_format, version)
+        if artifact is not None:
+            return artifact
+
+        if export_format == ExportFormat.APKG:
+            chunks = AnkiService(self.session).stream_apkg(user_id, include_audio)
+        else:
+            chunks = ExportService(self.session).stream(user_id, export_format)
+
+        user_dir = self.artifact_dir / str(user_id)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        path = user_dir / f"{version[:16]}.{export_format.value}"
+        # A unique temporary name per build, so concurrent jobs never share a partial file
+        size = 0
+        with NamedTemporaryFile(dir=user_dir, suffix=".part", delete=False) as output:
+            try:
+                for chunk in chunks:
+                    output.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                output.close()
+                os.unlink(output.name)
+                raise
+        os.replace(output.name, path)
+
+        self._remove_older(user_id, export_format, path)
+        artifact = ExportArtifact(
+            user_id=user_id,
+            format=export_format.value,
+            version=version,
+            file_path=str(path),
+            size_bytes=size,
+        )
+        self.session.add(artifact)
+        self.session.commit()
+        self.session.refresh(artifact)
+        return artifact
+
+    def _remove_older(self, user_id: UUID, export_format: ExportFormat, keep: Path) -> None:
+        """Delete the user's other artifacts in this format, files first."""
+        statement = select(ExportArtifact).where(
+            ExportArtifact.user_id == user_id, ExportArtifact.format == export_format.value
+        )
+        for artifact in self.session.exec(statement).all():
+            path = Path(artifact.file_path)
+            if path != keep and path.exists():
+                path.unlink()
+            self.session.delete(artifact)
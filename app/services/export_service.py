@@ -1,6 +1,24 @@
 import csv
+import json
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from io import BytesIO, StringIO
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any
+from uuid import UUID
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.schemas.export import ExportFormat
+
+settings = get_settings()
 
 HEADERS = [
     "Type",
@@ -16,31 +34,254 @@ HEADERS = [
     "Created At",
 ]
 
+UTF8_BOM = "\ufeff"
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.APKG: "application/zip",
+}
+
+# Typed columns for the JSONL, Parquet and Arrow exports
+ARROW_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("type", pa.string()),
+        ("target_text", pa.string()),
+        ("target_meaning", pa.string()),
+        ("context_sentence", pa.string()),
+        ("context_translation", pa.string()),
+        ("cloze_sentence", pa.string()),
+        ("tags", pa.list_(pa.string())),
+        ("interval", pa.int32()),
+        ("ease_factor", pa.float64()),
+        ("next_review", pa.timestamp("us")),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ]
+)
+
+# Read size when streaming a finished file to the client
+FILE_CHUNK_SIZE = 64 * 1024
+
+TAG_SEPARATOR = ", "
+_TAG_SPLIT_RE = re.compile(r"((?:[^\\,]|\\.)*)(?:,|$)")
+_TAG_UNESCAPE_RE = re.compile(r"\\(.)")
+
+
+def join_tags(tag_names: list[str]) -> str:
+    """Join tag names for the Tags column, escaping commas and backslashes in names."""
+    return TAG_SEPARATOR.join(
+        name.replace("\\", "\\\\").replace(",", "\\,") for name in tag_names
+    )
+
+
+def split_tags(value: str) -> list[str]:
+    """Split a Tags column written by ``join_tags`` back into stripped tag names."""
+    names = [_TAG_UNESCAPE_RE.sub(r"\1", part).strip() for part in _TAG_SPLIT_RE.findall(value)]
+    return [name for name in names if name]
+
+
+def _csv_row(card: Any, tag_names: list[str]) -> list[Any]:
+    return [
+        card.type,
+        card.target_text,
+        card.target_meaning,
+        card.context_sentence,
+        card.context_translation,
+        card.cloze_sentence,
+        join_tags(tag_names),
+        card.interval,
+        card.ease_factor,
+        card.next_review.strftime("%Y-%m-%d %H:%M"),
+        card.created_at.strftime("%Y-%m-%d %H:%M"),
+    ]
+
+
+def _xlsx_row(card: Card, tag_names: list[str]) -> list[Any]:
+    """Like the CSV row, but with native numbers and dates for Excel."""
+    row = _csv_row(card, tag_names)
+    row[-2:] = [card.next_review, card.created_at]
+    return row
+
+
+def _record(card: Card, tag_names: list[str]) -> dict[str, Any]:
+    return {
+        "id": str(card.id),
+        "type": card.type,
+        "target_text": card.target_text,
+        "target_meaning": card.target_meaning,
+        "context_sentence": card.context_sentence,
+        "context_translation": card.context_translation,
+        "cloze_sentence": card.cloze_sentence,
+        "tags": tag_names,
+        "interval": card.interval,
+        "ease_factor": card.ease_factor,
+        "next_review": card.next_review,
+        "created_at": card.created_at,
+        "updated_at": card.updated_at,
+    }
+
+
+def _record_batch(batch: list[tuple[Card, list[str]]]) -> pa.RecordBatch:
+    """One batch of cards as an Arrow record batch with ``ARROW_SCHEMA`` columns."""
+    records = [_record(card, tag_names) for card, tag_names in batch]
+    return pa.RecordBatch.from_pylist(records, schema=ARROW_SCHEMA)
+
+
+def _read_chunks(output: IO[bytes]) -> Iterator[bytes]:
+    """Yield an open file's contents in chunks, closing it at the end."""
+    with output:
+        while chunk := output.read(FILE_CHUNK_SIZE):
+            yield chunk
+
+
+def _take(buffer: BytesIO) -> bytes:
+    """Return what has been written to ``buffer`` and empty it."""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
 
 class ExportService:
-    """Service to export cards to CSV format."""
+    """
+    Service to export cards.
+
+    Exports read the user's cards through a server-side cursor in batches of
+    ``batch_size``, load the tags for each batch in one query, and yield
+    encoded output per batch, so memory use does not grow with library size.
+    """
+
+    def __init__(self, session: Session | None = None, batch_size: int | None = None):
+        self.session = session
+        self.batch_size = batch_size or settings.export_batch_size
+
+    def iter_card_batches(self, user_id: UUID) -> Iterator[list[tuple[Card, list[str]]]]:
+        """Yield the user's cards, newest first, as batches of ``(card, tag names)``."""
+        assert self.session is not None, "ExportService needs a session to read cards"
+        statement = (
+            select(Card)
+            .where(Card.user_id == user_id)
+            .order_by(Card.created_at.desc(), Card.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        for cards in self.session.exec(statement).partitions():
+            tag_names = self._tag_names([card.id for card in cards])
+            yield [(card, tag_names.get(card.id, [])) for card in cards]
+
+    def _tag_names(self, card_ids: list[UUID]) -> dict[UUID, list[str]]:
+        """Tag names for a batch of cards, in one query."""
+        assert self.session is not None
+        statement = (
+            select(CardTag.card_id, Tag.name)
+            .join(Tag, Tag.id == CardTag.tag_id)
+            .where(CardTag.card_id.in_(card_ids))
+            .order_by(Tag.name)
+        )
+        names: dict[UUID, list[str]] = defaultdict(list)
+        for card_id, name in self.session.exec(statement):
+            names[card_id].append(name)
+        return names
+
+    def stream_csv(self, user_id: UUID) -> Iterator[bytes]:
+        """Yield the user's cards as UTF-8 CSV (with BOM, for Excel), one chunk per batch."""
+        buffer = StringIO(newline="")
+        writer = csv.writer(buffer)
+        writer.writerow(HEADERS)
+        yield (UTF8_BOM + buffer.getvalue()).encode("utf-8")
+
+        for batch in self.iter_card_batches(user_id):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(_csv_row(card, tag_names) for card, tag_names in batch)
+            yield buffer.getvalue().encode("utf-8")
+
+    def write_xlsx(self, user_id: UUID) -> SpooledTemporaryFile[bytes]:
+        """
+        Write the user's cards to an XLSX workbook and return it rewound.
 
-    def cards_to_csv(self, cards: list) -> BytesIO:
-        """Convert a list of Card objects to a CSV file in memory."""
+        The workbook is write-only, so openpyxl streams rows to disk instead of
+        keeping cells in memory, and the finished file is spooled to disk once
+        it exceeds ``export_spool_max_bytes``. The caller closes the file.
+        """
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Cards")
+        sheet.append(HEADERS)
+        for batch in self.iter_card_batches(user_id):
+            for card, tag_names in batch:
+                sheet.append(_xlsx_row(card, tag_names))
+
+        output: SpooledTemporaryFile[bytes] = SpooledTemporaryFile(  # noqa: SIM115
+            max_size=settings.export_spool_max_bytes
+        )
+        workbook.save(output)
+        output.seek(0)
+        return output
+
+    def stream_xlsx(self, user_id: UUID) -> Iterator[bytes]:
+        """Yield the user's cards as an XLSX file, in chunks."""
+        yield from _read_chunks(self.write_xlsx(user_id))
+
+    def stream_jsonl(self, user_id: UUID) -> Iterator[bytes]:
+        """Yield the user's cards as JSON lines with typed fields, one chunk per batch."""
+        for batch in self.iter_card_batches(user_id):
+            lines = (
+                json.dumps(_record(card, tag_names), ensure_ascii=False, default=str)
+                for card, tag_names in batch
+            )
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def stream_arrow(self, user_id: UUID) -> Iterator[bytes]:
+        """Yield the user's cards as an Arrow IPC stream, one record batch per card batch."""
+        buffer = BytesIO()
+        with pa.ipc.new_stream(buffer, ARROW_SCHEMA) as writer:
+            for batch in self.iter_card_batches(user_id):
+                writer.write_batch(_record_batch(batch))
+                yield _take(buffer)
+        yield _take(buffer)
+
+    def write_parquet(self, user_id: UUID) -> SpooledTemporaryFile[bytes]:
+        """
+        Write the user's cards to a Parquet file and return it rewound.
+
+        Each card batch is written as it is read; Parquet needs its footer
+        written last, so the file is spooled like the XLSX export.
+        """
+        output: SpooledTemporaryFile[bytes] = SpooledTemporaryFile(  # noqa: SIM115
+            max_size=settings.export_spool_max_bytes
+        )
+        with pq.ParquetWriter(output, ARROW_SCHEMA) as writer:
+            for batch in self.iter_card_batches(user_id):
+                writer.write_batch(_record_batch(batch))
+        output.seek(0)
+        return output
+
+    def stream_parquet(self, user_id: UUID) -> Iterator[bytes]:
+        """Yield the user's cards as a Parquet file, in chunks."""
+        yield from _read_chunks(self.write_parquet(user_id))
+
+    def stream(self, user_id: UUID, export_format: ExportFormat) -> Iterator[bytes]:
+        """Yield the user's cards in ``export_format``."""
+        streams = {
+            ExportFormat.CSV: self.stream_csv,
+            ExportFormat.XLSX: self.stream_xlsx,
+            ExportFormat.JSONL: self.stream_jsonl,
+            ExportFormat.PARQUET: self.stream_parquet,
+            ExportFormat.ARROW: self.stream_arrow,
+        }
+        return streams[export_format](user_id)
+
+    def cards_to_csv(self, cards: Iterable[Any]) -> BytesIO:
+        """Convert already-loaded Card objects to a CSV file in memory."""
         csv_buffer = StringIO(newline="")
         writer = csv.writer(csv_buffer)
 
         writer.writerow(HEADERS)
-
         for card in cards:
-            tags_str = ", ".join(tag.name for tag in card.tags)
-            writer.writerow([
-                card.type,
-                card.target_text,
-                card.target_meaning,
-                card.context_sentence,
-                card.context_translation,
-                card.cloze_sentence,
-                tags_str,
-                card.interval,
-                card.ease_factor,
-                card.next_review.strftime("%Y-%m-%d %H:%M"),
-                card.created_at.strftime("%Y-%m-%d %H:%M"),
-            ])
+            writer.writerow(_csv_row(card, [tag.name for tag in card.tags]))
 
         return BytesIO(csv_buffer.getvalue().encode("utf-8-sig"))
@@ -0,0 +1,173 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable, Coroutine
+from typing import Any
+from uuid import UUID
+
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.core.text import normalize_text, split_into_chunks
+from app.schemas.generate import ExtractMode
+from app.services.ai_concurrency import ai_scheduler
+from app.services.ai_service import extract_learning_items
+from app.services.candidate_scorer import score_candidates
+from app.services.card_service import CardService
+
+settings = get_settings()
+
+
+class ExtractionService:
+    """
+    Candidate extraction, from short snippets to long documents.
+
+    In ``llm`` mode, text that fits in one chunk is sent to the provider as-is.
+    Longer text is split into sentence-aligned chunks that are extracted in
+    parallel (at most ``extract_chunk_concurrency`` at once), so total latency
+    stays close to that of a single chunk. Every call goes through the AI scheduler under
+    the requesting user. The reduce step merges duplicates and ranks
+    candidates found in more chunks first.
+
+    ``shortlist`` and ``fast`` modes run a local collocation/idiom scorer over
+    the whole text instead; ``shortlist`` sends only the top-scoring phrases
+    to the LLM to choose from, ``fast`` returns them without any LLM call.
+    With a session, phrases already in the user's library are dropped.
+    """
+
+    FAST_LIMIT = 20  # same cap the extraction prompt asks the LLM for
+
+    def __init__(
+        self,
+        session: Session | None = None,
+        chunk_chars: int | None = None,
+        concurrency: int | None = None,
+        max_candidates: int | None = None,
+    ):
+        self.session = session
+        self.chunk_chars = chunk_chars or settings.extract_chunk_chars
+        self.concurrency = concurrency or settings.extract_chunk_concurrency
+        self.max_candidates = max_candidates or settings.extract_max_candidates
+
+    def chunk(self, text: str) -> list[str]:
+        """Split ``text`` into the chunks that will be extracted independently."""
+        return split_into_chunks(text, self.chunk_chars)
+
+    async def extract(
+        self,
+        user_id: UUID,
+        text: str,
+        provider: str | None = None,
+        mode: ExtractMode = ExtractMode.LLM,
+    ) -> list[str]:
+        """Extract and rank learning items from text of any supported length."""
+        if mode == ExtractMode.LLM:
+            candidates = await self._extract_llm(user_id, text, provider)
+        else:
+            candidates = await self._extract_shortlist(user_id, text, provider, mode)
+        return self._drop_known(user_id, candidates)
+
+    async def _extract_llm(self, user_id: UUID, text: str, provider: str | None) -> list[str]:
+        chunks = self.chunk(text)
+        if len(chunks) <= 1:
+            async with ai_scheduler.slot(user_id):
+                return await extract_learning_items(text, provider=provider)
+
+        extract_chunk = self._chunk_extractor(user_id, provider)
+        results = await asyncio.gather(
+            *(extract_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if len(failures) == len(results):
+            raise failures[0]
+        return self.reduce([r for r in results if not isinstance(r, BaseException)])
+
+    async def _extract_shortlist(
+        self, user_id: UUID, text: str, provider: str | None, mode: ExtractMode
+    ) -> list[str]:
+        """Score phrases locally; let the LLM pick from the shortlist unless in fast mode."""
+        scored = score_candidates(text, limit=settings.extract_shortlist_size)
+        shortlist = self._drop_known(user_id, [candidate.text for candidate in scored])
+        if mode == ExtractMode.FAST or not shortlist:
+            return shortlist[: self.FAST_LIMIT]
+        async with ai_scheduler.slot(user_id):
+            return await extract_learning_items("\n".join(shortlist), provider=provider)
+
+    def _drop_known(self, user_id: UUID, candidates: list[str]) -> list[str]:
+        """Remove candidates the user already has as cards (needs a session)."""
+        if self.session is None or not candidates:
+            return candidates
+        known = CardService(self.session).find_existing_texts(user_id, candidates)
+        return [c for c in candidates if normalize_text(c) not in known]
+
+    async def stream(
+        self,
+        user_id: UUID,
+        text: str,
+        provider: str | None = None,
+        mode: ExtractMode = ExtractMode.LLM,
+    ) -> AsyncIterator[str]:
+        """
+        Yield unique candidates from each chunk as soon as that chunk finishes.
+
+        Unlike ``extract`` the output is unranked, in completion order. Fails
+        only if every chunk fails. Non-LLM modes make at most one LLM call, so
+        they yield the ranked result of ``extract`` instead.
+        """
+        if mode != ExtractMode.LLM:
+            for candidate in await self.extract(user_id, text, provider, mode):
+                yield candidate
+            return
+
+        extract_chunk = self._chunk_extractor(user_id, provider)
+        tasks = [asyncio.create_task(extract_chunk(chunk)) for chunk in self.chunk(text)]
+        seen: set[str] = set()
+        failure: BaseException | None = None
+        succeeded = False
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    candidates = await next_done
+                except Exception as e:
+                    failure = failure or e
+                    continue
+                succeeded = True
+                for candidate in candidates:
+                    key = normalize_text(candidate)
+                    if key and key not in seen:
+                        seen.add(key)
+                        yield candidate
+        finally:
+            for task in tasks:
+                task.cancel()
+        if failure is not None and not succeeded:
+            raise failure
+
+    def _chunk_extractor(
+        self, user_id: UUID, provider: str | None
+    ) -> Callable[[str], Coroutine[Any, Any, list[str]]]:
+        """Return a per-request chunk extractor capped at ``concurrency`` parallel calls."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def extract_chunk(chunk: str) -> list[str]:
+            async with semaphore, ai_scheduler.slot(user_id):
+                return await extract_learning_items(chunk, provider=provider)
+
+        return extract_chunk
+
+    def reduce(self, chunk_results: list[list[str]]) -> list[str]:
+        """
+        Merge per-chunk candidates into one ranked list.
+
+        Candidates are deduplicated by normalized text and ordered by the
+        number of chunks they appear in, then by first appearance.
+        """
+        counts: dict[str, int] = {}
+        originals: dict[str, str] = {}
+        for candidates in chunk_results:
+            for key in {normalize_text(c) for c in candidates} - {""}:
+                counts[key] = counts.get(key, 0) + 1
+            for candidate in candidates:
+                originals.setdefault(normalize_text(candidate), candidate)
+
+        order = {key: position for position, key in enumerate(originals)}
+        ranked = sorted(counts, key=lambda key: (-counts[key], order[key]))
+        return [originals[key] for key in ranked[: self.max_candidates]]
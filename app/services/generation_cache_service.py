@@ -0,0 +1,139 @@
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.core.text import canonical_text
+from app.models.generation_cache import GenerationCache
+
+settings = get_settings()
+
+
+class _MemoryLRU:
+    """Small thread-safe LRU of cache_key -> (expires_at, response)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[str, tuple[datetime, dict[str, Any]]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= datetime.utcnow():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, expires_at: datetime, value: dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_memory_cache = _MemoryLRU(settings.generation_cache_memory_size)
+
+
+class GenerationCacheService:
+    """Content-addressed cache for AI generation responses (memory LRU + database)."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def generate_cache_key(provider: str, model: str, prompt_version: str, text: str) -> str:
+        """Generate a deterministic cache key from provider, model, prompt and exact input."""
+        combined = f"{provider}|{model}|{prompt_version}|{canonical_text(text)}"
+        return hashlib.sha256(combined.encode()).hexdigest()
+
+    @staticmethod
+    def clear_memory() -> None:
+        """Drop every entry from the in-process LRU."""
+        _memory_cache.clear()
+
+    def get(
+        self, provider: str, model: str, prompt_version: str, text: str
+    ) -> dict[str, Any] | None:
+        """Return a cached response, checking the in-memory LRU before the database."""
+        cache_key = self.generate_cache_key(provider, model, prompt_version, text)
+
+        cached = _memory_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        statement = select(GenerationCache).where(GenerationCache.cache_key == cache_key)
+        entry = self.session.exec(statement).first()
+        if entry is None:
+            return None
+
+        now = datetime.utcnow()
+        if entry.expires_at <= now:
+            self.session.delete(entry)
+            self.session.commit()
+            return None
+
+        entry.last_accessed_at = now
+        entry.hit_count += 1
+        self.session.add(entry)
+        self.session.commit()
+
+        response: dict[str, Any] = json.loads(entry.response_json)
+        _memory_cache.set(cache_key, entry.expires_at, response)
+        return response
+
+    def set(
+        self,
+        provider: str,
+        model: str,
+        prompt_version: str,
+        text: str,
+        response: dict[str, Any],
+    ) -> None:
+        """Store a response in both cache layers, replacing any existing entry."""
+        cache_key = self.generate_cache_key(provider, model, prompt_version, text)
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=settings.generation_cache_ttl_seconds)
+
+        statement = select(GenerationCache).where(GenerationCache.cache_key == cache_key)
+        entry = self.session.exec(statement).first()
+        if entry is None:
+            entry = GenerationCache(
+                cache_key=cache_key,
+                provider=provider,
+                model=model,
+                prompt_version=prompt_version,
+                input_text=canonical_text(text),
+                response_json="",
+                expires_at=expires_at,
+            )
+        entry.response_json = json.dumps(response, ensure_ascii=False)
+        entry.created_at = now
+        entry.expires_at = expires_at
+        entry.last_accessed_at = now
+
+        self.session.add(entry)
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # Another request stored the same key concurrently; theirs is as good as ours.
+            self.session.rollback()
+
+        _memory_cache.set(cache_key, expires_at, response)
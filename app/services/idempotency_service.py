@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, select
+
+from app.core.config import get_settings
+from app.models.idempotency_key import IdempotencyKey
+
+settings = get_settings()
+
+
+class IdempotencyService:
+    """
+    Store of responses to writes sent with an Idempotency-Key, per user.
+
+    The first request with a key claims it with an in-progress record (the
+    unique constraint on user and key settles races), and its response is
+    stored once it finishes. An in-progress record is a lease of
+    ``idempotency_lock_seconds``: if the request dies without releasing the
+    key, a retry of the same request takes the key over once the lease has
+    passed. Records expire after ``idempotency_ttl_seconds``; a user's expired
+    records are removed when they next claim a key.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def claim(self, user_id: UUID, key: str, request_hash: str) -> tuple[IdempotencyKey, bool]:
+        """
+        Claim ``key`` for a new request, or return the record already holding it.
+
+        Returns ``(record, claimed)``; ``claimed`` is False when another
+        request used the key first and has finished or still holds its lease.
+        """
+        now = datetime.utcnow()
+        locked_until = now + timedelta(seconds=settings.idempotency_lock_seconds)
+        self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.expires_at <= now
+            )
+        )
+        existing = self._get(user_id, key)
+        if existing is not None:
+            taken_over = self._take_over(existing, request_hash, now, locked_until)
+            self.session.commit()
+            return existing, taken_over
+
+        record = IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            locked_until=locked_until,
+            expires_at=now + timedelta(seconds=settings.idempotency_ttl_seconds),
+        )
+        self.session.add(record)
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # A concurrent request with the same key claimed it first
+            self.session.rollback()
+            existing = self._get(user_id, key)
+            if existing is None:
+                raise
+            return existing, False
+        return record, True
+
+    def complete(
+        self, record: IdempotencyKey, status_code: int, media_type: str | None, body: bytes
+    ) -> None:
+        """Store the response for a claimed key."""
+        record.status_code = status_code
+        record.media_type = media_type
+        record.response_body = body
+        record.locked_until = None
+        self.session.add(record)
+        self.session.commit()
+
+    def release(self, record: IdempotencyKey) -> None:
+        """Give up a claimed key without a stored response, so the request can be retried."""
+        self.session.rollback()
+        self.session.delete(record)
+        self.session.commit()
+
+    def _take_over(
+        self, record: IdempotencyKey, request_hash: str, now: datetime, locked_until: datetime
+    ) -> bool:
+        """Renew the lease on an abandoned claim of the same request; False if it is not one."""
+        statement = (
+            update(IdempotencyKey)
+            .where(
+                col(IdempotencyKey.id) == record.id,
+                col(IdempotencyKey.request_hash) == request_hash,
+                col(IdempotencyKey.status_code).is_(None),
+                col(IdempotencyKey.locked_until) <= now,
+            )
+            .values(locked_until=locked_until)
+            .returning(col(IdempotencyKey.id))
+            .execution_options(synchronize_session=False)
+        )
+        # The conditional update lets only one of several concurrent retries win
+        return self.session.execute(statement).scalar_one_or_none() is not None
+
+    def _get(self, user_id: UUID, key: str) -> IdempotencyKey | None:
+        statement = select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+        )
+        return self.session.exec(statement).first()
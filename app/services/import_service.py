@@ -0,0 +1,292 @@
+import csv
+import io
+import math
+import uuid
+from collections.abc import Generator, Iterable
+from contextlib import closing
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any
+from uuid import UUID
+
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.core.text import normalize_text
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.schemas.card import CardBase, CardImportResult, ImportRowError
+from app.services.ai_output import infer_card_type
+from app.services.card_enrichment import make_cloze
+from app.services.card_service import CardService
+from app.services.export_service import HEADERS, split_tags
+from app.services.sync_service import next_sync_version
+
+settings = get_settings()
+
+# Export column header -> card field; imports read the same layout
+COLUMN_FIELDS = dict(
+    zip(
+        HEADERS,
+        [
+            "type",
+            "target_text",
+            "target_meaning",
+            "context_sentence",
+            "context_translation",
+            "cloze_sentence",
+            "tags",
+            "interval",
+            "ease_factor",
+            "next_review",
+            "created_at",
+        ],
+        strict=True,
+    )
+)
+REQUIRED_COLUMNS = ["Word/Phrase", "Meaning", "Context Sentence", "Context Translation"]
+
+MAX_REPORTED_ERRORS = 1000
+MAX_INTERVAL_DAYS = 36_500  # 100 years; keeps intervals well inside the INTEGER column
+
+_DATE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    text = str(value).strip()
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"invalid date {text!r}") from None
+
+
+def _cell(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _finite(value: Any, label: str) -> float:
+    """Parse a number cell, rejecting text, infinities and NaN."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid {label} {_cell(value)!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{label} must be a finite number")
+    return number
+
+
+def _message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+            for item in error.errors()
+        )
+    return str(error)
+
+
+class ImportService:
+    """
+    Service to bulk import cards from CSV or XLSX files.
+
+    Files use the export column layout (``HEADERS``); only the word/phrase,
+    meaning and context columns are required. Rows are read as a stream and
+    handled in chunks of ``batch_size``: each chunk is validated, its tags are
+    resolved with one query (missing tags are inserted together), and its
+    cards and tag links are written with multi-row INSERTs and one commit.
+    Cards already in the library are skipped; invalid rows are reported by
+    row number and do not stop the import.
+    """
+
+    def __init__(self, session: Session, batch_size: int | None = None):
+        self.session = session
+        self.batch_size = batch_size or settings.import_batch_size
+        self._tag_ids: dict[str, UUID] = {}
+        self._seen_texts: set[str] = set()
+
+    def import_file(self, user_id: UUID, file: IO[bytes], filename: str) -> CardImportResult:
+        """
+        Import cards from an uploaded file; ``.xlsx`` files are read as workbooks
+        and anything else as UTF-8 CSV.
+
+        Raises ValueError if the file cannot be read or is missing a required column.
+        """
+        is_xlsx = filename.lower().endswith(".xlsx")
+        rows = self._xlsx_rows(file) if is_xlsx else self._csv_rows(file)
+        # Close the reader even when the import stops early, while the upload is still open
+        with closing(rows):
+            return self.import_rows(user_id, rows)
+
+    def import_rows(self, user_id: UUID, rows: Iterable[list[Any]]) -> CardImportResult:
+        """Import cards from rows whose first row is the header."""
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("file is empty")
+        columns = self._column_indexes(header)
+
+        result = CardImportResult()
+        numbered = enumerate(rows, start=2)  # row 1 is the header
+        while chunk := list(islice(numbered, self.batch_size)):
+            cards = []
+            for row_number, row in chunk:
+                if not any(_cell(value) for value in row):
+                    continue
+                result.total_rows += 1
+                try:
+                    cards.append(self._parse_row(user_id, row, columns))
+                except (ValueError, ValidationError) as e:
+                    result.failed += 1
+                    if len(result.errors) < MAX_REPORTED_ERRORS:
+                        result.errors.append(ImportRowError(row=row_number, message=_message(e)))
+            created, skipped = self._insert_chunk(user_id, cards)
+            result.created += created
+            result.skipped += skipped
+        return result
+
+    def _csv_rows(self, file: IO[bytes]) -> Generator[list[Any], None, None]:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        except UnicodeDecodeError:
+            raise ValueError("CSV file is not UTF-8 encoded") from None
+        finally:
+            text.detach()
+
+    def _xlsx_rows(self, file: IO[bytes]) -> Generator[list[Any], None, None]:
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValueError(f"could not read XLSX file: {e}") from e
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+    def _column_indexes(self, header: list[Any]) -> dict[str, int]:
+        """Map card fields to column positions, matching headers case-insensitively."""
+        by_name = {name.lower(): field for name, field in COLUMN_FIELDS.items()}
+        columns: dict[str, int] = {}
+        for index, name in enumerate(header):
+            field = by_name.get(_cell(name).lower())
+            if field and field not in columns:
+                columns[field] = index
+        missing = [name for name in REQUIRED_COLUMNS if COLUMN_FIELDS[name] not in columns]
+        if missing:
+            raise ValueError(f"missing required columns: {', '.join(missing)}")
+        return columns
+
+    def _parse_row(self, user_id: UUID, row: list[Any], columns: dict[str, int]) -> dict[str, Any]:
+        """Validate one row and return the values for its cards insert, plus ``tags``."""
+        values = {
+            field: row[index] if index < len(row) else None for field, index in columns.items()
+        }
+        target_text = _cell(values.get("target_text"))
+        context_sentence = _cell(values.get("context_sentence"))
+        fields = CardBase(
+            type=_cell(values.get("type")).lower() or infer_card_type(target_text),
+            target_text=target_text,
+            target_meaning=_cell(values.get("target_meaning")),
+            context_sentence=context_sentence,
+            context_translation=_cell(values.get("context_translation")),
+            cloze_sentence=_cell(values.get("cloze_sentence"))
+            or make_cloze(target_text, context_sentence),
+        )
+        missing = [name for name, value in fields.model_dump().items() if not value]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+
+        now = datetime.utcnow()
+        card: dict[str, Any] = {
+            **fields.model_dump(mode="json"),
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "normalized_text": normalize_text(target_text),
+            "interval": 0,
+            "ease_factor": 2.5,
+            "next_review": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if _cell(values.get("interval")):
+            card["interval"] = int(_finite(values["interval"], "interval"))
+            if card["interval"] < 0:
+                raise ValueError("interval must not be negative")
+            if card["interval"] > MAX_INTERVAL_DAYS:
+                raise ValueError(f"interval must be at most {MAX_INTERVAL_DAYS} days")
+        if _cell(values.get("ease_factor")):
+            card["ease_factor"] = _finite(values["ease_factor"], "ease factor")
+            if card["ease_factor"] <= 0:
+                raise ValueError("ease factor must be positive")
+        for field in ("next_review", "created_at"):
+            if _cell(values.get(field)):
+                card[field] = _parse_datetime(values[field])
+
+        tags = split_tags(_cell(values.get("tags")))
+        card["tags"] = list(dict.fromkeys(name[:100] for name in tags))
+        return card
+
+    def _insert_chunk(self, user_id: UUID, cards: list[dict[str, Any]]) -> tuple[int, int]:
+        """Insert one chunk of parsed cards; return ``(created, skipped)``."""
+        existing = CardService(self.session).find_existing_texts(
+            user_id, [card["target_text"] for card in cards]
+        )
+        new_cards = []
+        for card in cards:
+            key = card["normalized_text"]
+            if key and (key in existing or key in self._seen_texts):
+                continue
+            self._seen_texts.add(key)
+            new_cards.append(card)
+        if not new_cards:
+            return 0, len(cards)
+
+        version = next_sync_version(self.session, user_id)
+        for card in new_cards:
+            card["sync_version"] = version
+        tag_ids = self._resolve_tags(
+            user_id, [name for card in new_cards for name in card["tags"]], version
+        )
+        links = [
+            {"card_id": card["id"], "tag_id": tag_ids[name]}
+            for card in new_cards
+            for name in card.pop("tags")
+        ]
+        self.session.execute(insert(Card), new_cards)
+        if links:
+            self.session.execute(insert(CardTag), links)
+        self.session.commit()
+        return len(new_cards), len(cards) - len(new_cards)
+
+    def _resolve_tags(self, user_id: UUID, names: list[str], version: int) -> dict[str, UUID]:
+        """Return tag IDs by name, looking up unknown names in one query and creating the rest."""
+        unknown = set(names) - self._tag_ids.keys()
+        if unknown:
+            statement = select(Tag.name, Tag.id).where(
+                Tag.user_id == user_id, Tag.name.in_(unknown)
+            )
+            self._tag_ids.update(dict(self.session.exec(statement).all()))
+            new_tags = [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "name": name,
+                    "created_at": datetime.utcnow(),
+                    "sync_version": version,
+                }
+                for name in sorted(unknown - self._tag_ids.keys())
+            ]
+            if new_tags:
+                self.session.execute(insert(Tag), new_tags)
+                self._tag_ids.update({tag["name"]: tag["id"] for tag in new_tags})
+        return self._tag_ids
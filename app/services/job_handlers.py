@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.models.export_artifact import ExportArtifact
+from app.models.job import Job
+from app.schemas.export import ExportFormat
+from app.schemas.generate import BatchGenerateResponse, ExtractMode
+from app.services.batch_generation_service import BatchGenerationService
+from app.services.export_artifact_service import ExportArtifactService
+from app.services.extraction_service import ExtractionService
+from app.services.tts_service import TTSService
+
+settings = get_settings()
+
+ProgressCallback = Callable[[int], None]
+JobHandler = Callable[[Session, Job, dict[str, Any], ProgressCallback], Awaitable[dict[str, Any]]]
+
+
+async def run_generate_batch(
+    session: Session, job: Job, payload: dict[str, Any], report: ProgressCallback
+) -> dict[str, Any]:
+    """Generate card drafts for many texts; per-item failures are part of the result."""
+    items = await BatchGenerationService(session).generate(
+        user_id=job.user_id,
+        texts=payload["texts"],
+        provider=payload.get("provider"),
+        pack_size=payload.get("pack_size", 1),
+        bypass_cache=payload.get("bypass_cache", False),
+        on_progress=report,
+    )
+    return BatchGenerateResponse(results=items).model_dump()
+
+
+async def run_extract(
+    session: Session, job: Job, payload: dict[str, Any], report: ProgressCallback
+) -> dict[str, Any]:
+    """Extract learning items from a (possibly long) document."""
+    candidates = await ExtractionService(session).extract(
+        job.user_id,
+        payload["text"],
+        provider=payload.get("provider"),
+        mode=ExtractMode(payload.get("mode", ExtractMode.LLM)),
+    )
+    return {"candidates": candidates}
+
+
+async def run_tts_prewarm(
+    session: Session, job: Job, payload: dict[str, Any], report: ProgressCallback
+) -> dict[str, Any]:
+    """Synthesize and cache audio for each text so later playback is a cache hit."""
+    tts_service = TTSService(session)
+    results: list[dict[str, Any]] = []
+    for index, text in enumerate(payload["texts"], start=1):
+        try:
+            # The OpenAI TTS client is synchronous; keep it off the event loop.
+            entry = await asyncio.to_thread(
+                tts_service.get_audio, text, payload.get("voice"), payload.get("model")
+            )
+            results.append({"text": text, "cache_key": entry.cache_key})
+        except Exception as e:
+            results.append({"text": text, "error": f"Failed to generate audio: {str(e)}"})
+        report(index)
+    return {"results": results}
+
+
+def export_result(artifact: ExportArtifact) -> dict[str, Any]:
+    """Job result for a finished export: the artifact and where to download it."""
+    return {
+        "artifact_id": str(artifact.id),
+        "format": artifact.format,
+        "size_bytes": artifact.size_bytes,
+        "download_url": f"{settings.api_v1_prefix}/export/artifacts/{artifact.id}",
+    }
+
+
+async def run_export(
+    session: Session, job: Job, payload: dict[str, Any], report: ProgressCallback
+) -> dict[str, Any]:
+    """Build (or reuse) the export file for the library's current version."""
+    # Exports read the database and write files synchronously; keep them off the event loop.
+    artifact = await asyncio.to_thread(
+        ExportArtifactService(session).build,
+        job.user_id,
+        ExportFormat(payload["format"]),
+        payload.get("include_audio", False),
+    )
+    report(1)
+    return export_result(artifact)
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    "generate_batch": run_generate_batch,
+    "extract": run_extract,
+    "tts_prewarm": run_tts_prewarm,
+    "export": run_export,
+}
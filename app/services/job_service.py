@@ -0,0 +1,128 @@
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlmodel import Session, col, select, update
+
+from app.core.config import get_settings
+from app.models.job import Job
+
+settings = get_settings()
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATUSES = {SUCCEEDED, FAILED}
+
+
+class JobService:
+    """Persistence for background jobs; the jobs table doubles as the durable queue."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create(self, user_id: UUID, kind: str, payload: dict[str, Any], total: int = 0) -> Job:
+        """Record a new queued job."""
+        job = Job(
+            user_id=user_id,
+            kind=kind,
+            payload_json=json.dumps(payload),
+            total=total,
+            max_attempts=settings.job_max_attempts,
+        )
+        self.session.add(job)
+        self.session.commit()
+        self.session.refresh(job)
+        return job
+
+    def get_by_id(self, user_id: UUID, job_id: UUID) -> Job | None:
+        """Get a job by ID for a specific user."""
+        statement = select(Job).where(Job.id == job_id, Job.user_id == user_id)
+        return self.session.exec(statement).first()
+
+    def get_all(self, user_id: UUID, limit: int = 50) -> list[Job]:
+        """Get a user's most recent jobs."""
+        statement = (
+            select(Job)
+            .where(Job.user_id == user_id)
+            .order_by(col(Job.created_at).desc())
+            .limit(limit)
+        )
+        return list(self.session.exec(statement).all())
+
+    def get_pending_ids(self) -> list[UUID]:
+        """IDs of jobs that still need to run, oldest first."""
+        statement = (
+            select(Job.id).where(Job.status == QUEUED).order_by(col(Job.created_at).asc())
+        )
+        return list(self.session.exec(statement).all())
+
+    def requeue_interrupted(self) -> int:
+        """Put jobs left running by a previous process back in the queue."""
+        result = self.session.exec(
+            update(Job).where(Job.status == RUNNING).values(status=QUEUED)
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def claim(self, job_id: UUID) -> Job | None:
+        """
+        Atomically move a queued job to running and return it.
+
+        Returns None if the job is gone or another worker claimed it first.
+        """
+        now = datetime.utcnow()
+        result = self.session.exec(
+            update(Job)
+            .where(Job.id == job_id, Job.status == QUEUED)
+            .values(
+                status=RUNNING,
+                attempts=Job.attempts + 1,
+                started_at=now,
+                updated_at=now,
+            )
+        )
+        self.session.commit()
+        if result.rowcount != 1:
+            return None
+        job = self.session.get(Job, job_id)
+        if job is not None:
+            self.session.refresh(job)
+        return job
+
+    def update_progress(self, job: Job, progress: int) -> None:
+        """Record how many of ``job.total`` units are done."""
+        job.progress = progress
+        job.updated_at = datetime.utcnow()
+        self.session.add(job)
+        self.session.commit()
+
+    def complete(self, job: Job, result: dict[str, Any]) -> None:
+        """Store the result and mark the job succeeded."""
+        job.status = SUCCEEDED
+        job.result_json = json.dumps(result)
+        job.error = None
+        job.progress = max(job.progress, job.total)
+        job.finished_at = job.updated_at = datetime.utcnow()
+        self.session.add(job)
+        self.session.commit()
+
+    def fail(self, job: Job, error: str, retryable: bool = True) -> bool:
+        """
+        Record a failed attempt.
+
+        A retryable failure puts the job back in the queue while it has
+        attempts left; returns True in that case, False once it is marked
+        failed for good.
+        """
+        retry = retryable and job.attempts < job.max_attempts
+        job.status = QUEUED if retry else FAILED
+        job.error = error[:2000]
+        job.updated_at = datetime.utcnow()
+        if not retry:
+            job.finished_at = job.updated_at
+        self.session.add(job)
+        self.session.commit()
+        return retry
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.core.database import engine
+from app.services.job_handlers import JOB_HANDLERS
+from app.services.job_service import JobService
+
+settings = get_settings()
+
+
+class JobWorker:
+    """
+    In-process asyncio worker pool for background jobs.
+
+    The jobs table is the source of truth: submitting only nudges an idle
+    worker, and on startup every queued job (including ones a previous
+    process left running) is picked up again, so no external broker is
+    needed. Failed attempts are retried with exponential backoff up to the
+    job's ``max_attempts``; configuration errors (``ValueError``) fail at once.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        session_factory: Callable[[], Session] | None = None,
+    ):
+        self.concurrency = concurrency or settings.job_workers
+        self.session_factory = session_factory or (lambda: Session(engine))
+        self._queue: asyncio.Queue[UUID] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._timers: set[asyncio.Task[None]] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Recover unfinished jobs and start the worker tasks."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        with self.session_factory() as session:
+            job_service = JobService(session)
+            job_service.requeue_interrupted()
+            for job_id in job_service.get_pending_ids():
+                self._queue.put_nowait(job_id)
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(max(1, self.concurrency))
+        ]
+
+    async def shutdown(self) -> None:
+        """Stop the workers; interrupted jobs are requeued on the next start."""
+        tasks = [*self._workers, *self._timers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        self._timers.clear()
+        self._queue = None
+
+    def submit(self, job_id: UUID) -> None:
+        """Queue a persisted job for execution (a no-op until the pool is started)."""
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def run_job(self, job_id: UUID) -> None:
+        """Claim and run one job, recording its result, progress or failure."""
+        with self.session_factory() as session:
+            job_service = JobService(session)
+            job = job_service.claim(job_id)
+            if job is None:
+                return
+
+            handler = JOB_HANDLERS.get(job.kind)
+            if handler is None:
+                job_service.fail(job, f"Unknown job kind: {job.kind}", retryable=False)
+                return
+
+            def report(progress: int) -> None:
+                job_service.update_progress(job, progress)
+
+            try:
+                result = await handler(session, job, json.loads(job.payload_json), report)
+            except ValueError as e:
+                job_service.fail(job, str(e), retryable=False)
+                return
+            except Exception as e:
+                if job_service.fail(job, f"{type(e).__name__}: {e}"):
+                    self._retry_later(job.id, job.attempts)
+                return
+            job_service.complete(job, result)
+
+    def _retry_later(self, job_id: UUID, attempts: int) -> None:
+        delay = settings.job_retry_delay_seconds * 2 ** (attempts - 1)
+
+        async def resubmit() -> None:
+            await asyncio.sleep(delay)
+            self.submit(job_id)
+
+        timer = asyncio.create_task(resubmit())
+        self._timers.add(timer)
+        timer.add_done_callback(self._timers.discard)
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception:
+                # A broken job must not take the worker down with it.
+                pass
+            finally:
+                queue.task_done()
+
+
+job_worker = JobWorker()
@@ -0,0 +1,97 @@
+import json
+import re
+from typing import Any
+
+_KEY_RE = re.compile(r'^\s*"((?:[^"\\]|\\.)*)"\s*:')
+
+
+class IncrementalJSONParser:
+    """
+    Incrementally parse a streamed JSON object.
+
+    Feed text chunks as they arrive; ``feed`` returns the top-level fields that
+    became complete, as ``("field", key, value)``. If ``array_key`` is set,
+    elements of that top-level array are also returned one by one as
+    ``("item", array_key, value)`` while the array is still streaming.
+    Anything before the first ``{`` (such as a stray code fence) is ignored.
+    """
+
+    def __init__(self, array_key: str | None = None):
+        self.array_key = array_key
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self._item_start: int | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, str, Any]]:
+        """Consume a chunk and return the events it completed."""
+        self._buffer += chunk
+        events: list[tuple[str, str, Any]] = []
+
+        while self._pos < len(self._buffer):
+            i = self._pos
+            char = self._buffer[i]
+            self._pos += 1
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = i + 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._is_array_member(i):
+                    self._item_start = i + 1
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 2 and self._item_start is not None:
+                    self._emit_item(i, events)
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_member(i, events)
+            elif char == ",":
+                if self._depth == 1:
+                    self._emit_member(i, events)
+                    self._member_start = i + 1
+                elif self._depth == 2 and self._item_start is not None:
+                    self._emit_item(i, events)
+                    self._item_start = i + 1
+
+        return events
+
+    def _is_array_member(self, index: int) -> bool:
+        """Return True if the array opening at ``index`` is the value of ``array_key``."""
+        if self.array_key is None:
+            return False
+        match = _KEY_RE.match(self._buffer[self._member_start : index])
+        return match is not None and json.loads(f'"{match.group(1)}"') == self.array_key
+
+    def _emit_member(self, end: int, events: list[tuple[str, str, Any]]) -> None:
+        segment = self._buffer[self._member_start : end].strip()
+        if not segment:
+            return
+        for key, value in json.loads("{" + segment + "}").items():
+            events.append(("field", key, value))
+
+    def _emit_item(self, end: int, events: list[tuple[str, str, Any]]) -> None:
+        assert self._item_start is not None and self.array_key is not None
+        segment = self._buffer[self._item_start : end].strip()
+        if segment:
+            events.append(("item", self.array_key, json.loads(segment)))
@@ -0,0 +1,106 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+from uuid import UUID
+
+from sqlmodel import Session
+
+from app.core.text import normalize_text
+from app.schemas.generate import ExtractMode, GenerateResponse
+from app.services.ai_concurrency import ai_scheduler
+from app.services.ai_service import stream_learning_items
+from app.services.batch_generation_service import BatchGenerationService
+from app.services.extraction_service import ExtractionService
+
+_DONE: tuple[str, dict[str, Any]] = ("done", {})
+
+
+class ExtractionPipelineService:
+    """
+    Overlapping extract -> generate pipeline.
+
+    Each candidate starts generating as soon as extraction yields it, and
+    drafts are emitted in completion order rather than candidate order.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.batch_service = BatchGenerationService(session)
+        self.extraction_service = ExtractionService(session)
+
+    async def run(
+        self,
+        user_id: UUID,
+        text: str,
+        provider: str | None = None,
+        mode: ExtractMode = ExtractMode.LLM,
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """
+        Yield ``(event, data)`` pairs for the pipeline.
+
+        Events: ``candidate`` when extraction finds an item, ``draft`` when its
+        card is ready, ``error`` for a failed item or failed extraction, and a
+        final ``done``.
+        """
+        events: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue()
+        tasks: set[asyncio.Task[None]] = set()
+        counts = {"candidates": 0, "drafts": 0, "errors": 0}
+
+        async def generate(index: int, candidate: str) -> None:
+            try:
+                outcome = await self.batch_service.generate_one(user_id, candidate, provider)
+            except Exception as e:
+                outcome = f"AI service error: {str(e)}"
+            if isinstance(outcome, GenerateResponse):
+                counts["drafts"] += 1
+                await events.put(
+                    ("draft", {"index": index, "text": candidate, "card": outcome.model_dump()})
+                )
+            else:
+                counts["errors"] += 1
+                await events.put(("error", {"index": index, "text": candidate, "detail": outcome}))
+
+        async def extract() -> None:
+            seen: set[str] = set()
+            if mode == ExtractMode.LLM and len(self.extraction_service.chunk(text)) == 1:
+                candidates = self._stream_single(user_id, text, provider)
+            else:
+                candidates = self.extraction_service.stream(user_id, text, provider, mode)
+            try:
+                async for candidate in candidates:
+                    key = normalize_text(candidate)
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+                    index = counts["candidates"]
+                    counts["candidates"] += 1
+                    await events.put(("candidate", {"index": index, "text": candidate}))
+                    tasks.add(asyncio.create_task(generate(index, candidate)))
+            except Exception as e:
+                counts["errors"] += 1
+                detail = f"AI service error: {str(e)}"
+                await events.put(("error", {"index": None, "detail": detail}))
+
+        async def supervise() -> None:
+            try:
+                await extract()
+                await asyncio.gather(*tasks)
+            finally:
+                await events.put(_DONE)
+
+        supervisor = asyncio.create_task(supervise())
+        try:
+            while (event := await events.get()) is not _DONE:
+                yield event
+            yield "done", dict(counts)
+        finally:
+            supervisor.cancel()
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _stream_single(user_id: UUID, text: str, provider: str | None) -> AsyncIterator[str]:
+        """Stream extraction of a short text while holding one scheduler slot."""
+        async with ai_scheduler.slot(user_id):
+            async for candidate in stream_learning_items(text, provider=provider):
+                yield candidate
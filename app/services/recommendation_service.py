@@ -0,0 +1,77 @@
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from app.core.text import normalize_text
+from app.schemas.generate import GenerateResponse
+from app.services.ai_concurrency import ai_scheduler
+from app.services.ai_service import recommend_related_items
+from app.services.card_service import CardService
+
+
+class RecommendationService:
+    """
+    Recommends related items while excluding the user's library on the server.
+
+    The library is never sent to the LLM. Each round's suggestions are checked
+    against an indexed normalized-text lookup and duplicates are dropped. Only
+    this request's own suggestions, accepted and rejected, go back into the
+    next prompt to be avoided, so prompt size stays bounded however big the
+    library gets.
+    """
+
+    MAX_ROUNDS = 3
+    MAX_REQUEST = 10
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.card_service = CardService(session)
+
+    async def recommend(
+        self,
+        user_id: UUID,
+        text: str,
+        provider: str | None = None,
+        count: int = 5,
+        extra_exclusions: list[str] | None = None,
+    ) -> list[GenerateResponse]:
+        """Return up to ``count`` recommendations not already in the user's library."""
+        seen = {normalize_text(text)} | {normalize_text(t) for t in extra_exclusions or []}
+        rejected: list[str] = []
+        results: list[GenerateResponse] = []
+
+        for round_number in range(self.MAX_ROUNDS):
+            needed = count - len(results)
+            if needed <= 0:
+                break
+            # Ask for spares after the first round, since some will be duplicates
+            request_count = needed if round_number == 0 else min(needed * 2, self.MAX_REQUEST)
+            async with ai_scheduler.slot(user_id):
+                items = await recommend_related_items(
+                    text,
+                    existing_texts=[card.target_text for card in results] + rejected,
+                    provider=provider,
+                    count=request_count,
+                )
+
+            candidates: list[tuple[str, GenerateResponse]] = []
+            for item in items:
+                try:
+                    card = GenerateResponse(**item)
+                except (TypeError, ValidationError):
+                    continue
+                candidates.append((normalize_text(card.target_text), card))
+
+            existing = self.card_service.find_existing_texts(
+                user_id, [card.target_text for _, card in candidates]
+            )
+            for key, card in candidates:
+                if not key or key in seen or key in existing:
+                    rejected.append(card.target_text)
+                    continue
+                seen.add(key)
+                if len(results) < count:
+                    results.append(card)
+
+        return results
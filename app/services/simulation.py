@@ -0,0 +1,91 @@
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import httpx
+
+# Standard normal quantile at 0.99; converts a p50/p99 pair into a lognormal sigma
+_Z_99 = 2.326
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: one 417-byte frame per ~26 ms.
+# A header followed by zeroed side info and main data decodes as silence.
+_MP3_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x64])
+_MP3_FRAME_SIZE = 417
+
+
+@dataclass
+class SimulatedFaults:
+    """
+    Latency and error injection for the local stand-in providers.
+
+    Latency is lognormal with the given median and p99 (both in milliseconds);
+    ``error_rate`` is the probability that a call fails with ``error_status``.
+    Pass ``seed`` for a reproducible sequence.
+    """
+
+    latency_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int | None = None
+    _random: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def sample_latency(self) -> float:
+        """Draw one latency, in seconds."""
+        if self.latency_ms <= 0:
+            return 0.0
+        p99 = max(self.latency_p99_ms, self.latency_ms)
+        sigma = math.log(p99 / self.latency_ms) / _Z_99
+        return self._random.lognormvariate(math.log(self.latency_ms), sigma) / 1000
+
+    def maybe_fail(self, url: str) -> None:
+        """Raise an HTTPStatusError like a real provider would, ``error_rate`` of the time."""
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            request = httpx.Request("POST", url)
+            response = httpx.Response(self.error_status, request=request)
+            raise httpx.HTTPStatusError(
+                f"Simulated provider error {self.error_status}",
+                request=request,
+                response=response,
+            )
+
+    async def simulate(self, url: str) -> None:
+        """Sleep for one sampled latency, then possibly fail."""
+        await asyncio.sleep(self.sample_latency())
+        self.maybe_fail(url)
+
+    def simulate_blocking(self, url: str) -> None:
+        """Synchronous ``simulate`` for blocking clients."""
+        time.sleep(self.sample_latency())
+        self.maybe_fail(url)
+
+
+def synthetic_mp3(text: str) -> bytes:
+    """Return silent MP3 audio whose duration grows with ``text`` (~15 characters/second)."""
+    frame = _MP3_FRAME_HEADER + bytes(_MP3_FRAME_SIZE - len(_MP3_FRAME_HEADER))
+    frames = max(10, len(text) * 3)
+    return frame * frames
+
+
+class LocalTTSClient:
+    """
+    Offline stand-in for the OpenAI client's ``audio.speech`` API.
+
+    Returns deterministic synthetic MP3 bytes after a simulated latency.
+    """
+
+    url = "local://tts"
+
+    def __init__(self, faults: SimulatedFaults):
+        self.faults = faults
+        self.audio = SimpleNamespace(speech=SimpleNamespace(create=self._create_speech))
+
+    def _create_speech(self, model: str, voice: str, input: str) -> SimpleNamespace:
+        self.faults.simulate_blocking(self.url)
+        return SimpleNamespace(content=synthetic_mp3(input))
@@ -3,7 +3,9 @@ from uuid import UUID
 from sqlmodel import Session, select
 
 from app.models.tag import Tag
+from app.models.tombstone import Tombstone
 from app.schemas.tag import TagCreate
+from app.services.sync_service import next_sync_version
 
 
 class TagService:
@@ -17,6 +19,7 @@ class TagService:
         tag = Tag(
             user_id=user_id,
             name=tag_data.name,
+            sync_version=next_sync_version(self.session, user_id),
         )
         self.session.add(tag)
         self.session.commit()
@@ -60,5 +63,13 @@ class TagService:
             return False
 
         self.session.delete(tag)
+        self.session.add(
+            Tombstone(
+                user_id=user_id,
+                entity="tag",
+                entity_id=tag_id,
+                sync_version=next_sync_version(self.session, user_id),
+            )
+        )
         self.session.commit()
         return True
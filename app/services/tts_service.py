@@ -9,16 +9,36 @@ from sqlmodel import Session, func, select
 
 from app.core.config import get_settings
 from app.models.audio_cache import AudioCache
+from app.services.simulation import LocalTTSClient, SimulatedFaults
 
 settings = get_settings()
 
+_local_client: LocalTTSClient | None = None
+
+
+def _create_client() -> OpenAI | LocalTTSClient:
+    """Return the TTS client for the configured provider."""
+    global _local_client
+    if settings.tts_provider == "local":
+        if _local_client is None:
+            _local_client = LocalTTSClient(
+                SimulatedFaults(
+                    latency_ms=settings.local_tts_latency_ms,
+                    latency_p99_ms=settings.local_tts_latency_p99_ms,
+                    error_rate=settings.local_tts_error_rate,
+                    seed=settings.local_seed,
+                )
+            )
+        return _local_client
+    return OpenAI(api_key=settings.openai_api_key)
+
 
 class TTSService:
     """Service for Text-to-Speech with caching."""
 
     def __init__(self, session: Session):
         self.session = session
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = _create_client()
         self.cache_dir = Path(settings.tts_cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
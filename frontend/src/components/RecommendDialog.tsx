@@ -20,14 +20,12 @@ import type { Card as CardType, GenerateResponse } from '../services/api';
 
 interface RecommendDialogProps {
   card: CardType | null;
-  existingTexts: string[];
   onClose: () => void;
   onSuccess: () => void;
 }
 
 export default function RecommendDialog({
   card,
-  existingTexts,
   onClose,
   onSuccess,
 }: RecommendDialogProps) {
@@ -58,7 +56,7 @@ export default function RecommendDialog({
     setRecommendations([]);
     setSelected(new Set());
     try {
-      const res = await generateApi.recommend(card.target_text, existingTexts);
+      const res = await generateApi.recommend(card.target_text);
       setRecommendations(res.data.recommendations);
     } catch (err: unknown) {
       const msg = err instanceof Error ? err.message : 'Failed to get recommendations';
@@ -415,7 +415,6 @@ export default function LibraryPage() {
       {/* Recommend Dialog */}
       <RecommendDialog
         card={recommendCard}
-        existingTexts={cards.map((c) => c.target_text)}
         onClose={() => setRecommendCard(null)}
         onSuccess={() => {
           setRecommendCard(null);
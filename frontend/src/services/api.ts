@@ -77,6 +77,13 @@ export const cardsApi = {
   delete: (id: string) => api.delete(`/cards/${id}`),
   review: (id: string, rating: 'forgot' | 'hard' | 'remembered') =>
     api.post(`/cards/${id}/review`, { rating }),
+  replayReviews: (entries: ReviewLogEntry[]) =>
+    api.post<ReviewReplayResult>('/cards/reviews', { entries }),
+  importCards: (file: File) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return api.post('/cards/import', formData);
+  },
 };
 
 // Tags API
@@ -91,12 +98,19 @@ export const tagsApi = {
 export const generateApi = {
   generate: (text: string, provider?: string) =>
     api.post('/generate', { text, provider }),
-  extract: (text: string, provider?: string) =>
-    api.post<{ candidates: string[] }>('/generate/extract', { text, provider }),
-  recommend: (text: string, existingTexts: string[], provider?: string) =>
+  generateBatch: (texts: string[], provider?: string, packSize?: number) =>
+    api.post<{ results: BatchGenerateItem[] }>('/generate/batch', {
+      texts,
+      provider,
+      pack_size: packSize,
+    }),
+  // mode: 'llm' (default), 'shortlist' (local pre-pass, LLM ranks) or 'fast' (no LLM)
+  extract: (text: string, provider?: string, mode?: 'llm' | 'shortlist' | 'fast') =>
+    api.post<{ candidates: string[] }>('/generate/extract', { text, provider, mode }),
+  // The server excludes everything already in the user's library
+  recommend: (text: string, provider?: string) =>
     api.post<{ recommendations: GenerateResponse[] }>('/generate/recommend', {
       text,
-      existing_texts: existingTexts,
       provider,
     }),
 };
@@ -111,6 +125,40 @@ export interface GenerateResponse {
   tags: string[];
 }
 
+export interface BatchGenerateItem {
+  text: string;
+  card: GenerateResponse | null;
+  error: string | null;
+}
+
+// Jobs API (long-running work runs in the background; poll get() for progress)
+export const jobsApi = {
+  generateBatch: (texts: string[], provider?: string, packSize?: number) =>
+    api.post<Job>('/jobs/generate-batch', { texts, provider, pack_size: packSize }),
+  extract: (text: string, provider?: string, mode?: 'llm' | 'shortlist' | 'fast') =>
+    api.post<Job>('/jobs/extract', { text, provider, mode }),
+  prewarmTts: (texts: string[]) => api.post<Job>('/jobs/tts-prewarm', { texts }),
+  export: (format: ExportFormat = 'csv', includeAudio = false) =>
+    api.post<Job>('/jobs/export', { format, include_audio: includeAudio }),
+  list: () => api.get<{ items: Job[]; total: number }>('/jobs'),
+  get: (id: string) => api.get<Job>(`/jobs/${id}`),
+};
+
+export interface Job {
+  id: string;
+  kind: 'generate_batch' | 'extract' | 'tts_prewarm' | 'export';
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  progress: number;
+  total: number;
+  attempts: number;
+  max_attempts: number;
+  result: Record<string, unknown> | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
 // TTS API
 export const ttsApi = {
   generateAudio: async (text: string): Promise<Blob> => {
@@ -123,15 +171,30 @@ export const ttsApi = {
 };
 
 // Export API
+export type ExportFormat = 'csv' | 'xlsx' | 'jsonl' | 'parquet' | 'arrow' | 'apkg';
+
 export const exportApi = {
-  exportCards: async (): Promise<Blob> => {
+  exportCards: async (format: ExportFormat = 'csv', includeAudio = false): Promise<Blob> => {
     const response = await api.get('/export/cards', {
+      params: { format, include_audio: includeAudio },
+      responseType: 'blob',
+    });
+    return response.data;
+  },
+  downloadArtifact: async (artifactId: string): Promise<Blob> => {
+    const response = await api.get(`/export/artifacts/${artifactId}`, {
       responseType: 'blob',
     });
     return response.data;
   },
 };
 
+// Sync API
+export const syncApi = {
+  changes: (since?: string, limit = 500) =>
+    api.get<SyncChanges>('/sync', { params: { since, limit } }),
+};
+
 // Types
 export interface Tag {
   id: string;
@@ -186,6 +249,20 @@ export interface Card {
   tags: Tag[];
 }
 
+export interface ReviewLogEntry {
+  id: string;
+  card_id: string;
+  rating: 'forgot' | 'hard' | 'remembered';
+  reviewed_at: string;
+}
+
+export interface ReviewReplayResult {
+  applied: number;
+  duplicates: number;
+  missing: number;
+  cards: Card[];
+}
+
 export interface CardListResponse {
   items: Card[];
   total: number;
@@ -193,4 +270,13 @@ export interface CardListResponse {
   page_size: number;
 }
 
+export interface SyncChanges {
+  cards: Card[];
+  tags: Tag[];
+  deleted_cards: string[];
+  deleted_tags: string[];
+  next_token: string | null;
+  has_more: boolean;
+}
+
 export default api;
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+
+def test_backup_and_restore(client: TestClient, auth_headers: dict):
+    """Test a downloaded backup restores into another account."""
+    card_data = {
+        "type": "phrase",
+        "target_text": "call it a day",
+        "target_meaning": "收工",
+        "context_sentence": "Let's call it a day.",
+        "context_translation": "我们收工吧。",
+        "cloze_sentence": "Let's _______.",
+    }
+    client.post("/api/v1/cards", json=card_data, headers=auth_headers)
+
+    response = client.get("/api/v1/backup", headers=auth_headers)
+    assert response.status_code == 200
+    assert "filename=flashcards_backup.earbak" in response.headers["content-disposition"]
+    backup = response.content
+
+    client.post(
+        "/api/v1/auth/register", json={"email": "other@example.com", "password": "password123"}
+    )
+    login = client.post(
+        "/api/v1/auth/login", data={"username": "other@example.com", "password": "password123"}
+    )
+    other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = client.post(
+        "/api/v1/backup/restore",
+        files={"file": ("library.earbak", backup, "application/octet-stream")},
+        headers=other_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["cards_created"] == 1
+    cards = client.get("/api/v1/cards", headers=other_headers).json()["items"]
+    assert cards[0]["target_text"] == "call it a day"
+
+
+def test_restore_rejects_invalid_file(client: TestClient, auth_headers: dict):
+    """Test restoring a file that is not a backup fails."""
+    response = client.post(
+        "/api/v1/backup/restore",
+        files={"file": ("library.earbak", b"not a backup", "application/octet-stream")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_backup_requires_auth(client: TestClient):
+    """Test backup download requires authentication."""
+    response = client.get("/api/v1/backup")
+    assert response.status_code == 401
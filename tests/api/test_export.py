@@ -1,6 +1,9 @@
+import zipfile
 from io import BytesIO
 
+import pytest
 from fastapi.testclient import TestClient
+from openpyxl import load_workbook
 
 
 def test_export_cards_returns_csv(client: TestClient, auth_headers: dict):
@@ -15,6 +18,54 @@ def test_export_cards_returns_csv(client: TestClient, auth_headers: dict):
     assert "Word/Phrase" in headers
 
 
+def test_export_cards_returns_xlsx(client: TestClient, auth_headers: dict):
+    """Test that format=xlsx returns a workbook with the same columns."""
+    response = client.get("/api/v1/export/cards?format=xlsx", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    assert "filename=flashcards_export.xlsx" in response.headers.get("content-disposition", "")
+    workbook = load_workbook(BytesIO(response.content))
+    headers = next(workbook["Cards"].iter_rows(values_only=True))
+    assert "Word/Phrase" in headers
+
+
+@pytest.mark.parametrize(
+    ("export_format", "media_type"),
+    [
+        ("jsonl", "application/x-ndjson"),
+        ("parquet", "application/vnd.apache.parquet"),
+        ("arrow", "application/vnd.apache.arrow.stream"),
+    ],
+)
+def test_export_cards_returns_typed_formats(
+    client: TestClient, auth_headers: dict, export_format: str, media_type: str
+):
+    """Test that the columnar and line-delimited formats are served with their own type."""
+    response = client.get(f"/api/v1/export/cards?format={export_format}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(media_type)
+    disposition = response.headers.get("content-disposition", "")
+    assert f"filename=flashcards_export.{export_format}" in disposition
+
+
+def test_export_cards_returns_apkg(client: TestClient, auth_headers: dict):
+    """Test that format=apkg returns an Anki package with a collection and media index."""
+    response = client.get("/api/v1/export/cards?format=apkg", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/zip")
+    assert "filename=flashcards_export.apkg" in response.headers.get("content-disposition", "")
+    names = zipfile.ZipFile(BytesIO(response.content)).namelist()
+    assert set(names) == {"collection.anki2", "media"}
+
+
+def test_export_cards_rejects_unknown_format(client: TestClient, auth_headers: dict):
+    """Test that an unsupported format is a validation error."""
+    response = client.get("/api/v1/export/cards?format=pdf", headers=auth_headers)
+    assert response.status_code == 422
+
+
 def test_export_cards_requires_auth(client: TestClient):
     """Test that the export endpoint requires authentication."""
     response = client.get("/api/v1/export/cards")
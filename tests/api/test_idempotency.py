@@ -0,0 +1,151 @@
+import asyncio
+from concurrent import futures
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete, select
+
+from app.core.config import get_settings
+from app.models.card import Card
+from app.models.idempotency_key import IdempotencyKey
+from app.services.card_service import CardService
+from app.services.idempotency_service import IdempotencyService
+
+CARD_DATA = {
+    "type": "phrase",
+    "target_text": "call it a day",
+    "target_meaning": "收工",
+    "context_sentence": "Let's call it a day.",
+    "context_translation": "我们收工吧。",
+    "cloze_sentence": "Let's _______.",
+}
+
+
+def _with_key(headers: dict, key: str) -> dict:
+    return {**headers, "Idempotency-Key": key}
+
+
+def test_retried_create_returns_stored_response(
+    client: TestClient, auth_headers: dict, session: Session
+):
+    """Test a retried card creation returns the first response without a second card."""
+    headers = _with_key(auth_headers, "create-1")
+    first = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+    retry = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(session.exec(select(Card)).all()) == 1
+
+
+def test_retried_review_applies_once(client: TestClient, auth_headers: dict):
+    """Test a retried review does not advance the card twice."""
+    card_id = client.post("/api/v1/cards", json=CARD_DATA, headers=auth_headers).json()["id"]
+    headers = _with_key(auth_headers, "review-1")
+    for _ in range(3):
+        response = client.post(
+            f"/api/v1/cards/{card_id}/review", json={"rating": "remembered"}, headers=headers
+        )
+        assert response.json()["interval"] == 1
+
+    card = client.get(f"/api/v1/cards/{card_id}", headers=auth_headers).json()
+    assert card["interval"] == 1
+
+
+def test_key_reused_for_different_request(client: TestClient, auth_headers: dict):
+    """Test reusing a key with a different body is rejected."""
+    headers = _with_key(auth_headers, "create-2")
+    client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+    response = client.post(
+        "/api/v1/cards", json={**CARD_DATA, "target_text": "hit the road"}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_request_in_progress_conflicts(client: TestClient, auth_headers: dict):
+    """Test a retry while the first request is still running gets 409."""
+    headers = _with_key(auth_headers, "create-3")
+    # The first request never gets as far as storing its response
+    with patch.object(IdempotencyService, "complete"):
+        client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+
+    response = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+    assert response.status_code == 409
+
+
+def test_failed_request_releases_key(client: TestClient, auth_headers: dict):
+    """Test errors are not stored, so the same key can be retried."""
+    headers = _with_key(auth_headers, "review-2")
+    missing = "/api/v1/cards/00000000-0000-0000-0000-000000000000/review"
+    assert client.post(missing, json={"rating": "hard"}, headers=headers).status_code == 404
+
+    card_id = client.post("/api/v1/cards", json=CARD_DATA, headers=auth_headers).json()["id"]
+    response = client.post(
+        f"/api/v1/cards/{card_id}/review", json={"rating": "hard"}, headers=headers
+    )
+    assert response.status_code == 200
+
+
+def test_expired_key_runs_again(client: TestClient, auth_headers: dict, session: Session):
+    """Test a key is forgotten once its record expires."""
+    headers = _with_key(auth_headers, "create-4")
+    with patch.object(get_settings(), "idempotency_ttl_seconds", 0):
+        client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+        response = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+
+    assert "Idempotent-Replayed" not in response.headers
+    assert len(session.exec(select(Card)).all()) == 2
+
+
+def test_abandoned_key_is_taken_over_after_its_lease(
+    client: TestClient, auth_headers: dict, session: Session
+):
+    """Test a retry runs again once a dead request's lease on the key has passed."""
+    headers = _with_key(auth_headers, "create-5")
+    # The first request dies without storing its response or releasing the key
+    with (
+        patch.object(get_settings(), "idempotency_lock_seconds", 0),
+        patch.object(IdempotencyService, "complete"),
+    ):
+        client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+    session.exec(delete(Card))
+    session.commit()
+
+    with patch.object(get_settings(), "idempotency_lock_seconds", 0):
+        response = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+    retry = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+
+    assert response.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(session.exec(select(Card)).all()) == 1
+
+
+def test_cancelled_request_releases_key(client: TestClient, auth_headers: dict):
+    """Test a request cancelled mid-flight does not leave its key in progress."""
+    headers = _with_key(auth_headers, "create-6")
+    with (
+        patch.object(CardService, "create", side_effect=asyncio.CancelledError),
+        # The test client's portal reports the cancellation as its own error type
+        pytest.raises((asyncio.CancelledError, futures.CancelledError)),
+    ):
+        client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+
+    response = client.post("/api/v1/cards", json=CARD_DATA, headers=headers)
+    assert response.status_code == 201
+
+
+def test_uploads_are_not_tracked(client: TestClient, auth_headers: dict, session: Session):
+    """Test file uploads pass through without the body being hashed or a key stored."""
+    with patch("app.api.idempotency._request_hash") as request_hash:
+        response = client.post(
+            "/api/v1/cards/import",
+            files={"file": ("cards.csv", b"target_text\n", "text/csv")},
+            headers=_with_key(auth_headers, "import-1"),
+        )
+
+    assert response.status_code == 400
+    request_hash.assert_not_called()
+    assert session.exec(select(IdempotencyKey)).all() == []
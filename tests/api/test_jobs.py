@@ -0,0 +1,107 @@
+import asyncio
+from unittest.mock import patch
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.services.job_service import JobService
+from app.services.job_worker import JobWorker
+
+
+def test_submit_batch_job_returns_queued_job(client: TestClient, auth_headers: dict):
+    """Test submitting a batch generation job returns 202 and a pollable job."""
+    response = client.post(
+        "/api/v1/jobs/generate-batch",
+        json={"texts": ["break the ice", " break  the ice ", "Break the ice.", "call it a day"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["kind"] == "generate_batch"
+    assert job["status"] == "queued"
+    # Counted the way the worker dedupes: whitespace only, keeping case and punctuation
+    assert job["total"] == 3
+
+    response = client.get(f"/api/v1/jobs/{job['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == job["id"]
+
+    response = client.get("/api/v1/jobs", headers=auth_headers)
+    assert response.json()["total"] == 1
+
+
+def test_get_job_not_found(client: TestClient, auth_headers: dict):
+    """Test fetching an unknown job returns 404."""
+    response = client.get(
+        "/api/v1/jobs/00000000-0000-0000-0000-000000000000", headers=auth_headers
+    )
+    assert response.status_code == 404
+
+
+def test_submit_job_requires_auth(client: TestClient):
+    """Test job submission requires authentication."""
+    response = client.post("/api/v1/jobs/extract", json={"text": "some text"})
+    assert response.status_code == 401
+
+
+def test_job_events_end_when_job_finishes(
+    client: TestClient, auth_headers: dict, session: Session
+):
+    """Test the SSE progress stream sends the finished job and closes."""
+    response = client.post(
+        "/api/v1/jobs/extract", json={"text": "some text"}, headers=auth_headers
+    )
+    job_id = response.json()["id"]
+    job_service = JobService(session)
+    job = job_service.claim(UUID(job_id))
+    job_service.complete(job, {"candidates": ["break the ice"]})
+
+    response = client.get(f"/api/v1/jobs/{job_id}/events", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.text.startswith("event: job\n")
+    assert response.text.count("event: job") == 1
+    assert '"status": "succeeded"' in response.text
+    assert '"candidates": ["break the ice"]' in response.text
+
+
+def test_export_job_builds_then_reuses_artifact(
+    client: TestClient, auth_headers: dict, session: Session, tmp_path
+):
+    """Test an export job produces a resumable download that is reused while unchanged."""
+    engine = session.get_bind()
+    worker = JobWorker(session_factory=lambda: Session(engine))
+    with patch.object(get_settings(), "export_artifact_dir", str(tmp_path)):
+        response = client.post("/api/v1/jobs/export", json={"format": "csv"}, headers=auth_headers)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+
+        asyncio.run(worker.run_job(UUID(job["id"])))
+        result = client.get(f"/api/v1/jobs/{job['id']}", headers=auth_headers).json()["result"]
+
+        download = client.get(result["download_url"], headers=auth_headers)
+        assert download.status_code == 200
+        assert download.headers["accept-ranges"] == "bytes"
+        assert len(download.content) == result["size_bytes"]
+
+        partial = client.get(
+            result["download_url"], headers={**auth_headers, "Range": "bytes=3-"}
+        )
+        assert partial.status_code == 206
+        assert partial.content == download.content[3:]
+
+        response = client.post("/api/v1/jobs/export", json={"format": "csv"}, headers=auth_headers)
+        reused = response.json()
+        assert reused["status"] == "succeeded"
+        assert reused["result"]["artifact_id"] == result["artifact_id"]
+
+
+def test_download_unknown_artifact_returns_404(client: TestClient, auth_headers: dict):
+    """Test downloading an artifact that does not exist returns 404."""
+    response = client.get(
+        "/api/v1/export/artifacts/00000000-0000-0000-0000-000000000000", headers=auth_headers
+    )
+    assert response.status_code == 404
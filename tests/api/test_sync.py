@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+
+def test_sync_returns_changes_since_token(client: TestClient, auth_headers: dict):
+    """Test a second sync returns only what changed after the first."""
+    card_data = {
+        "type": "phrase",
+        "target_text": "call it a day",
+        "target_meaning": "收工",
+        "context_sentence": "Let's call it a day.",
+        "context_translation": "我们收工吧。",
+        "cloze_sentence": "Let's _______.",
+    }
+    card = client.post("/api/v1/cards", json=card_data, headers=auth_headers).json()
+
+    response = client.get("/api/v1/sync", headers=auth_headers)
+    assert response.status_code == 200
+    first = response.json()
+    assert [c["id"] for c in first["cards"]] == [card["id"]]
+
+    client.delete(f"/api/v1/cards/{card['id']}", headers=auth_headers)
+    response = client.get(
+        "/api/v1/sync", params={"since": first["next_token"]}, headers=auth_headers
+    )
+    second = response.json()
+    assert second["cards"] == []
+    assert second["deleted_cards"] == [card["id"]]
+
+
+def test_sync_rejects_invalid_token(client: TestClient, auth_headers: dict):
+    """Test a malformed token is a bad request."""
+    response = client.get("/api/v1/sync", params={"since": "garbage"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_sync_requires_auth(client: TestClient):
+    """Test sync requires authentication."""
+    response = client.get("/api/v1/sync")
+    assert response.status_code == 401
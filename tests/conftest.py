@@ -5,6 +5,7 @@ from sqlmodel.pool import StaticPool
 
 from app.core.database import get_session
 from app.main import app
+from app.services.generation_cache_service import GenerationCacheService
 
 
 @pytest.fixture(name="session")
@@ -20,6 +21,14 @@ def session_fixture():
         yield session
 
 
+@pytest.fixture(autouse=True)
+def clear_generation_cache():
+    """Keep the process-wide generation LRU from leaking between tests."""
+    GenerationCacheService.clear_memory()
+    yield
+    GenerationCacheService.clear_memory()
+
+
 @pytest.fixture(name="client")
 def client_fixture(session: Session):
     """Create a test client with overridden database dependency."""
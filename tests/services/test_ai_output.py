@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.ai_output import (
+    MalformedOutputError,
+    parse_json_output,
+    repair_candidates,
+    repair_card,
+)
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ('{"a": 1}', {"a": 1}),
+        ('```json\n{"a": 1,}\n```', {"a": 1}),
+        ('Sure! {"a": [1, 2,], "b": "x"} Hope this helps.', {"a": [1, 2], "b": "x"}),
+        ('{"a": "x", "b": "truncat', {"a": "x", "b": "truncat"}),
+        ('{"a": "x", "b', {"a": "x"}),
+        ('{"cards": [{"a": 1}, {"a": 2', {"cards": [{"a": 1}, {"a": 2}]}),
+        ('{"a": "x, y}", }', {"a": "x, y}"}),
+    ],
+)
+def test_parse_json_output_repairs_common_defects(content, expected):
+    assert parse_json_output(content) == expected
+
+
+def test_parse_json_output_rejects_non_json():
+    with pytest.raises(MalformedOutputError):
+        parse_json_output("I cannot help with that.")
+
+
+def test_repair_card_normalizes_and_fills_derivable_fields():
+    card = repair_card(
+        {
+            "Type": "Phrase",
+            "target_meaning": "打破僵局",
+            "context_sentence": "He broke the ice with a joke.",
+            "context_translation": "他用一个笑话打破了僵局。",
+            "tags": "people",
+            "confidence": 0.9,
+        },
+        source_text="break the ice",
+    )
+
+    assert card == {
+        "type": "phrase",
+        "target_text": "break the ice",
+        "target_meaning": "打破僵局",
+        "context_sentence": "He broke the ice with a joke.",
+        "context_translation": "他用一个笑话打破了僵局。",
+        "cloze_sentence": "He _______ with a joke.",
+        "tags": ["people"],
+    }
+
+
+def test_repair_card_reports_missing_fields():
+    with pytest.raises(MalformedOutputError, match="target_meaning, context_translation"):
+        repair_card(
+            {"type": "phrase", "context_sentence": "Let's call it a day."},
+            source_text="call it a day",
+        )
+
+
+def test_repair_candidates_keeps_unique_strings():
+    assert repair_candidates([" give up ", "give up", "", None, {"x": 1}, "call it a day"]) == [
+        "give up",
+        "call it a day",
+    ]
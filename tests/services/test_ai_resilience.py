@@ -0,0 +1,223 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.ai_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    LatencyWindow,
+    RetryPolicy,
+    is_retryable,
+)
+from app.services.ai_service import AIProvider, ResilientProvider, answering_provider_name
+
+NO_WAIT = RetryPolicy(attempts=2, base_delay=0, max_delay=0)
+
+
+def _status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://example.test")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(code, request=request)
+    )
+
+
+class FakeProvider(AIProvider):
+    def __init__(self, results, delay: float = 0.0):
+        self.results = list(results)
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, text):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def generate_many(self, texts):
+        raise NotImplementedError
+
+    async def extract_candidates(self, text):
+        raise NotImplementedError
+
+    async def recommend(self, text, existing_texts, count=5):
+        raise NotImplementedError
+
+
+def _wrap(primary, fallback=None, **kwargs) -> ResilientProvider:
+    names = ["primary"] + (["fallback"] if fallback else [])
+    return ResilientProvider(
+        "primary",
+        primary,
+        "fallback" if fallback else None,
+        fallback,
+        breakers={name: CircuitBreaker(failure_threshold=2, reset_timeout=60) for name in names},
+        latencies={name: LatencyWindow() for name in names},
+        retry_policy=kwargs.pop("retry_policy", NO_WAIT),
+        **kwargs,
+    )
+
+
+def test_is_retryable():
+    assert is_retryable(_status_error(429))
+    assert is_retryable(_status_error(503))
+    assert not is_retryable(_status_error(400))
+    assert is_retryable(httpx.ReadTimeout("slow"))
+    assert not is_retryable(ValueError("bad json"))
+
+
+def test_retry_delay_honours_retry_after():
+    request = httpx.Request("POST", "https://example.test")
+    response = httpx.Response(429, request=request, headers={"Retry-After": "3"})
+    error = httpx.HTTPStatusError("limited", request=request, response=response)
+    assert RetryPolicy(max_delay=8).delay(0, error) == 3
+    assert RetryPolicy(max_delay=2).delay(0, error) == 2
+    assert 0 <= RetryPolicy(base_delay=1, max_delay=8).delay(2) <= 4
+
+
+async def test_retries_transient_errors_then_succeeds():
+    primary = FakeProvider([_status_error(503), {"ok": True}])
+    provider = _wrap(primary)
+
+    assert await provider.generate("x") == {"ok": True}
+    assert primary.calls == 2
+
+
+async def test_does_not_retry_client_errors():
+    primary = FakeProvider([_status_error(400)])
+    provider = _wrap(primary)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider.generate("x")
+    assert primary.calls == 1
+
+
+async def test_falls_back_when_primary_keeps_failing():
+    primary = FakeProvider([_status_error(500)])
+    fallback = FakeProvider([{"from": "fallback"}])
+    provider = _wrap(primary, fallback)
+
+    assert await provider.generate("x") == {"from": "fallback"}
+    assert answering_provider_name("primary") == "fallback"
+    # The breaker opens after 2 failures, cutting the last retry short
+    assert primary.calls == 2
+    assert provider.breakers["primary"].state == CircuitBreaker.OPEN
+
+
+async def test_open_circuit_skips_primary():
+    primary = FakeProvider([_status_error(500)])
+    fallback = FakeProvider([{"from": "fallback"}])
+    provider = _wrap(primary, fallback, retry_policy=RetryPolicy(attempts=0))
+
+    await provider.generate("x")
+    await provider.generate("x")
+    assert provider.breakers["primary"].state == CircuitBreaker.OPEN
+
+    calls_before = primary.calls
+    assert await provider.generate("x") == {"from": "fallback"}
+    assert primary.calls == calls_before
+
+
+async def test_all_circuits_open_raises():
+    provider = _wrap(FakeProvider([{"ok": True}]))
+    breaker = provider.breakers["primary"]
+    breaker.record_failure()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        await provider.generate("x")
+
+
+async def test_hedged_request_returns_faster_fallback():
+    primary = FakeProvider([{"from": "primary"}], delay=1.0)
+    fallback = FakeProvider([{"from": "fallback"}])
+    provider = _wrap(primary, fallback, hedge_enabled=True, hedge_after_seconds=0.05)
+
+    start = time.monotonic()
+    assert await provider.generate("x") == {"from": "fallback"}
+    assert time.monotonic() - start < 0.5
+    assert answering_provider_name("primary") == "fallback"
+
+
+async def test_hedge_not_sent_when_primary_is_fast():
+    primary = FakeProvider([{"from": "primary"}])
+    fallback = FakeProvider([{"from": "fallback"}])
+    provider = _wrap(primary, fallback, hedge_enabled=True, hedge_after_seconds=0.5)
+
+    assert await provider.generate("x") == {"from": "primary"}
+    assert fallback.calls == 0
+    assert answering_provider_name("primary") == "primary"
+
+
+async def test_timed_out_attempt_not_retried_past_deadline():
+    primary = FakeProvider([httpx.ReadTimeout("slow")])
+    fallback = FakeProvider([{"from": "fallback"}])
+    policy = RetryPolicy(attempts=2, base_delay=0, max_delay=0, attempt_timeout=10)
+    provider = _wrap(primary, fallback, retry_policy=policy, deadline_seconds=5)
+
+    assert await provider.generate("x") == {"from": "fallback"}
+    # Another 10s attempt cannot fit in the 5s deadline, so the fallback gets the time
+    assert primary.calls == 1
+
+
+async def test_deadline_caps_the_whole_call():
+    primary = FakeProvider([{"from": "primary"}], delay=1.0)
+    provider = _wrap(primary, deadline_seconds=0.05)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        await provider.generate("x")
+    assert time.monotonic() - start < 0.5
+    assert provider.breakers["primary"].available()
+
+
+async def test_stream_falls_back_before_first_item():
+    primary = FakeProvider([_status_error(503)])
+    fallback = FakeProvider([{"from": "fallback"}])
+    provider = _wrap(primary, fallback)
+
+    fields = [field async for field in provider.stream_generate("x")]
+
+    assert fields == [("from", "fallback")]
+    assert answering_provider_name("primary") == "fallback"
+
+
+async def test_stream_closed_early_releases_half_open_trial():
+    provider = _wrap(FakeProvider([{"a": 1, "b": 2}]))
+    breaker = provider.breakers["primary"]
+    breaker.reset_timeout = 0
+    breaker.record_failure()
+    breaker.record_failure()
+
+    stream = provider.stream_generate("x")
+    assert await anext(stream) == ("a", 1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    await stream.aclose()
+
+    assert breaker.allow()
+
+
+def test_circuit_breaker_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.available()
+    assert breaker.allow()  # claims the half-open trial
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_latency_window_percentiles():
+    window = LatencyWindow(size=100)
+    assert window.percentile(95) is None
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+    assert window.percentile(50) == pytest.approx(0.05, abs=0.002)
+    assert window.percentile(95) == pytest.approx(0.095, abs=0.002)
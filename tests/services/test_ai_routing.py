@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.ai_routing import (
+    EXTRACT,
+    FAST,
+    GENERATE,
+    STRONG,
+    ModelRouter,
+    Route,
+    choose_tier,
+    is_simple_input,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "simple"),
+    [
+        ("call it a day", True),
+        ("Break the ice.", True),
+        ("a piece of cake indeed", False),  # five words
+        ("one's cup of tea", True),
+        ("antidisestablishment", False),  # long, rare word
+        ("COVID-19 lockdown", False),  # digits
+        ("打破僵局", False),
+        ("", False),
+    ],
+)
+def test_is_simple_input(text, simple):
+    assert is_simple_input(text) is simple
+
+
+def test_choose_tier_per_operation():
+    assert choose_tier(GENERATE, ["give up", "call it a day"]) == FAST
+    assert choose_tier(GENERATE, ["give up", "I would rather have stayed at home."]) == STRONG
+    assert choose_tier(EXTRACT, ["word " * 100]) == FAST
+    assert choose_tier(EXTRACT, ["word " * 1000]) == STRONG
+
+
+def test_router_uses_default_model_when_disabled():
+    router = ModelRouter()
+    assert router.route("openai", "gpt-4o-mini", GENERATE, ["a long sentence " * 5]) == Route(
+        FAST, "gpt-4o-mini"
+    )
+
+
+def test_router_picks_configured_models_and_records_cost():
+    router = ModelRouter()
+    with patch.object(get_settings(), "ai_routing_enabled", True):
+        fast = router.route("openai", "gpt-4o-mini", GENERATE, ["give up"])
+        strong = router.route("openai", "gpt-4o-mini", GENERATE, ["Could you elaborate on that?"])
+    assert fast == Route(FAST, "gpt-4o-mini")
+    assert strong == Route(STRONG, "gpt-4o")
+
+    router.record("openai", strong, 0.5, input_tokens=1_000_000, output_tokens=100_000)
+    router.record("openai", strong, 1.5, failed=True)
+
+    [stats] = router.stats()
+    assert stats["model"] == "gpt-4o"
+    assert stats["calls"] == 2
+    assert stats["failures"] == 1
+    assert stats["cost_usd"] == pytest.approx(3.5)
+    assert stats["p95_ms"] == 1500
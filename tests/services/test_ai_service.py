@@ -0,0 +1,252 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.services.ai_routing import model_router
+from app.services.ai_service import (
+    FIXUP_SYSTEM_PROMPT,
+    AIServiceFactory,
+    GeminiProvider,
+    OpenAIProvider,
+    generate_card_data,
+)
+
+
+def _openai_reply(payload: dict) -> dict:
+    return {"choices": [{"message": {"content": json.dumps(payload)}}]}
+
+
+def _gemini_reply(payload: dict) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": json.dumps(payload)}]}}]}
+
+
+@pytest.fixture(autouse=True)
+def reset_factory():
+    _clear_factory()
+    yield
+    _clear_factory()
+
+
+def _clear_factory():
+    AIServiceFactory._providers.clear()
+    AIServiceFactory._resilient.clear()
+    AIServiceFactory._breakers.clear()
+    AIServiceFactory._latencies.clear()
+
+
+async def test_openai_provider_reuses_client():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=_openai_reply({"candidates": ["break the ice"]}))
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        headers={"Authorization": "Bearer sk-test"},
+    )
+    provider = OpenAIProvider("sk-test", client=client)
+
+    assert await provider.extract_candidates("text one") == ["break the ice"]
+    assert await provider.extract_candidates("text two") == ["break the ice"]
+
+    assert len(seen) == 2
+    assert provider.client is client
+    body = json.loads(seen[0].content)
+    assert body["model"] == "gpt-4o-mini"
+    assert body["messages"][1]["content"] == "text one"
+    assert seen[0].headers["Authorization"] == "Bearer sk-test"
+    await provider.aclose()
+    assert client.is_closed
+
+
+async def test_gemini_provider_sends_prompt_with_input_prefix():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=_gemini_reply({"type": "phrase"}))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = GeminiProvider("g-key", client=client)
+
+    assert await provider.generate("call it a day") == {"type": "phrase"}
+    body = json.loads(seen[0].content)
+    assert body["contents"][0]["parts"][0]["text"].endswith("\n\nInput: call it a day")
+    await provider.aclose()
+
+
+async def test_openai_provider_streams_fields():
+    deltas = ['{"type": "phr', 'ase", "target_meaning": "收工"', ', "tags": []}']
+    body = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': d}}]})}\n\n" for d in deltas
+    )
+    body += "data: [DONE]\n\n"
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = OpenAIProvider("sk-test", client=client)
+
+    fields = [field async for field in provider.stream_generate("call it a day")]
+
+    assert fields == [("type", "phrase"), ("target_meaning", "收工"), ("tags", [])]
+    assert seen[0]["stream"] is True
+    await provider.aclose()
+
+
+async def test_gemini_provider_streams_candidates():
+    parts = ['{"candidates": ["break the ice", ', '"call it a day"]}']
+    body = "".join(
+        "data: "
+        + json.dumps({"candidates": [{"content": {"parts": [{"text": p}]}}]})
+        + "\n\n"
+        for p in parts
+    )
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, text=body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = GeminiProvider("g-key", client=client)
+
+    candidates = [c async for c in provider.stream_candidates("some text")]
+
+    assert candidates == ["break the ice", "call it a day"]
+    assert ":streamGenerateContent" in seen[0].url.path
+    assert seen[0].url.params["alt"] == "sse"
+    await provider.aclose()
+
+
+async def test_providers_route_hard_inputs_to_strong_model():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if "googleapis" in request.url.host:
+            reply = _gemini_reply({"type": "sentence"})
+            reply["usageMetadata"] = {"promptTokenCount": 200, "candidatesTokenCount": 50}
+        else:
+            reply = _openai_reply({"type": "phrase"})
+            reply["usage"] = {"prompt_tokens": 100, "completion_tokens": 40}
+        return httpx.Response(200, json=reply)
+
+    transport = httpx.MockTransport(handler)
+    openai = OpenAIProvider("sk-test", client=httpx.AsyncClient(transport=transport))
+    gemini = GeminiProvider("g-key", client=httpx.AsyncClient(transport=transport))
+    model_router.reset()
+    try:
+        with patch.object(get_settings(), "ai_routing_enabled", True):
+            await openai.generate("give up")
+            await gemini.generate("Notwithstanding the forecast, we proceeded.")
+    finally:
+        await openai.aclose()
+        await gemini.aclose()
+
+    assert json.loads(seen[0].content)["model"] == "gpt-4o-mini"
+    assert seen[1].url.path.endswith("/gemini-1.5-pro:generateContent")
+    routes = {(r["provider"], r["model"]): r for r in model_router.stats()}
+    assert routes[("openai", "gpt-4o-mini")]["output_tokens"] == 40
+    assert routes[("gemini", "gemini-1.5-pro")]["input_tokens"] == 200
+    model_router.reset()
+
+
+async def test_openai_provider_fixes_unrepairable_output_with_short_prompt():
+    replies = iter(
+        [
+            {"choices": [{"message": {"content": "Here are the candidates: give up"}}]},
+            _openai_reply({"candidates": ["give up"]}),
+        ]
+    )
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json=next(replies))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = OpenAIProvider("sk-test", client=client)
+
+    assert await provider.extract_candidates("I never give up.") == ["give up"]
+    assert seen[1]["messages"][0]["content"] == FIXUP_SYSTEM_PROMPT
+    assert "Here are the candidates" in seen[1]["messages"][1]["content"]
+    await provider.aclose()
+
+
+async def test_generate_card_data_fixes_up_missing_fields():
+    partial = {"type": "phrase", "context_sentence": "Let's call it a day."}
+    complete = {
+        **partial,
+        "target_meaning": "收工",
+        "context_translation": "我们收工吧。",
+    }
+    provider = AsyncMock()
+    provider.generate.return_value = partial
+    provider.fix_up.return_value = complete
+
+    with patch.object(AIServiceFactory, "create", return_value=provider):
+        card = await generate_card_data("call it a day")
+
+    assert card["target_text"] == "call it a day"
+    assert card["cloze_sentence"] == "Let's _______."
+    problem = provider.fix_up.await_args.args[1]
+    assert "target_meaning" in problem and "call it a day" in problem
+
+
+async def test_openai_provider_raises_on_http_error():
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(500))
+    )
+    provider = OpenAIProvider("sk-test", client=client)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider.generate("anything")
+    await provider.aclose()
+
+
+async def test_factory_returns_shared_instance_and_closes_on_shutdown():
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    original_key = settings.openai_api_key
+    settings.openai_api_key = "sk-test"
+    try:
+        first = AIServiceFactory.create("openai")
+        second = AIServiceFactory.create("openai")
+        assert first is second
+
+        await AIServiceFactory.shutdown()
+        assert first.client.is_closed
+        assert AIServiceFactory.create("openai") is not first
+        await AIServiceFactory.shutdown()
+    finally:
+        settings.openai_api_key = original_key
+
+
+async def test_factory_wraps_provider_with_fallback():
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    original = (settings.openai_api_key, settings.gemini_api_key)
+    settings.openai_api_key, settings.gemini_api_key = "sk-test", "g-key"
+    try:
+        provider = AIServiceFactory.create("openai")
+        assert provider.primary is AIServiceFactory.get_provider("openai")
+        assert provider.fallback is AIServiceFactory.get_provider("gemini")
+        assert set(AIServiceFactory.health()) == {"openai", "gemini"}
+        await AIServiceFactory.shutdown()
+    finally:
+        settings.openai_api_key, settings.gemini_api_key = original
+
+
+def test_factory_unknown_provider():
+    with pytest.raises(ValueError, match="Unknown AI provider"):
+        AIServiceFactory.create("nope")
@@ -0,0 +1,220 @@
+import json
+import sqlite3
+import zipfile
+from datetime import datetime
+from io import BytesIO
+
+import pytest
+from sqlmodel import select
+
+from app.core.config import get_settings
+from app.models.audio_cache import AudioCache
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.models.user import User
+from app.services.anki_service import MODEL_ID, AnkiService
+from app.services.tts_service import TTSService
+
+
+def _make_user(session, email="anki@example.com"):
+    user = User(email=email, hashed_password="x")
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def _make_library(session, user_id, count=3):
+    tag = Tag(user_id=user_id, name="phrasal verbs")
+    session.add(tag)
+    cards = []
+    for i in range(count):
+        card = Card(
+            user_id=user_id,
+            type="phrase",
+            target_text=f"word{i}",
+            target_meaning="意思 & 含义",
+            context_sentence=f"A sentence with word{i}.",
+            context_translation="翻译",
+            cloze_sentence="A sentence with _______.",
+            normalized_text=f"word{i}",
+            interval=i * 3,
+            ease_factor=2.3,
+            next_review=datetime(2026, 5, 1 + i),
+            created_at=datetime(2026, 1, 1 + i),
+        )
+        session.add(card)
+        cards.append(card)
+    session.commit()
+    session.add(CardTag(card_id=cards[0].id, tag_id=tag.id))
+    session.commit()
+    return cards
+
+
+def _open_package(data, tmp_path):
+    package = zipfile.ZipFile(BytesIO(data))
+    path = tmp_path / "collection.anki2"
+    path.write_bytes(package.read("collection.anki2"))
+    return package, sqlite3.connect(path)
+
+
+def _build_apkg(tmp_path, models, notes, cards=(), crt=946684800, name="collection.anki2"):
+    """Build a minimal .apkg with the given note types, notes and cards."""
+    path = tmp_path / "source.anki2"
+    collection = sqlite3.connect(path)
+    collection.executescript(
+        """
+        CREATE TABLE col (crt integer, models text);
+        CREATE TABLE notes (id integer, mid integer, tags text, flds text);
+        CREATE TABLE cards (id integer, nid integer, ord integer, type integer,
+                            due integer, ivl integer, factor integer);
+        """
+    )
+    collection.execute("INSERT INTO col VALUES (?, ?)", (crt, json.dumps(models)))
+    collection.executemany("INSERT INTO notes VALUES (?,?,?,?)", notes)
+    collection.executemany("INSERT INTO cards VALUES (?,?,?,?,?,?,?)", cards)
+    collection.commit()
+    collection.close()
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.write(path, name)
+        package.writestr("media", "{}")
+    buffer.seek(0)
+    return buffer
+
+
+class TestAnkiExport:
+    def test_writes_notes_cards_and_tags(self, session, tmp_path):
+        user_id = _make_user(session)
+        _make_library(session, user_id)
+
+        data = b"".join(AnkiService(session, batch_size=2).stream_apkg(user_id))
+
+        package, collection = _open_package(data, tmp_path)
+        assert json.loads(package.read("media")) == {}
+        notes = collection.execute("SELECT flds, tags FROM notes ORDER BY id").fetchall()
+        assert len(notes) == 3
+        fields, tags = notes[0]
+        assert fields.split("\x1f")[:2] == ["word0", "意思 &amp; 含义"]
+        assert tags == " phrasal_verbs "
+        (models,) = collection.execute("SELECT models FROM col").fetchone()
+        model = json.loads(models)[str(MODEL_ID)]
+        assert [field["name"] for field in model["flds"]][:2] == ["Word/Phrase", "Meaning"]
+
+    def test_maps_srs_state(self, session, tmp_path):
+        user_id = _make_user(session)
+        _make_library(session, user_id)
+
+        data = b"".join(AnkiService(session).stream_apkg(user_id))
+
+        _, collection = _open_package(data, tmp_path)
+        rows = collection.execute(
+            "SELECT c.type, c.ivl, c.factor FROM cards c JOIN notes n ON n.id = c.nid ORDER BY n.id"
+        ).fetchall()
+        assert rows == [(0, 0, 2300), (2, 3, 2300), (2, 6, 2300)]
+
+    def test_includes_cached_audio(self, session, tmp_path):
+        user_id = _make_user(session)
+        cards = _make_library(session, user_id, count=2)
+        settings = get_settings()
+        sentence = cards[1].context_sentence
+        cache_key = TTSService.generate_cache_key(sentence, settings.tts_voice, settings.tts_model)
+        audio_path = tmp_path / f"{cache_key}.mp3"
+        audio_path.write_bytes(b"ID3 fake mp3")
+        session.add(
+            AudioCache(
+                cache_key=cache_key,
+                text=sentence,
+                voice=settings.tts_voice,
+                model=settings.tts_model,
+                file_size_bytes=12,
+                file_path=str(audio_path),
+            )
+        )
+        session.commit()
+
+        data = b"".join(AnkiService(session).stream_apkg(user_id, include_audio=True))
+
+        package, collection = _open_package(data, tmp_path)
+        assert json.loads(package.read("media")) == {"0": audio_path.name}
+        assert package.read("0") == b"ID3 fake mp3"
+        audio_fields = [
+            row[0].split("\x1f")[-1]
+            for row in collection.execute("SELECT flds FROM notes ORDER BY id")
+        ]
+        assert audio_fields == ["", f"[sound:{audio_path.name}]"]
+
+
+class TestAnkiImport:
+    def test_round_trips_an_export(self, session):
+        source_id = _make_user(session)
+        _make_library(session, source_id)
+        data = b"".join(AnkiService(session).stream_apkg(source_id))
+
+        target_id = _make_user(session, email="target@example.com")
+        result = AnkiService(session).import_apkg(target_id, BytesIO(data))
+
+        assert (result.created, result.failed) == (3, 0)
+        cards = session.exec(
+            select(Card).where(Card.user_id == target_id).order_by(Card.target_text)
+        ).all()
+        assert [card.target_meaning for card in cards] == ["意思 & 含义"] * 3
+        assert [card.interval for card in cards] == [0, 3, 6]
+        assert cards[2].next_review == datetime(2026, 5, 3)
+        assert cards[0].created_at == datetime(2026, 1, 1)
+        assert [tag.name for tag in cards[0].tags] == ["phrasal verbs"]
+
+    def test_maps_basic_and_cloze_notes(self, session, tmp_path):
+        user_id = _make_user(session)
+        models = {
+            "1": {"type": 0, "flds": [{"name": "Front", "ord": 0}, {"name": "Back", "ord": 1}]},
+            "2": {"type": 1, "flds": [{"name": "Text", "ord": 0}, {"name": "Extra", "ord": 1}]},
+        }
+        notes = [
+            (1700000000000, 1, " vocab a,b c\\d ", "<b>give up</b>\x1f放弃&nbsp;[sound:x.mp3]"),
+            (1700000000001, 2, "", "Don't {{c1::give in::yield}} now.\x1f屈服"),
+        ]
+        cards = [(1, 1700000000000, 0, 2, 8000, 12, 2650)]
+        file = _build_apkg(tmp_path, models, notes, cards)
+
+        result = AnkiService(session).import_apkg(user_id, file)
+
+        assert result.created == 2
+        basic = session.exec(select(Card).where(Card.target_text == "give up")).one()
+        assert basic.target_meaning == "放弃"
+        assert basic.context_sentence == "give up"
+        assert (basic.interval, basic.ease_factor) == (12, 2.65)
+        assert basic.next_review == datetime(2021, 11, 26)
+        assert sorted(tag.name for tag in basic.tags) == ["a,b", "c\\d", "vocab"]
+        cloze = session.exec(select(Card).where(Card.target_text == "give in")).one()
+        assert cloze.context_sentence == "Don't give in now."
+        assert cloze.cloze_sentence == "Don't _______ now."
+        assert cloze.target_meaning == "屈服"
+
+    def test_prefers_anki21_collection(self, session, tmp_path):
+        user_id = _make_user(session)
+        models = {
+            "1": {"type": 0, "flds": [{"name": "Front", "ord": 0}, {"name": "Back", "ord": 1}]}
+        }
+        file = _build_apkg(
+            tmp_path, models, [(1, 1, "", "hello\x1f你好")], name="collection.anki21"
+        )
+
+        result = AnkiService(session).import_apkg(user_id, file)
+
+        assert result.created == 1
+
+    def test_rejects_files_that_are_not_packages(self, session):
+        user_id = _make_user(session)
+
+        with pytest.raises(ValueError, match="not an Anki package"):
+            AnkiService(session).import_apkg(user_id, BytesIO(b"not a zip"))
+
+    def test_rejects_newest_format_only_packages(self, session):
+        user_id = _make_user(session)
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w") as package:
+            package.writestr("collection.anki21b", b"zstd data")
+        buffer.seek(0)
+
+        with pytest.raises(ValueError, match="Support older Anki versions"):
+            AnkiService(session).import_apkg(user_id, buffer)
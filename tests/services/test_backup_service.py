@@ -0,0 +1,192 @@
+from datetime import datetime
+from io import BytesIO
+
+import pyarrow as pa
+import pytest
+from sqlmodel import select
+
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.models.user import User
+from app.services.backup_service import (
+    _FRAME,
+    _HEADER,
+    _IPC_OPTIONS,
+    CARDS,
+    END,
+    FORMAT_VERSION,
+    MAGIC,
+    BackupService,
+)
+
+
+def _make_user(session, email):
+    user = User(email=email, hashed_password="x")
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def _make_library(session, user_id, count=5):
+    work = Tag(user_id=user_id, name="work")
+    food = Tag(user_id=user_id, name="food")
+    session.add_all([work, food])
+    cards = []
+    for i in range(count):
+        card = Card(
+            user_id=user_id,
+            type="phrase",
+            target_text=f"word{i}",
+            target_meaning="意思, 含义",
+            context_sentence=f"A sentence with word{i}.",
+            context_translation="翻译",
+            cloze_sentence="A sentence with _______.",
+            normalized_text=f"word{i}",
+            interval=i,
+            ease_factor=2.5 - i / 10,
+            next_review=datetime(2026, 5, 1, 12, 30, 15, 123456),
+            created_at=datetime(2026, 1, 1 + i),
+        )
+        session.add(card)
+        cards.append(card)
+    session.commit()
+    session.add_all(
+        [
+            CardTag(card_id=cards[0].id, tag_id=work.id),
+            CardTag(card_id=cards[0].id, tag_id=food.id),
+            CardTag(card_id=cards[1].id, tag_id=work.id),
+        ]
+    )
+    session.commit()
+
+
+def _backup(session, user_id, batch_size=2):
+    return BytesIO(b"".join(BackupService(session, batch_size=batch_size).dump(user_id)))
+
+
+def _library(session, user_id):
+    cards = session.exec(
+        select(Card).where(Card.user_id == user_id).order_by(Card.target_text)
+    ).all()
+    return [
+        (
+            card.target_text,
+            card.target_meaning,
+            card.interval,
+            card.ease_factor,
+            card.next_review,
+            card.created_at,
+            sorted(tag.name for tag in card.tags),
+        )
+        for card in cards
+    ]
+
+
+class TestBackupService:
+    def test_round_trips_library_with_new_ids(self, session):
+        source_id = _make_user(session, "source@example.com")
+        _make_library(session, source_id)
+        backup = _backup(session, source_id)
+        assert backup.getvalue().startswith(MAGIC)
+
+        target_id = _make_user(session, "target@example.com")
+        result = BackupService(session).restore(target_id, backup)
+
+        assert (result.tags_created, result.cards_created, result.links_created) == (2, 5, 3)
+        assert _library(session, target_id) == _library(session, source_id)
+        source_ids = set(session.exec(select(Card.id).where(Card.user_id == source_id)).all())
+        target_ids = set(session.exec(select(Card.id).where(Card.user_id == target_id)).all())
+        assert not source_ids & target_ids
+
+    def test_restore_into_same_library_skips_existing_cards(self, session):
+        user_id = _make_user(session, "same@example.com")
+        _make_library(session, user_id, count=3)
+        backup = _backup(session, user_id)
+        card = session.exec(select(Card).where(Card.target_text == "word2")).one()
+        session.delete(card)
+        session.commit()
+
+        result = BackupService(session).restore(user_id, backup)
+
+        assert (result.tags_created, result.cards_created, result.cards_skipped) == (0, 1, 2)
+        assert len(session.exec(select(Tag).where(Tag.user_id == user_id)).all()) == 2
+        assert [row[0] for row in _library(session, user_id)] == ["word0", "word1", "word2"]
+
+    def test_rejects_other_files(self, session):
+        user_id = _make_user(session, "bad@example.com")
+
+        with pytest.raises(ValueError, match="not a library backup"):
+            BackupService(session).restore(user_id, BytesIO(b"PK\x03\x04 zip"))
+
+    def test_truncated_backup_writes_nothing(self, session):
+        source_id = _make_user(session, "source@example.com")
+        _make_library(session, source_id)
+        data = _backup(session, source_id).getvalue()
+        target_id = _make_user(session, "target@example.com")
+
+        with pytest.raises(ValueError, match="truncated"):
+            BackupService(session).restore(target_id, BytesIO(data[:-10]))
+
+        assert _library(session, target_id) == []
+        assert session.exec(select(Tag).where(Tag.user_id == target_id)).all() == []
+
+    def test_recomputes_normalized_text_from_target_text(self, session):
+        source_id = _make_user(session, "source@example.com")
+        _make_library(session, source_id, count=2)
+        card = session.exec(
+            select(Card).where(Card.user_id == source_id, Card.target_text == "word0")
+        ).one()
+        card.target_text = "Break  The Ice"
+        card.normalized_text = "something else"
+        session.add(card)
+        session.commit()
+        data = _backup(session, source_id)
+        target_id = _make_user(session, "target@example.com")
+
+        BackupService(session).restore(target_id, data)
+
+        restored = session.exec(select(Card.normalized_text).where(Card.user_id == target_id)).all()
+        assert sorted(restored) == ["break the ice", "word1"]
+
+    def test_frame_missing_a_column_writes_nothing(self, session):
+        target_id = _make_user(session, "target@example.com")
+        schema = pa.schema([("id", pa.binary(16)), ("type", pa.string())])
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema, options=_IPC_OPTIONS) as writer:
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [pa.array([b"0" * 16], type=pa.binary(16)), pa.array(["phrase"])],
+                    schema=schema,
+                )
+            )
+        payload = sink.getvalue().to_pybytes()
+        data = (
+            MAGIC
+            + _HEADER.pack(FORMAT_VERSION)
+            + _FRAME.pack(CARDS, len(payload))
+            + payload
+            + _FRAME.pack(END, 0)
+        )
+
+        with pytest.raises(ValueError, match="corrupt"):
+            BackupService(session).restore(target_id, BytesIO(data))
+
+        assert _library(session, target_id) == []
+
+    def test_rejects_cards_that_fail_the_card_schema(self, session):
+        source_id = _make_user(session, "source@example.com")
+        _make_library(session, source_id, count=2)
+        card = session.exec(
+            select(Card).where(Card.user_id == source_id, Card.target_text == "word1")
+        ).one()
+        card.type = "word"
+        session.add(card)
+        session.commit()
+        data = _backup(session, source_id)
+        target_id = _make_user(session, "target@example.com")
+
+        with pytest.raises(ValueError, match="invalid card: type"):
+            BackupService(session).restore(target_id, data)
+
+        assert _library(session, target_id) == []
+        assert session.exec(select(Tag).where(Tag.user_id == target_id)).all() == []
@@ -0,0 +1,25 @@
+from app.services.candidate_scorer import score_candidates
+
+TEXT = (
+    "I was so tired that I decided to call it a day. My boss told me to give up smoking. "
+    "The exam was a piece of cake. We should call it a day soon, my friend said. "
+    "Don't give up on your dreams. The piece of cake on the table looks delicious."
+)
+
+
+def test_recurring_idioms_and_phrasal_verbs_rank_first():
+    top = [candidate.text for candidate in score_candidates(TEXT, limit=3)]
+    assert top == ["piece of cake", "call it a day", "give up"]
+
+
+def test_candidates_do_not_overlap_and_respect_limit():
+    candidates = score_candidates(TEXT, limit=10)
+    texts = [f" {c.text.lower()} " for c in candidates]
+
+    assert len(candidates) == 10
+    assert not any(a != b and a in b for a in texts for b in texts)
+    assert all(not c.text.lower().startswith(("the ", "a ", "to ")) for c in candidates)
+
+
+def test_empty_text():
+    assert score_candidates("") == []
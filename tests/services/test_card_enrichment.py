@@ -0,0 +1,82 @@
+import pytest
+from sqlmodel import Session
+
+from app.models import Card, CardTag, Tag, User
+from app.services.card_enrichment import CardEnrichmentService, TagClassifier, make_cloze
+
+
+@pytest.mark.parametrize(
+    ("target", "context", "expected"),
+    [
+        ("call it a day", "I'm tired, let's call it a day.", "I'm tired, let's _______."),
+        ("break the ice", "He broke the ice with a joke.", "He _______ with a joke."),
+        ("give up", "She never gives up.", "She never _______."),
+        ("carry on", "They carried on walking.", "They _______ walking."),
+        ("stop by", "I'm stopping by later.", "I'm _______ later."),
+        ("make up one's mind", "He made up his mind.", "He _______."),
+        ("keep an eye on sth", "Keep an eye on the kids.", "_______."),
+        ("The weather is nice.", "The weather is nice.", "_______."),
+    ],
+)
+def test_make_cloze_matches_inflected_forms(target, context, expected):
+    assert make_cloze(target, context) == expected
+
+
+def test_make_cloze_falls_back_to_content_word():
+    assert make_cloze("a piece of cake", "The exam was a cake walk.") == (
+        "The exam was a _______ walk."
+    )
+    assert make_cloze("hit the road", "Time to leave.") == "_______"
+
+
+def test_tag_classifier_learns_from_examples():
+    classifier = TagClassifier().fit(
+        [
+            ("kick off the match", ["sport"]),
+            ("score a goal in the match", ["sport"]),
+            ("catch a flight", ["travel"]),
+            ("miss the flight home", ["travel"]),
+            ("by and large", []),
+            ("more or less", []),
+        ]
+    )
+
+    assert classifier.predict("the match was close") == ["sport"]
+    assert classifier.predict("book a flight") == ["travel"]
+    assert classifier.predict("by the way") == []
+    assert TagClassifier().predict("anything") == []
+
+
+def test_classifier_rebuilds_in_background_when_tag_links_change(session: Session):
+    user = User(email="tags@example.com", hashed_password="x")
+    tag = Tag(user_id=user.id, name="music")
+    cards = [
+        Card(
+            user_id=user.id,
+            type="phrase",
+            target_text=target,
+            target_meaning="m",
+            context_sentence=context,
+            context_translation="t",
+            cloze_sentence="c",
+        )
+        for target, context in [
+            ("strum the guitar", "He strums the guitar every night."),
+            ("play in a band", "She plays bass guitar in a band."),
+        ]
+    ]
+    session.add_all([user, tag, *cards])
+    session.commit()
+    service = CardEnrichmentService(session)
+
+    # Nothing is trained on the request path: seed tags answer until the rebuild lands
+    assert service.suggest_tags(user.id, "guitar band") == []
+    CardEnrichmentService.wait_for_classifiers()
+    assert service.suggest_tags(user.id, "guitar band") == []
+
+    # Tagging existing cards changes the signature even without a card update
+    session.add_all([CardTag(card_id=card.id, tag_id=tag.id) for card in cards])
+    session.commit()
+    service.suggest_tags(user.id, "guitar band")
+    CardEnrichmentService.wait_for_classifiers()
+    assert service.suggest_tags(user.id, "guitar band") == ["music"]
@@ -0,0 +1,162 @@
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.core.config import get_settings
+from app.models.audio_cache import AudioCache
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.models.user import User
+from app.schemas.export import ExportFormat
+from app.services.export_artifact_service import ExportArtifactService
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path):
+    with patch.object(get_settings(), "export_artifact_dir", str(tmp_path)):
+        yield tmp_path
+
+
+def _make_library(session, count=3):
+    user = User(email="artifacts@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    for i in range(count):
+        session.add(
+            Card(
+                user_id=user_id,
+                type="phrase",
+                target_text=f"word{i}",
+                target_meaning="意思",
+                context_sentence=f"A sentence with word{i}.",
+                context_translation="翻译",
+                cloze_sentence="A sentence with _______.",
+                created_at=datetime(2026, 1, 1 + i),
+            )
+        )
+    session.commit()
+    return user_id
+
+
+def _count_statements(session):
+    statements = []
+    engine = session.get_bind()
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", count)
+
+
+class TestExportArtifactService:
+    def test_builds_artifact_file(self, session):
+        user_id = _make_library(session)
+
+        artifact = ExportArtifactService(session).build(user_id, ExportFormat.CSV)
+
+        data = Path(artifact.file_path).read_bytes()
+        assert artifact.size_bytes == len(data)
+        assert data.decode("utf-8-sig").count("word") >= 3
+        assert not list(Path(artifact.file_path).parent.glob("*.part"))
+
+    def test_unchanged_library_reuses_artifact_without_reading_cards(self, session):
+        user_id = _make_library(session)
+        service = ExportArtifactService(session)
+        first = service.build(user_id, ExportFormat.CSV)
+
+        statements, stop = _count_statements(session)
+        try:
+            second = service.build(user_id, ExportFormat.CSV)
+        finally:
+            stop()
+
+        assert second.id == first.id
+        # The version check and the artifact lookup; the library is not read
+        assert len(statements) == 2
+        assert not any("FROM cards ORDER BY" in statement for statement in statements)
+
+    @pytest.mark.parametrize("change", ["edit", "add", "delete", "tag"])
+    def test_library_changes_produce_new_version(self, session, change):
+        user_id = _make_library(session)
+        service = ExportArtifactService(session)
+        before = service.library_version(user_id)
+        card = session.exec(select(Card)).first()
+
+        if change == "edit":
+            card.target_meaning = "新意思"
+            card.updated_at = datetime.utcnow()
+            session.add(card)
+        elif change == "add":
+            session.add(
+                Card(
+                    user_id=user_id,
+                    type="phrase",
+                    target_text="new",
+                    target_meaning="新",
+                    context_sentence="Something new.",
+                    context_translation="新东西。",
+                    cloze_sentence="Something _______.",
+                )
+            )
+        elif change == "delete":
+            session.delete(card)
+        else:
+            tag = Tag(user_id=user_id, name="work")
+            session.add(tag)
+            session.commit()
+            session.add(CardTag(card_id=card.id, tag_id=tag.id))
+        session.commit()
+
+        assert service.library_version(user_id) != before
+
+    def test_new_version_replaces_older_artifact(self, session):
+        user_id = _make_library(session)
+        service = ExportArtifactService(session)
+        old = service.build(user_id, ExportFormat.JSONL)
+        old_path = Path(old.file_path)
+        session.add(Tag(user_id=user_id, name="work"))
+        session.commit()
+
+        new = service.build(user_id, ExportFormat.JSONL)
+
+        assert new.id != old.id
+        assert not old_path.exists()
+        assert service.get_by_id(user_id, old.id) is None
+        assert service.get_by_id(user_id, new.id) is not None
+
+    def test_audio_option_is_part_of_the_version(self, session):
+        user_id = _make_library(session)
+        service = ExportArtifactService(session)
+
+        service.build(user_id, ExportFormat.APKG)
+
+        assert service.get_current(user_id, ExportFormat.APKG) is not None
+        assert service.get_current(user_id, ExportFormat.APKG, include_audio=True) is None
+
+    def test_cached_audio_changes_the_audio_version_only(self, session):
+        user_id = _make_library(session)
+        service = ExportArtifactService(session)
+        before = service.library_version(user_id)
+        before_audio = service.library_version(user_id, include_audio=True)
+
+        settings = get_settings()
+        session.add(
+            AudioCache(
+                cache_key="k" * 64,
+                text="A sentence with word0.",
+                voice=settings.tts_voice,
+                model=settings.tts_model,
+                file_size_bytes=10,
+                file_path="/tmp/word0.mp3",
+            )
+        )
+        session.commit()
+
+        assert service.library_version(user_id) == before
+        assert service.library_version(user_id, include_audio=True) != before_audio
@@ -1,8 +1,17 @@
 import csv
+import json
 from datetime import datetime
 from io import BytesIO
 from unittest.mock import MagicMock
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from sqlalchemy import event
+
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.models.user import User
 from app.services.export_service import ExportService
 
 
@@ -90,3 +99,121 @@ class TestExportService:
         buf = service.cards_to_csv([])
         assert isinstance(buf, BytesIO)
         assert buf.tell() == 0  # seek position reset to start
+
+
+def _make_user_library(session, count=5):
+    user = User(email="export@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    work = Tag(user_id=user.id, name="work")
+    food = Tag(user_id=user.id, name="food")
+    session.add_all([work, food])
+    cards = []
+    for i in range(count):
+        card = Card(
+            user_id=user.id,
+            type="phrase",
+            target_text=f"word{i}",
+            target_meaning="意思, 含义",
+            context_sentence=f"A sentence with word{i}, and a comma.",
+            context_translation="翻译",
+            cloze_sentence="A sentence with _______, and a comma.",
+            created_at=datetime(2026, 1, 1 + i),
+        )
+        session.add(card)
+        cards.append(card)
+    session.commit()
+    session.add_all(
+        [
+            CardTag(card_id=cards[0].id, tag_id=work.id),
+            CardTag(card_id=cards[0].id, tag_id=food.id),
+        ]
+    )
+    session.commit()
+    return user
+
+
+class TestStreamingExport:
+    def test_streams_one_chunk_per_batch(self, session):
+        user = _make_user_library(session, count=5)
+        service = ExportService(session, batch_size=2)
+
+        chunks = list(service.stream_csv(user.id))
+
+        assert len(chunks) == 1 + 3  # header, then batches of 2, 2 and 1
+        assert chunks[0].startswith(b"\xef\xbb\xbf")
+        rows = list(csv.reader(b"".join(chunks).decode("utf-8-sig").splitlines()))
+        assert rows[0][1] == "Word/Phrase"
+        assert [row[1] for row in rows[1:]] == ["word4", "word3", "word2", "word1", "word0"]
+        assert rows[-1][2] == "意思, 含义"
+        assert rows[-1][6] == "food, work"
+
+    def test_loads_tags_once_per_batch(self, session):
+        user_id = _make_user_library(session, count=6).id
+        statements = []
+        engine = session.get_bind()
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            list(ExportService(session, batch_size=3).stream_csv(user_id))
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        # One card query plus one tag query per batch, however many cards
+        assert len(statements) == 1 + 2
+
+    def test_writes_xlsx_with_typed_cells_and_tags(self, session):
+        user = _make_user_library(session, count=3)
+        service = ExportService(session, batch_size=2)
+
+        workbook = load_workbook(BytesIO(b"".join(service.stream_xlsx(user.id))))
+
+        rows = list(workbook["Cards"].iter_rows(values_only=True))
+        assert rows[0][1] == "Word/Phrase"
+        assert [row[1] for row in rows[1:]] == ["word2", "word1", "word0"]
+        assert rows[-1][6] == "food, work"
+        assert rows[-1][7] == 0
+        assert rows[-1][8] == 2.5
+        assert rows[-1][10] == datetime(2026, 1, 1)
+
+    def test_streams_typed_jsonl(self, session):
+        user = _make_user_library(session, count=3)
+        service = ExportService(session, batch_size=2)
+
+        chunks = list(service.stream_jsonl(user.id))
+
+        assert len(chunks) == 2
+        records = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+        assert [record["target_text"] for record in records] == ["word2", "word1", "word0"]
+        assert records[-1]["target_meaning"] == "意思, 含义"
+        assert records[-1]["tags"] == ["food", "work"]
+        assert records[-1]["interval"] == 0
+        assert records[-1]["ease_factor"] == 2.5
+        assert records[-1]["created_at"] == "2026-01-01 00:00:00"
+
+    def test_streams_arrow_record_batch_per_batch(self, session):
+        user = _make_user_library(session, count=5)
+        service = ExportService(session, batch_size=2)
+
+        reader = pa.ipc.open_stream(b"".join(service.stream_arrow(user.id)))
+        batches = list(reader)
+
+        assert [batch.num_rows for batch in batches] == [2, 2, 1]
+        table = pa.Table.from_batches(batches)
+        assert table.schema.field("interval").type == pa.int32()
+        assert table.schema.field("next_review").type == pa.timestamp("us")
+        assert table.column("tags").to_pylist()[-1] == ["food", "work"]
+
+    def test_writes_parquet_with_typed_columns(self, session):
+        user = _make_user_library(session, count=5)
+        service = ExportService(session, batch_size=2)
+
+        table = pq.read_table(pa.BufferReader(b"".join(service.stream_parquet(user.id))))
+
+        assert table.num_rows == 5
+        assert table.schema.field("ease_factor").type == pa.float64()
+        assert table.column("target_text").to_pylist()[0] == "word4"
+        assert table.column("created_at").to_pylist()[-1] == datetime(2026, 1, 1)
@@ -0,0 +1,100 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.text import split_into_chunks
+from app.schemas.generate import ExtractMode
+from app.services.extraction_service import ExtractionService
+
+
+def test_split_into_chunks_breaks_on_sentences():
+    text = "One two three. Four five six! Seven eight nine?"
+    assert split_into_chunks(text, 100) == [text]
+    assert split_into_chunks(text, 30) == ["One two three. Four five six!", "Seven eight nine?"]
+
+
+def test_split_into_chunks_splits_overlong_sentence():
+    chunks = split_into_chunks("word " * 50, 24)
+    assert all(len(chunk) <= 24 for chunk in chunks)
+    assert " ".join(chunks).split() == ["word"] * 50
+
+
+def test_reduce_ranks_by_chunk_frequency():
+    service = ExtractionService(max_candidates=3)
+    merged = service.reduce(
+        [["hit the road", "break the ice"], ["Break the ice.", "call it a day"], ["call it a day"]]
+    )
+    assert merged == ["break the ice", "call it a day", "hit the road"]
+
+
+async def test_extract_runs_chunks_concurrently():
+    service = ExtractionService(chunk_chars=25, concurrency=10)
+    text = "First sentence here. Second sentence here. Third sentence here."
+    running = 0
+    peak = 0
+
+    async def fake_extract(chunk, provider=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [chunk]
+
+    with patch("app.services.extraction_service.extract_learning_items", new=fake_extract):
+        candidates = await service.extract(uuid4(), text)
+
+    assert peak == 3
+    assert candidates == ["First sentence here.", "Second sentence here.", "Third sentence here."]
+
+
+async def test_extract_tolerates_partial_failure_but_not_total():
+    service = ExtractionService(chunk_chars=25)
+    text = "First sentence here. Second sentence here."
+
+    async def flaky(chunk, provider=None):
+        if chunk.startswith("First"):
+            raise RuntimeError("boom")
+        return ["ok"]
+
+    with patch("app.services.extraction_service.extract_learning_items", new=flaky):
+        assert await service.extract(uuid4(), text) == ["ok"]
+        assert [c async for c in service.stream(uuid4(), text)] == ["ok"]
+
+    async def failing(chunk, provider=None):
+        raise RuntimeError("boom")
+
+    with (
+        patch("app.services.extraction_service.extract_learning_items", new=failing),
+        pytest.raises(RuntimeError),
+    ):
+        await service.extract(uuid4(), text)
+
+
+async def test_fast_mode_skips_llm():
+    service = ExtractionService()
+    text = "Let's call it a day. It is late, so let's call it a day and give up."
+    mock_extract = AsyncMock()
+
+    with patch("app.services.extraction_service.extract_learning_items", new=mock_extract):
+        candidates = await service.extract(uuid4(), text, mode=ExtractMode.FAST)
+
+    mock_extract.assert_not_called()
+    assert candidates[0] == "call it a day"
+
+
+async def test_shortlist_mode_sends_only_shortlist():
+    service = ExtractionService()
+    text = "Let's call it a day. It is late, so let's call it a day. " * 200
+    mock_extract = AsyncMock(return_value=["call it a day"])
+
+    with patch("app.services.extraction_service.extract_learning_items", new=mock_extract):
+        candidates = await service.extract(uuid4(), text, mode=ExtractMode.SHORTLIST)
+
+    assert candidates == ["call it a day"]
+    mock_extract.assert_called_once()
+    sent = mock_extract.call_args.args[0]
+    assert "call it a day" in sent.splitlines()
+    assert len(sent) < len(text) / 10
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from app.models.generation_cache import GenerationCache
+from app.services.generation_cache_service import GenerationCacheService
+
+RESPONSE = {
+    "type": "phrase",
+    "target_text": "break the ice",
+    "target_meaning": "打破僵局",
+    "context_sentence": "He told a joke to break the ice.",
+    "context_translation": "他讲了个笑话来打破僵局。",
+    "cloze_sentence": "He told a joke to _______.",
+    "tags": ["people"],
+}
+
+
+def test_cache_key_uses_exact_input():
+    key1 = GenerationCacheService.generate_cache_key("openai", "m", "1", " break the  ice ")
+    key2 = GenerationCacheService.generate_cache_key("openai", "m", "1", "break the ice")
+    key3 = GenerationCacheService.generate_cache_key("gemini", "m", "1", "break the ice")
+    key4 = GenerationCacheService.generate_cache_key("openai", "m", "2", "break the ice")
+    key5 = GenerationCacheService.generate_cache_key("openai", "m", "1", "Break the ice.")
+
+    assert key1 == key2
+    assert key1 != key3
+    assert key1 != key4
+    # Case and punctuation can change the answer, so they are part of the key
+    assert key1 != key5
+    assert len(key1) == 64
+
+
+def test_set_then_get_round_trip(session: Session):
+    service = GenerationCacheService(session)
+    assert service.get("openai", "m", "1", "break the ice") is None
+
+    service.set("openai", "m", "1", "break the ice", RESPONSE)
+
+    assert service.get("openai", "m", "1", "break  the ice") == RESPONSE
+    assert service.get("openai", "m", "1", "Break the ice") is None
+    entry = session.exec(select(GenerationCache)).one()
+    assert entry.input_text == "break the ice"
+
+
+def test_get_falls_back_to_database_and_counts_hits(session: Session):
+    service = GenerationCacheService(session)
+    service.set("openai", "m", "1", "break the ice", RESPONSE)
+    GenerationCacheService.clear_memory()
+
+    assert service.get("openai", "m", "1", "break the ice") == RESPONSE
+    entry = session.exec(select(GenerationCache)).one()
+    assert entry.hit_count == 1
+
+
+def test_expired_entry_is_removed(session: Session):
+    service = GenerationCacheService(session)
+    service.set("openai", "m", "1", "break the ice", RESPONSE)
+    GenerationCacheService.clear_memory()
+
+    entry = session.exec(select(GenerationCache)).one()
+    entry.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    session.add(entry)
+    session.commit()
+
+    assert service.get("openai", "m", "1", "break the ice") is None
+    assert session.exec(select(GenerationCache)).first() is None
+
+
+def test_set_replaces_existing_entry(session: Session):
+    service = GenerationCacheService(session)
+    service.set("openai", "m", "1", "break the ice", RESPONSE)
+    updated = {**RESPONSE, "target_meaning": "缓和气氛"}
+    service.set("openai", "m", "1", "break the ice", updated)
+
+    assert len(session.exec(select(GenerationCache)).all()) == 1
+    GenerationCacheService.clear_memory()
+    assert service.get("openai", "m", "1", "break the ice") == updated
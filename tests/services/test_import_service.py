@@ -0,0 +1,181 @@
+import csv
+from datetime import datetime
+from io import BytesIO, StringIO
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.models.card import Card
+from app.models.tag import Tag
+from app.models.user import User
+from app.services.export_service import HEADERS, ExportService
+from app.services.import_service import ImportService
+
+
+def _csv_file(rows, header=HEADERS):
+    buffer = StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return BytesIO(buffer.getvalue().encode("utf-8-sig"))
+
+
+def _row(i, tags="", **overrides):
+    row = {
+        "Type": "phrase",
+        "Word/Phrase": f"word{i}",
+        "Meaning": "意思, 含义",
+        "Context Sentence": f"A sentence with word{i} in it.",
+        "Context Translation": "翻译",
+        "Cloze Sentence": "",
+        "Tags": tags,
+        "Interval (days)": "3",
+        "Ease Factor": "2.2",
+        "Next Review": "2026-05-01 09:30",
+        "Created At": "2026-01-01 08:00",
+    }
+    row.update(overrides)
+    return [row[name] for name in HEADERS]
+
+
+def _make_user(session, email="import@example.com"):
+    user = User(email=email, hashed_password="x")
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+class TestImportService:
+    def test_imports_rows_with_typed_fields_and_tags(self, session):
+        user_id = _make_user(session)
+        session.add(Tag(user_id=user_id, name="work"))
+        session.commit()
+        file = _csv_file([_row(0, tags="work, food"), _row(1, tags="food")])
+
+        result = ImportService(session).import_file(user_id, file, "cards.csv")
+
+        assert (result.total_rows, result.created, result.skipped, result.failed) == (2, 2, 0, 0)
+        card = session.exec(select(Card).where(Card.target_text == "word0")).one()
+        assert card.interval == 3
+        assert card.ease_factor == 2.2
+        assert card.next_review == datetime(2026, 5, 1, 9, 30)
+        assert card.normalized_text == "word0"
+        assert card.cloze_sentence == "A sentence with _______ in it."
+        assert sorted(tag.name for tag in card.tags) == ["food", "work"]
+        tags = session.exec(select(Tag).where(Tag.user_id == user_id)).all()
+        assert sorted(tag.name for tag in tags) == ["food", "work"]
+
+    def test_reports_row_errors_and_imports_the_rest(self, session):
+        user_id = _make_user(session)
+        file = _csv_file(
+            [
+                _row(0),
+                _row(1, **{"Meaning": ""}),
+                _row(2, **{"Type": "word"}),
+                _row(3, **{"Ease Factor": "high"}),
+                _row(4, **{"Next Review": "someday"}),
+                _row(5, **{"Interval (days)": "inf"}),
+                _row(6, **{"Ease Factor": "nan"}),
+                _row(7, **{"Interval (days)": "1e12"}),
+            ]
+        )
+
+        result = ImportService(session).import_file(user_id, file, "cards.csv")
+
+        assert (result.created, result.failed) == (1, 7)
+        assert [error.row for error in result.errors] == [3, 4, 5, 6, 7, 8, 9]
+        assert "target_meaning" in result.errors[0].message
+        assert "type" in result.errors[1].message
+        assert "invalid ease factor" in result.errors[2].message
+        assert "invalid date" in result.errors[3].message
+        assert "interval must be a finite number" in result.errors[4].message
+        assert "ease factor must be a finite number" in result.errors[5].message
+        assert "interval must be at most" in result.errors[6].message
+
+    def test_skips_cards_already_in_library_and_repeated_rows(self, session):
+        user_id = _make_user(session)
+        ImportService(session).import_file(user_id, _csv_file([_row(0)]), "cards.csv")
+
+        file = _csv_file([_row(0), _row(1), _row(1, **{"Word/Phrase": "  WORD1 "})])
+        result = ImportService(session).import_file(user_id, file, "cards.csv")
+
+        assert (result.created, result.skipped) == (1, 2)
+
+    def test_rejects_file_missing_required_columns(self, session):
+        user_id = _make_user(session)
+        file = _csv_file([["hello", "你好"]], header=["Word/Phrase", "Meaning"])
+
+        with pytest.raises(ValueError, match="Context Sentence, Context Translation"):
+            ImportService(session).import_file(user_id, file, "cards.csv")
+
+    def test_imports_minimal_columns_and_infers_type(self, session):
+        user_id = _make_user(session)
+        header = ["word/phrase", "meaning", "context sentence", "context translation"]
+        file = _csv_file(
+            [["Let's call it a day.", "收工", "I'm tired. Let's call it a day.", "我累了。"]],
+            header=header,
+        )
+
+        result = ImportService(session).import_file(user_id, file, "cards.csv")
+
+        assert result.created == 1
+        card = session.exec(select(Card)).one()
+        assert card.type == "sentence"
+        assert card.interval == 0
+
+    def test_imports_xlsx(self, session):
+        user_id = _make_user(session)
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(HEADERS)
+        row = _row(0, tags="work")
+        row[7:] = [5, 2.6, datetime(2026, 6, 1), datetime(2026, 1, 2)]
+        sheet.append(row)
+        file = BytesIO()
+        workbook.save(file)
+        file.seek(0)
+
+        result = ImportService(session).import_file(user_id, file, "cards.XLSX")
+
+        assert result.created == 1
+        card = session.exec(select(Card)).one()
+        assert (card.interval, card.ease_factor) == (5, 2.6)
+        assert card.created_at == datetime(2026, 1, 2)
+
+    def test_round_trips_an_export(self, session):
+        source_id = _make_user(session)
+        ImportService(session).import_file(
+            source_id,
+            _csv_file([_row(i, tags="work, rock\\, pop") for i in range(3)]),
+            "cards.csv",
+        )
+        exported = BytesIO(b"".join(ExportService(session).stream_csv(source_id)))
+
+        target_id = _make_user(session, email="target@example.com")
+        result = ImportService(session).import_file(target_id, exported, "export.csv")
+
+        assert (result.created, result.failed) == (3, 0)
+        tags = session.exec(select(Tag).where(Tag.user_id == target_id)).all()
+        assert sorted(tag.name for tag in tags) == ["rock, pop", "work"]
+
+    def test_writes_each_chunk_with_bulk_statements(self, session):
+        user_id = _make_user(session)
+        file = _csv_file([_row(i, tags=f"tag{i % 2}") for i in range(6)])
+        statements = []
+        engine = session.get_bind()
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            result = ImportService(session, batch_size=3).import_file(user_id, file, "cards.csv")
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert result.created == 6
+        inserts = [statement for statement in statements if statement.startswith("INSERT")]
+        # Per chunk: one cards insert and one tag-link insert; tags are created once
+        assert len(inserts) == 1 + 2 * 2
@@ -0,0 +1,108 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlmodel import Session
+
+from app.models.job import Job
+from app.models.user import User
+from app.services.job_service import FAILED, RUNNING, SUCCEEDED, JobService
+from app.services.job_worker import JobWorker
+
+
+@pytest.fixture(name="user")
+def user_fixture(session: Session) -> User:
+    user = User(email="jobs@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+@pytest.fixture(name="worker")
+def worker_fixture(session: Session) -> JobWorker:
+    engine = session.get_bind()
+    return JobWorker(concurrency=2, session_factory=lambda: Session(engine))
+
+
+def _reload(session: Session, job: Job) -> Job:
+    session.expire_all()
+    return session.get(Job, job.id)
+
+
+async def test_run_job_stores_result_and_progress(session, user, worker):
+    job = JobService(session).create(user.id, "extract", {"text": "some text"}, total=1)
+
+    with patch(
+        "app.services.job_handlers.ExtractionService.extract",
+        new_callable=AsyncMock,
+        return_value=["break the ice"],
+    ):
+        await worker.run_job(job.id)
+
+    job = _reload(session, job)
+    assert job.status == SUCCEEDED
+    assert job.attempts == 1
+    assert job.progress == 1
+    assert '"break the ice"' in job.result_json
+
+
+async def test_run_job_retries_then_fails(session, user, worker):
+    job = JobService(session).create(user.id, "extract", {"text": "some text"})
+    failing = AsyncMock(side_effect=RuntimeError("provider down"))
+
+    with (
+        patch("app.services.job_handlers.ExtractionService.extract", new=failing),
+        patch.object(worker, "_retry_later") as retry_later,
+    ):
+        for _ in range(job.max_attempts):
+            await worker.run_job(job.id)
+
+    job = _reload(session, job)
+    assert job.status == FAILED
+    assert job.attempts == job.max_attempts
+    assert "provider down" in job.error
+    assert retry_later.call_count == job.max_attempts - 1
+
+
+async def test_configuration_error_is_not_retried(session, user, worker):
+    job = JobService(session).create(user.id, "extract", {"text": "some text"})
+    failing = AsyncMock(side_effect=ValueError("OpenAI API key not configured"))
+
+    with patch("app.services.job_handlers.ExtractionService.extract", new=failing):
+        await worker.run_job(job.id)
+
+    assert _reload(session, job).status == FAILED
+
+
+async def test_start_recovers_interrupted_jobs(session, user, worker):
+    job_service = JobService(session)
+    interrupted = job_service.create(user.id, "extract", {"text": "a"})
+    interrupted.status = RUNNING
+    session.add(interrupted)
+    session.commit()
+    queued = job_service.create(user.id, "extract", {"text": "b"})
+
+    with patch(
+        "app.services.job_handlers.ExtractionService.extract",
+        new_callable=AsyncMock,
+        return_value=[],
+    ):
+        await worker.start()
+        for _ in range(100):
+            if all(_reload(session, j).status == SUCCEEDED for j in (interrupted, queued)):
+                break
+            await asyncio.sleep(0.01)
+        await worker.shutdown()
+
+    assert _reload(session, interrupted).status == SUCCEEDED
+    assert _reload(session, queued).status == SUCCEEDED
+
+
+def test_claim_is_exclusive(session, user):
+    job_service = JobService(session)
+    job = job_service.create(user.id, "extract", {"text": "a"})
+
+    assert job_service.claim(job.id) is not None
+    assert job_service.claim(job.id) is None
+    assert _reload(session, job).status == RUNNING
@@ -0,0 +1,51 @@
+import json
+
+from app.services.json_stream import IncrementalJSONParser
+
+CARD = {
+    "type": "phrase",
+    "target_text": "break the ice",
+    "target_meaning": "打破僵局, \"缓和\" {气氛}",
+    "context_sentence": "He told a joke to break the ice.",
+    "tags": ["people", "life"],
+    "extra": {"nested": [1, 2, {"a": "]"}]},
+}
+
+
+def _feed_in_pieces(parser, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return events
+
+
+def test_fields_complete_in_order_for_any_chunking():
+    text = json.dumps(CARD, ensure_ascii=False, indent=2)
+    for size in (1, 3, 7, len(text)):
+        events = _feed_in_pieces(IncrementalJSONParser(), text, size)
+        assert [(key, value) for _, key, value in events] == list(CARD.items())
+
+
+def test_field_is_emitted_before_stream_finishes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"type": "phr') == []
+    assert parser.feed('ase", "target_te') == [("field", "type", "phrase")]
+    assert parser.feed('xt": "x",') == [("field", "target_text", "x")]
+
+
+def test_array_items_stream_individually():
+    parser = IncrementalJSONParser(array_key="candidates")
+    assert parser.feed('```json\n{"candidates": ["break the ice", "call it') == [
+        ("item", "candidates", "break the ice")
+    ]
+    events = parser.feed(' a day"]}')
+    assert events == [
+        ("item", "candidates", "call it a day"),
+        ("field", "candidates", ["break the ice", "call it a day"]),
+    ]
+
+
+def test_other_arrays_are_not_itemized():
+    parser = IncrementalJSONParser(array_key="candidates")
+    events = parser.feed('{"tags": ["a", "b"], "candidates": []}')
+    assert events == [("field", "tags", ["a", "b"]), ("field", "candidates", [])]
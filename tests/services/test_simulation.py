@@ -0,0 +1,65 @@
+import httpx
+import pytest
+
+from app.services.ai_service import LocalAIProvider
+from app.services.simulation import LocalTTSClient, SimulatedFaults, synthetic_mp3
+
+
+def test_latency_distribution_matches_median_and_p99():
+    faults = SimulatedFaults(latency_ms=100, latency_p99_ms=400, seed=1)
+    samples = sorted(faults.sample_latency() for _ in range(5000))
+
+    assert 0.09 < samples[2500] < 0.11
+    assert 0.33 < samples[4950] < 0.48
+
+
+def test_error_rate():
+    faults = SimulatedFaults(error_rate=0.25, seed=1)
+    failures = 0
+    for _ in range(2000):
+        try:
+            faults.maybe_fail("local://ai")
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 503
+            failures += 1
+
+    assert 400 < failures < 600
+
+
+async def test_local_provider_is_deterministic_and_well_formed():
+    provider = LocalAIProvider(SimulatedFaults())
+
+    first = await provider.generate("call it a day")
+    assert first == await provider.generate("call it a day")
+    assert first["type"] == "phrase"
+    assert first["cloze_sentence"] == "Here is an example with _______."
+
+    fields = [field async for field in provider.stream_generate("call it a day")]
+    assert dict(fields) == first
+
+    candidates = await provider.extract_candidates("First one. Second one! First one.")
+    assert candidates == ["First one.", "Second one!"]
+
+    items = await provider.recommend("get going", ["get going (related 1)"], count=2)
+    assert [item["target_text"] for item in items] == [
+        "get going (related 2)",
+        "get going (related 3)",
+    ]
+
+
+async def test_local_provider_raises_simulated_errors():
+    provider = LocalAIProvider(SimulatedFaults(error_rate=1.0, error_status=429))
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        await provider.generate("anything")
+    assert exc_info.value.response.status_code == 429
+
+
+def test_local_tts_client_returns_mp3_frames():
+    client = LocalTTSClient(SimulatedFaults())
+
+    audio = client.audio.speech.create(model="tts-1", voice="alloy", input="hello").content
+
+    assert audio == synthetic_mp3("hello")
+    assert audio[:2] == b"\xff\xfb"
+    assert len(audio) % 417 == 0
@@ -0,0 +1,152 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.card import Card
+from app.models.tag import Tag
+from app.models.user import User
+from app.schemas.card import CardCreate, CardUpdate
+from app.schemas.tag import TagCreate
+from app.services.card_service import CardService
+from app.services.sync_service import (
+    SyncService,
+    decode_token,
+    encode_token,
+    next_sync_version,
+)
+from app.services.tag_service import TagService
+
+
+def _make_user(session):
+    user = User(email="sync@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def _card_data(text):
+    return CardCreate(
+        type="phrase",
+        target_text=text,
+        target_meaning="意思",
+        context_sentence=f"A sentence with {text}.",
+        context_translation="翻译",
+        cloze_sentence="A sentence with _______.",
+    )
+
+
+class TestSyncService:
+    def test_first_sync_returns_whole_library(self, session):
+        user_id = _make_user(session)
+        tag = TagService(session).create(user_id, TagCreate(name="work"))
+        card_service = CardService(session)
+        card_service.create(user_id, _card_data("first").model_copy(update={"tag_ids": [tag.id]}))
+        card_service.create(user_id, _card_data("second"))
+
+        changes = SyncService(session).changes(user_id)
+
+        assert sorted(card.target_text for card in changes.cards) == ["first", "second"]
+        assert [t.name for c in changes.cards for t in c.tags] == ["work"]
+        assert [t.name for t in changes.tags] == ["work"]
+        assert changes.next_token is not None
+        assert not changes.has_more
+
+    def test_returns_only_changes_since_token(self, session):
+        user_id = _make_user(session)
+        card_service = CardService(session)
+        kept = card_service.create(user_id, _card_data("kept"))
+        edited = card_service.create(user_id, _card_data("edited"))
+        deleted = card_service.create(user_id, _card_data("deleted"))
+        tag = TagService(session).create(user_id, TagCreate(name="old"))
+        token = SyncService(session).changes(user_id).next_token
+
+        card_service.update(user_id, edited.id, CardUpdate(target_meaning="新的意思"))
+        card_service.delete(user_id, deleted.id)
+        TagService(session).delete(user_id, tag.id)
+        changes = SyncService(session).changes(user_id, since=token)
+
+        assert [card.id for card in changes.cards] == [edited.id]
+        assert changes.cards[0].target_meaning == "新的意思"
+        assert changes.deleted_cards == [deleted.id]
+        assert changes.deleted_tags == [tag.id]
+        assert kept.id not in {card.id for card in changes.cards}
+
+        unchanged = SyncService(session).changes(user_id, since=changes.next_token)
+        assert unchanged.cards == [] and unchanged.deleted_cards == []
+        assert unchanged.next_token == changes.next_token
+
+    def test_pages_through_changes_sharing_a_version(self, session):
+        user_id = _make_user(session)
+        version = next_sync_version(session, user_id)
+        for i in range(5):
+            session.add(
+                Card(
+                    user_id=user_id,
+                    type="phrase",
+                    target_text=f"card{i}",
+                    target_meaning="m",
+                    context_sentence="s",
+                    context_translation="t",
+                    cloze_sentence="c",
+                    sync_version=version,
+                )
+            )
+        session.add(Tag(user_id=user_id, name="same time", sync_version=version))
+        session.commit()
+
+        seen, token, has_more = [], None, True
+        while has_more:
+            changes = SyncService(session).changes(user_id, since=token, limit=2)
+            seen.extend(card.target_text for card in changes.cards)
+            seen.extend(tag.name for tag in changes.tags)
+            token, has_more = changes.next_token, changes.has_more
+
+        assert sorted(seen) == ["card0", "card1", "card2", "card3", "card4", "same time"]
+
+    def test_sees_changes_stamped_before_the_token_but_committed_after(self, session):
+        user_id = _make_user(session)
+        card_service = CardService(session)
+        started = datetime.utcnow()
+        card_service.create(user_id, _card_data("first"))
+        token = SyncService(session).changes(user_id).next_token
+
+        # A restore or review replay stamps updated_at when it starts, but
+        # its sync version when it writes, so it still lands past the token
+        late = card_service.create(user_id, _card_data("late"))
+        late.updated_at = started
+        session.add(late)
+        session.commit()
+        changes = SyncService(session).changes(user_id, since=token)
+
+        assert [card.id for card in changes.cards] == [late.id]
+
+    def test_sync_versions_increase_per_user(self, session):
+        user_id = _make_user(session)
+        other = User(email="other@example.com", hashed_password="x")
+        session.add(other)
+        session.commit()
+
+        assert next_sync_version(session, user_id) == 1
+        assert next_sync_version(session, user_id) == 2
+        assert next_sync_version(session, other.id) == 1
+
+    def test_does_not_see_other_users(self, session):
+        user_id = _make_user(session)
+        other = User(email="other@example.com", hashed_password="x")
+        session.add(other)
+        session.commit()
+        card = CardService(session).create(other.id, _card_data("theirs"))
+        CardService(session).delete(other.id, card.id)
+
+        changes = SyncService(session).changes(user_id)
+
+        assert changes.cards == [] and changes.deleted_cards == []
+        assert changes.next_token is None
+
+    def test_token_round_trip_and_rejects_garbage(self):
+        card_id = uuid.uuid4()
+
+        assert decode_token(encode_token(42, card_id)) == (42, card_id)
+        with pytest.raises(ValueError, match="invalid sync token"):
+            decode_token("not-a-token")
@@ -1,5 +1,11 @@
 from fastapi.testclient import TestClient
 
+IMPORT_CSV = (
+    "Word/Phrase,Meaning,Context Sentence,Context Translation,Tags\n"
+    "call it a day,收工,\"I'm tired, let's call it a day.\",我累了，收工吧。,work\n"
+    "break the ice,打破僵局,A joke can break the ice.,\n"
+)
+
 
 def test_create_card(client: TestClient, auth_headers: dict):
     """Test creating a new card."""
@@ -371,3 +377,149 @@ def test_get_study_cards_with_limit(client: TestClient, auth_headers: dict):
     assert response.status_code == 200
     data = response.json()
     assert len(data) <= 3
+
+
+def test_import_cards_from_csv(client: TestClient, auth_headers: dict):
+    """Test bulk importing cards reports created and failed rows."""
+    response = client.post(
+        "/api/v1/cards/import",
+        files={"file": ("cards.csv", IMPORT_CSV.encode("utf-8"), "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 1
+    assert data["failed"] == 1
+    assert data["errors"][0]["row"] == 3
+
+    cards = client.get("/api/v1/cards", headers=auth_headers).json()["items"]
+    assert cards[0]["target_text"] == "call it a day"
+    assert [tag["name"] for tag in cards[0]["tags"]] == ["work"]
+
+
+def test_import_cards_rejects_missing_columns(client: TestClient, auth_headers: dict):
+    """Test importing a file without the required columns fails."""
+    response = client.post(
+        "/api/v1/cards/import",
+        files={"file": ("cards.csv", b"Word/Phrase\nhello\n", "text/csv")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    assert "missing required columns" in response.json()["detail"]
+
+
+def test_import_cards_from_apkg(client: TestClient, auth_headers: dict):
+    """Test that an exported Anki package imports back, skipping cards already present."""
+    client.post(
+        "/api/v1/cards/import",
+        files={"file": ("cards.csv", IMPORT_CSV.encode("utf-8"), "text/csv")},
+        headers=auth_headers,
+    )
+    package = client.get("/api/v1/export/cards?format=apkg", headers=auth_headers).content
+
+    response = client.post(
+        "/api/v1/cards/import",
+        files={"file": ("deck.apkg", package, "application/octet-stream")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["skipped"] == 1
+
+
+def test_replay_reviews_applies_log_in_time_order(client: TestClient, auth_headers: dict):
+    """Test an offline review log is applied oldest first, as of each review's time."""
+    card_data = {
+        "type": "phrase",
+        "target_text": "hit the road",
+        "target_meaning": "出发",
+        "context_sentence": "It's late, we should hit the road.",
+        "context_translation": "很晚了，我们该出发了。",
+        "cloze_sentence": "It's late, we should _______.",
+    }
+    card_id = client.post("/api/v1/cards", json=card_data, headers=auth_headers).json()["id"]
+    entries = [
+        {
+            "id": "00000000-0000-0000-0000-000000000002",
+            "card_id": card_id,
+            "rating": "remembered",
+            "reviewed_at": "2026-03-02T09:00:00Z",
+        },
+        {
+            "id": "00000000-0000-0000-0000-000000000001",
+            "card_id": card_id,
+            "rating": "forgot",
+            "reviewed_at": "2026-03-01T09:00:00Z",
+        },
+    ]
+
+    response = client.post("/api/v1/cards/reviews", json={"entries": entries}, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["applied"] == 2
+    # forgot then remembered: interval 0 -> 1, due a day after the later review
+    assert data["cards"][0]["interval"] == 1
+    assert data["cards"][0]["next_review"].startswith("2026-03-03T09:00:00")
+
+
+def test_replay_reviews_skips_entries_already_replayed(client: TestClient, auth_headers: dict):
+    """Test resending a review log does not apply it twice."""
+    card_data = {
+        "type": "phrase",
+        "target_text": "on the fence",
+        "target_meaning": "犹豫不决",
+        "context_sentence": "I'm still on the fence about it.",
+        "context_translation": "我对此还犹豫不决。",
+        "cloze_sentence": "I'm still _______ about it.",
+    }
+    card_id = client.post("/api/v1/cards", json=card_data, headers=auth_headers).json()["id"]
+    entry = {
+        "id": "11111111-1111-1111-1111-111111111111",
+        "card_id": card_id,
+        "rating": "remembered",
+        "reviewed_at": "2026-03-01T09:00:00",
+    }
+    missing = {**entry, "id": "22222222-2222-2222-2222-222222222222"}
+    missing["card_id"] = "00000000-0000-0000-0000-000000000000"
+
+    first = client.post("/api/v1/cards/reviews", json={"entries": [entry]}, headers=auth_headers)
+    second = client.post(
+        "/api/v1/cards/reviews", json={"entries": [entry, missing]}, headers=auth_headers
+    )
+    assert first.json()["applied"] == 1
+    assert second.json() == {"applied": 0, "duplicates": 1, "missing": 1, "cards": []}
+    card = client.get(f"/api/v1/cards/{card_id}", headers=auth_headers).json()
+    assert card["interval"] == 1
+
+
+def test_replay_reviews_rejects_ids_logged_by_another_user(client: TestClient, auth_headers: dict):
+    """Test an entry ID logged for another user is rejected, not counted as a duplicate."""
+    card_data = {
+        "type": "phrase",
+        "target_text": "on the fence",
+        "target_meaning": "犹豫不决",
+        "context_sentence": "I'm still on the fence about it.",
+        "context_translation": "我对此还犹豫不决。",
+        "cloze_sentence": "I'm still _______ about it.",
+    }
+    other = {"email": "other@example.com", "password": "otherpassword123"}
+    client.post("/api/v1/auth/register", json=other)
+    token = client.post(
+        "/api/v1/auth/login", data={"username": other["email"], "password": other["password"]}
+    ).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+    entry = {
+        "id": "33333333-3333-3333-3333-333333333333",
+        "rating": "remembered",
+        "reviewed_at": "2026-03-01T09:00:00",
+    }
+    for headers in (other_headers, auth_headers):
+        card_id = client.post("/api/v1/cards", json=card_data, headers=headers).json()["id"]
+        response = client.post(
+            "/api/v1/cards/reviews",
+            json={"entries": [{**entry, "card_id": card_id}]},
+            headers=headers,
+        )
+
+    assert response.status_code == 400
+    card = client.get(f"/api/v1/cards/{card_id}", headers=auth_headers).json()
+    assert card["interval"] == 0
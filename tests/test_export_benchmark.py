@@ -0,0 +1,144 @@
+import csv
+import os
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.models.card import Card
+from app.models.tag import CardTag, Tag
+from app.models.user import User
+from app.schemas.export import ExportFormat
+from app.services.anki_service import AnkiService
+from app.services.backup_service import BackupService
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService
+
+CARD_COUNT = int(os.getenv("EXPORT_BENCHMARK_CARDS", "0"))
+
+# Peak Python heap allowed for one export, whatever the library size
+MEMORY_CEILING_BYTES = 32 * 1024 * 1024
+
+# Import throughput floor, far above what per-card commits can reach
+MIN_IMPORT_ROWS_PER_SECOND = 2000
+
+# Backup and restore each handle a 100k-card library in seconds
+MIN_BACKUP_CARDS_PER_SECOND = 5000
+
+
+def _seed_library(session: Session, count: int) -> uuid.UUID:
+    user = User(email="benchmark@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    tag_ids = [uuid.uuid4() for _ in range(10)]
+    session.execute(
+        insert(Tag),
+        [{"id": tag_id, "user_id": user_id, "name": f"tag{i}"} for i, tag_id in enumerate(tag_ids)],
+    )
+    start = datetime(2020, 1, 1)
+    for offset in range(0, count, 10_000):
+        cards = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "type": "phrase",
+                "target_text": f"benchmark phrase {i}",
+                "target_meaning": "基准测试短语",
+                "context_sentence": f"This sentence uses benchmark phrase {i} in context.",
+                "context_translation": "这个句子在上下文中使用了基准测试短语。",
+                "cloze_sentence": "This sentence uses ________ in context.",
+                "interval": i % 30,
+                "ease_factor": 2.5,
+                "next_review": start + timedelta(days=i % 365),
+                "created_at": start + timedelta(minutes=i),
+                "updated_at": start + timedelta(minutes=i),
+            }
+            for i in range(offset, min(offset + 10_000, count))
+        ]
+        session.execute(insert(Card), cards)
+        session.execute(
+            insert(CardTag),
+            [{"card_id": card["id"], "tag_id": tag_ids[i % 10]} for i, card in enumerate(cards)],
+        )
+    session.commit()
+    session.expunge_all()
+    return user_id
+
+
+@pytest.mark.skipif(not CARD_COUNT, reason="EXPORT_BENCHMARK_CARDS not set")
+@pytest.mark.parametrize("export_format", list(ExportFormat))
+def test_export_memory_stays_under_ceiling(session: Session, export_format: ExportFormat):
+    """
+    Export a large library and check peak memory stays under a fixed ceiling.
+
+    Skipped unless EXPORT_BENCHMARK_CARDS is set, e.g.
+    ``EXPORT_BENCHMARK_CARDS=100000 pytest tests/test_export_benchmark.py -s``.
+    """
+    user_id = _seed_library(session, CARD_COUNT)
+    if export_format == ExportFormat.APKG:
+        chunks = AnkiService(session).stream_apkg(user_id)
+    else:
+        chunks = ExportService(session).stream(user_id, export_format)
+
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in chunks)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"\n{export_format.value}: {CARD_COUNT} cards, {size} bytes, peak {peak / 2**20:.1f} MiB")
+    assert size > 0
+    assert peak < MEMORY_CEILING_BYTES
+
+
+@pytest.mark.skipif(not CARD_COUNT, reason="EXPORT_BENCHMARK_CARDS not set")
+def test_import_throughput(session: Session):
+    """Re-import an exported library into a new account and check rows per second."""
+    source_id = _seed_library(session, CARD_COUNT)
+    exported = b"".join(ExportService(session).stream_csv(source_id))
+    target = User(email="import-benchmark@example.com", hashed_password="x")
+    session.add(target)
+    session.commit()
+
+    started = time.perf_counter()
+    result = ImportService(session).import_rows(
+        target.id, csv.reader(exported.decode("utf-8-sig").splitlines())
+    )
+    seconds = time.perf_counter() - started
+
+    print(f"\nimport: {result.created} cards in {seconds:.1f}s")
+    assert result.created == CARD_COUNT
+    assert result.created / seconds > MIN_IMPORT_ROWS_PER_SECOND
+
+
+@pytest.mark.skipif(not CARD_COUNT, reason="EXPORT_BENCHMARK_CARDS not set")
+def test_backup_restore_throughput(session: Session):
+    """Back up a large library, restore it into a new account and time both."""
+    source_id = _seed_library(session, CARD_COUNT)
+
+    started = time.perf_counter()
+    backup = b"".join(BackupService(session).dump(source_id))
+    backup_seconds = time.perf_counter() - started
+
+    target = User(email="restore-benchmark@example.com", hashed_password="x")
+    session.add(target)
+    session.commit()
+    started = time.perf_counter()
+    result = BackupService(session).restore(target.id, BytesIO(backup))
+    restore_seconds = time.perf_counter() - started
+
+    print(
+        f"\nbackup: {CARD_COUNT} cards, {len(backup)} bytes in {backup_seconds:.1f}s; "
+        f"restore in {restore_seconds:.1f}s"
+    )
+    assert result.cards_created == CARD_COUNT
+    assert result.links_created == CARD_COUNT
+    assert CARD_COUNT / backup_seconds > MIN_BACKUP_CARDS_PER_SECOND
+    assert CARD_COUNT / restore_seconds > MIN_BACKUP_CARDS_PER_SECOND
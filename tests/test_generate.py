@@ -111,7 +111,7 @@ def test_extract_learning_items(client: TestClient, auth_headers: dict):
     mock_candidates = ["candidate 1", "candidate 2"]
 
     with patch(
-        "app.api.v1.generate.extract_learning_items", new_callable=AsyncMock
+        "app.services.extraction_service.extract_learning_items", new_callable=AsyncMock
     ) as mock_extract:
         mock_extract.return_value = mock_candidates
 
@@ -123,3 +123,462 @@ def test_extract_learning_items(client: TestClient, auth_headers: dict):
         assert response.status_code == 200
         data = response.json()
         assert data["candidates"] == mock_candidates
+
+
+def test_extract_long_document_in_chunks(client: TestClient, auth_headers: dict):
+    """Test long input is extracted per chunk and merged."""
+    text = " ".join(f"Sentence number {i} is here." for i in range(2000))
+
+    async def fake_extract(chunk, provider=None):
+        return ["break the ice", f"chunk starting {chunk[:20]}"]
+
+    with patch(
+        "app.services.extraction_service.extract_learning_items", side_effect=fake_extract
+    ) as mock_extract:
+        response = client.post(
+            "/api/v1/generate/extract",
+            json={"text": text},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert mock_extract.call_count > 1
+    assert all(len(call.args[0]) <= 6000 for call in mock_extract.call_args_list)
+    assert response.json()["candidates"][0] == "break the ice"
+
+
+def test_extract_fast_mode_excludes_library(client: TestClient, auth_headers: dict):
+    """Test fast extraction runs locally and leaves out phrases already in the library."""
+    client.post("/api/v1/cards", json=_card_for("Give up"), headers=auth_headers)
+    text = "Let's call it a day. Never give up. We call it a day and give up."
+
+    with patch(
+        "app.services.extraction_service.extract_learning_items", new_callable=AsyncMock
+    ) as mock_extract:
+        response = client.post(
+            "/api/v1/generate/extract",
+            json={"text": text, "mode": "fast"},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    candidates = response.json()["candidates"]
+    assert "call it a day" in candidates
+    assert "give up" not in [c.lower() for c in candidates]
+    mock_extract.assert_not_called()
+
+
+def test_generate_uses_cache_for_repeat_input(client: TestClient, auth_headers: dict):
+    """Test repeat generations are served from the cache without calling the AI."""
+    mock_response = {
+        "type": "phrase",
+        "target_text": "break the ice",
+        "target_meaning": "打破僵局",
+        "context_sentence": "He told a joke to break the ice.",
+        "context_translation": "他讲了个笑话来打破僵局。",
+        "cloze_sentence": "He told a joke to _______.",
+        "tags": ["people"],
+    }
+
+    with patch(
+        "app.api.v1.generate.generate_card_data", new_callable=AsyncMock
+    ) as mock_generate:
+        mock_generate.return_value = mock_response
+
+        first = client.post(
+            "/api/v1/generate", json={"text": "break the ice"}, headers=auth_headers
+        )
+        second = client.post(
+            "/api/v1/generate", json={"text": " break  the ice "}, headers=auth_headers
+        )
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        mock_generate.assert_called_once()
+
+
+def test_generate_bypass_cache(client: TestClient, auth_headers: dict):
+    """Test bypass_cache forces a fresh AI call."""
+    mock_response = {
+        "type": "phrase",
+        "target_text": "break the ice",
+        "target_meaning": "打破僵局",
+        "context_sentence": "He told a joke to break the ice.",
+        "context_translation": "他讲了个笑话来打破僵局。",
+        "cloze_sentence": "He told a joke to _______.",
+    }
+
+    with patch(
+        "app.api.v1.generate.generate_card_data", new_callable=AsyncMock
+    ) as mock_generate:
+        mock_generate.return_value = mock_response
+
+        client.post("/api/v1/generate", json={"text": "break the ice"}, headers=auth_headers)
+        response = client.post(
+            "/api/v1/generate",
+            json={"text": "break the ice", "bypass_cache": True},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert mock_generate.call_count == 2
+
+
+def _card_for(text: str) -> dict:
+    return {
+        "type": "phrase",
+        "target_text": text,
+        "target_meaning": f"{text} 的意思",
+        "context_sentence": f"Example with {text}.",
+        "context_translation": "例句。",
+        "cloze_sentence": "Example with _______.",
+    }
+
+
+def test_generate_batch_returns_results_in_order(client: TestClient, auth_headers: dict):
+    """Test batch generation keeps input order and reports per-item errors."""
+
+    async def fake_generate(text, provider=None):
+        if text == "bad one":
+            raise Exception("boom")
+        return _card_for(text)
+
+    with patch(
+        "app.services.batch_generation_service.generate_card_data", side_effect=fake_generate
+    ) as mock_generate:
+        response = client.post(
+            "/api/v1/generate/batch",
+            json={"texts": ["first", "bad one", "third", " first "]},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["text"] for r in results] == ["first", "bad one", "third", " first "]
+    assert results[0]["card"]["target_text"] == "first"
+    assert results[1]["card"] is None
+    assert "boom" in results[1]["error"]
+    assert results[2]["card"]["target_text"] == "third"
+    assert results[3]["card"] == results[0]["card"]
+    # "first" and " first " are the same input once whitespace is collapsed
+    assert mock_generate.call_count == 3
+
+
+def test_generate_batch_packs_items_and_falls_back(client: TestClient, auth_headers: dict):
+    """Test packed prompts are used, with single calls for items the pack missed."""
+
+    async def fake_generate_many(texts, provider=None):
+        return {texts[0]: _card_for(texts[0])}  # the model dropped the second item
+
+    async def fake_generate(text, provider=None):
+        return _card_for(text)
+
+    with (
+        patch(
+            "app.services.batch_generation_service.generate_card_data_many",
+            side_effect=fake_generate_many,
+        ) as mock_many,
+        patch(
+            "app.services.batch_generation_service.generate_card_data",
+            side_effect=fake_generate,
+        ) as mock_single,
+    ):
+        response = client.post(
+            "/api/v1/generate/batch",
+            json={"texts": ["alpha", "beta"], "pack_size": 2},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["card"]["target_text"] for r in results] == ["alpha", "beta"]
+    mock_many.assert_called_once_with(["alpha", "beta"], provider=None)
+    mock_single.assert_called_once_with("beta", provider=None)
+
+
+def _run_packed_batch(client: TestClient, auth_headers: dict, packed: list[dict]):
+    """Run a packed batch of alpha, beta, gamma whose packed prompt returns ``packed``."""
+    provider = AsyncMock()
+    provider.generate_many.return_value = packed
+
+    async def fake_generate(text, provider=None):
+        return _card_for(text)
+
+    with (
+        patch("app.services.ai_service.AIServiceFactory.create", return_value=provider),
+        patch(
+            "app.services.batch_generation_service.generate_card_data",
+            side_effect=fake_generate,
+        ) as mock_single,
+    ):
+        response = client.post(
+            "/api/v1/generate/batch",
+            json={"texts": ["alpha", "beta", "gamma"], "pack_size": 3},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["card"]["target_text"] for r in results] == ["alpha", "beta", "gamma"]
+    assert [r["card"]["context_sentence"] for r in results] == [
+        _card_for(text)["context_sentence"] for text in ["alpha", "beta", "gamma"]
+    ]
+    return mock_single
+
+
+def test_generate_batch_retries_item_dropped_from_start_of_pack(
+    client: TestClient, auth_headers: dict
+):
+    """Test a dropped first item does not shift the later cards onto the wrong inputs."""
+    mock_single = _run_packed_batch(client, auth_headers, [_card_for("beta"), _card_for("gamma")])
+
+    mock_single.assert_called_once_with("alpha", provider=None)
+
+
+def test_generate_batch_matches_reordered_pack_by_text(client: TestClient, auth_headers: dict):
+    """Test swapped items are matched to their inputs by target text."""
+    mock_single = _run_packed_batch(
+        client, auth_headers, [_card_for("beta"), _card_for("alpha"), _card_for("gamma")]
+    )
+
+    mock_single.assert_not_called()
+
+
+def test_generate_batch_uses_cache(client: TestClient, auth_headers: dict):
+    """Test batch generation reuses cards cached by single generation."""
+    with patch(
+        "app.api.v1.generate.generate_card_data", new_callable=AsyncMock
+    ) as mock_generate:
+        mock_generate.return_value = _card_for("cached phrase")
+        client.post("/api/v1/generate", json={"text": "cached phrase"}, headers=auth_headers)
+
+    with patch(
+        "app.services.batch_generation_service.generate_card_data", new_callable=AsyncMock
+    ) as mock_batch_generate:
+        response = client.post(
+            "/api/v1/generate/batch",
+            json={"texts": ["cached phrase"]},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["card"]["target_text"] == "cached phrase"
+    mock_batch_generate.assert_not_called()
+
+
+def test_generate_batch_rejects_empty_list(client: TestClient, auth_headers: dict):
+    """Test batch generation requires at least one text."""
+    response = client.post(
+        "/api/v1/generate/batch", json={"texts": []}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_pipeline_streams_candidates_and_drafts(client: TestClient, auth_headers: dict):
+    """Test the SSE pipeline emits a draft per extracted candidate."""
+
+    async def fake_stream(text, provider=None):
+        for candidate in ["break the ice", "call it a day", "Break the ice"]:
+            yield candidate
+
+    async def fake_generate(text, provider=None):
+        if text == "call it a day":
+            raise Exception("boom")
+        return _card_for(text)
+
+    with (
+        patch("app.services.pipeline_service.stream_learning_items", new=fake_stream),
+        patch(
+            "app.services.batch_generation_service.generate_card_data", side_effect=fake_generate
+        ),
+    ):
+        response = client.post(
+            "/api/v1/generate/pipeline",
+            json={"text": "Some article text"},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names.count("candidate") == 2  # duplicate candidate is dropped
+    assert names[-1] == "done"
+    drafts = [data for name, data in events if name == "draft"]
+    errors = [data for name, data in events if name == "error"]
+    assert drafts == [
+        {"index": 0, "text": "break the ice", "card": {**_card_for("break the ice"), "tags": []}}
+    ]
+    assert errors[0]["index"] == 1
+    assert events[-1][1] == {"candidates": 2, "drafts": 1, "errors": 1}
+
+
+def test_pipeline_reports_extraction_failure(client: TestClient, auth_headers: dict):
+    """Test an extraction failure is sent as an error event, then done."""
+
+    async def failing_stream(text, provider=None):
+        raise ValueError("OpenAI API key not configured")
+        yield  # pragma: no cover
+
+    with patch("app.services.pipeline_service.stream_learning_items", new=failing_stream):
+        response = client.post(
+            "/api/v1/generate/pipeline",
+            json={"text": "Some article text"},
+            headers=auth_headers,
+        )
+
+    events = _parse_sse(response.text)
+    assert events[0][0] == "error"
+    assert "not configured" in events[0][1]["detail"]
+    assert events[-1] == ("done", {"candidates": 0, "drafts": 0, "errors": 1})
+
+
+def test_generate_stream_emits_fields_then_card(client: TestClient, auth_headers: dict):
+    """Test the streaming endpoint sends each field, then the validated card."""
+    card = _card_for("call it a day")
+
+    async def fake_stream(text, provider=None):
+        for name, value in card.items():
+            yield name, value
+
+    with patch("app.api.v1.generate.stream_card_data", new=fake_stream):
+        response = client.post(
+            "/api/v1/generate/stream", json={"text": "call it a day"}, headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    events = _parse_sse(response.text)
+    fields = [data for name, data in events if name == "field"]
+    assert [f["name"] for f in fields] == list(card)
+    assert events[-1] == ("card", {**card, "tags": []})
+
+    # The completed card is cached for non-streaming generation too
+    with patch(
+        "app.api.v1.generate.generate_card_data", new_callable=AsyncMock
+    ) as mock_generate:
+        cached = client.post(
+            "/api/v1/generate", json={"text": "call it a day"}, headers=auth_headers
+        )
+    assert cached.json()["target_text"] == "call it a day"
+    mock_generate.assert_not_called()
+
+
+def test_generate_stream_reports_incomplete_card(client: TestClient, auth_headers: dict):
+    """Test a stream that ends without required fields reports an error."""
+
+    async def fake_stream(text, provider=None):
+        yield "type", "phrase"
+
+    with patch("app.api.v1.generate.stream_card_data", new=fake_stream):
+        response = client.post(
+            "/api/v1/generate/stream", json={"text": "call it a day"}, headers=auth_headers
+        )
+
+    events = _parse_sse(response.text)
+    assert events[0] == ("field", {"name": "type", "value": "phrase"})
+    assert events[-1][0] == "error"
+
+
+def test_generate_computes_cloze_and_tags_locally(client: TestClient, auth_headers: dict):
+    """Test local-fields mode fills in the cloze sentence and the user's own tags."""
+    from app.core.config import get_settings
+    from app.services.card_enrichment import CardEnrichmentService
+
+    tag = client.post("/api/v1/tags", json={"name": "music"}, headers=auth_headers).json()
+    for target, context in [
+        ("strum the guitar", "He strums the guitar every night."),
+        ("play in a band", "She plays bass in a band."),
+    ]:
+        client.post(
+            "/api/v1/cards",
+            json={
+                **_card_for(target),
+                "context_sentence": context,
+                "tag_ids": [tag["id"]],
+            },
+            headers=auth_headers,
+        )
+
+    lean = {
+        "type": "phrase",
+        "target_text": "play it by ear",
+        "target_meaning": "凭听觉演奏；随机应变",
+        "context_sentence": "He lost the guitar sheet, so he played it by ear in the band.",
+        "context_translation": "他弄丢了吉他谱，只好在乐队里凭听觉弹奏。",
+    }
+    with (
+        patch.object(get_settings(), "generation_local_fields", True),
+        patch(
+            "app.api.v1.generate.generate_card_data", new_callable=AsyncMock
+        ) as mock_generate,
+    ):
+        mock_generate.return_value = lean
+        first = client.post(
+            "/api/v1/generate", json={"text": "play it by ear"}, headers=auth_headers
+        )
+        # The user's classifier is trained in the background; seed tags serve meanwhile
+        CardEnrichmentService.wait_for_classifiers()
+        response = client.post(
+            "/api/v1/generate", json={"text": "play it by ear"}, headers=auth_headers
+        )
+
+    assert first.status_code == 200
+    assert first.json()["tags"] != ["music"]
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cloze_sentence"] == "He lost the guitar sheet, so he _______ in the band."
+    assert data["tags"] == ["music"]
+
+
+def test_recommend_excludes_library_on_server(client: TestClient, auth_headers: dict):
+    """Test recommendations already in the library are filtered without sending the library."""
+    client.post("/api/v1/cards", json=_card_for("Break the ice"), headers=auth_headers)
+
+    rounds = [
+        [_card_for("break the ice"), _card_for("hit the road")],
+        [_card_for("call it a day"), _card_for("hit the road")],
+    ]
+    with patch(
+        "app.services.recommendation_service.recommend_related_items", new_callable=AsyncMock
+    ) as mock_recommend:
+        mock_recommend.side_effect = rounds
+        with patch("app.services.recommendation_service.RecommendationService.MAX_ROUNDS", 2):
+            response = client.post(
+                "/api/v1/generate/recommend",
+                json={"text": "get going"},
+                headers=auth_headers,
+            )
+
+    assert response.status_code == 200
+    texts = [r["target_text"] for r in response.json()["recommendations"]]
+    assert texts == ["hit the road", "call it a day"]
+    first_call, second_call = mock_recommend.call_args_list
+    assert first_call.kwargs["existing_texts"] == []
+    assert first_call.kwargs["count"] == 5
+    # Accepted suggestions are avoided too, not just the rejected ones
+    assert second_call.kwargs["existing_texts"] == ["hit the road", "break the ice"]
+
+
+def test_recommend_ai_service_error(client: TestClient, auth_headers: dict):
+    """Test recommend maps configuration errors to 503."""
+    with patch(
+        "app.services.recommendation_service.recommend_related_items", new_callable=AsyncMock
+    ) as mock_recommend:
+        mock_recommend.side_effect = ValueError("OpenAI API key not configured")
+        response = client.post(
+            "/api/v1/generate/recommend",
+            json={"text": "get going"},
+            headers=auth_headers,
+        )
+    assert response.status_code == 503
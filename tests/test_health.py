@@ -24,3 +24,12 @@ def test_root_endpoint(client: TestClient):
     data = response.json()
     assert data["message"] == "English Active Recall API"
     assert "docs" in data
+
+
+def test_ai_health_requires_auth(client: TestClient, auth_headers: dict):
+    """Test AI usage and cost counters are only shown to signed-in users."""
+    assert client.get("/api/v1/health/ai").status_code == 401
+
+    response = client.get("/api/v1/health/ai", headers=auth_headers)
+    assert response.status_code == 200
+    assert {"providers", "scheduler", "routes", "output"} <= response.json().keys()
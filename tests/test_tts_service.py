@@ -241,3 +241,21 @@ def test_get_cached_audio_file_missing(session: Session):
     # Verify entry was removed from DB
     db_entry = session.exec(select(AudioCache).where(AudioCache.cache_key == cache_key)).first()
     assert db_entry is None
+
+
+def test_local_tts_provider_generates_offline(session: Session):
+    """Test tts_provider="local" caches synthetic audio without calling OpenAI."""
+    from app.core.config import get_settings
+    settings = get_settings()
+    original = (settings.tts_provider, settings.tts_cache_dir, settings.local_tts_latency_ms)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        settings.tts_provider, settings.tts_cache_dir = "local", tmpdir
+        settings.local_tts_latency_ms = 0
+        try:
+            with patch("app.services.tts_service._local_client", None):
+                entry = TTSService(session).get_audio("Hello world")
+            assert Path(entry.file_path).read_bytes()[:2] == b"\xff\xfb"
+            assert entry.file_size_bytes > 0
+        finally:
+            settings.tts_provider, settings.tts_cache_dir, settings.local_tts_latency_ms = original